@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+# Paket: fastcompress
+# Mesin kompresi FastCompress tanpa ketergantungan Tk/customtkinter.
+# GUI (video_compressor_app.py) dan CLI (python -m fastcompress) sama-sama
+# memakai CompressionEngine dari paket ini. Engine baru dimuat saat namanya
+# pertama kali diakses, sehingga `import fastcompress` (mis. untuk versi)
+# tetap murah.
+
+APP_VERSION = "0.1.2"
+APP_CHANNEL = "Beta"
+
+_ENGINE_EXPORTS = ("CompressionEngine", "Job", "Event", "ENCODER_MAP", "HW_ENCODERS")
+
+__all__ = [
+    "APP_VERSION",
+    "APP_CHANNEL",
+    "CompressionEngine",
+    "Job",
+    "Event",
+    "ENCODER_MAP",
+    "HW_ENCODERS",
+]
+
+
+def __getattr__(name):
+    if name in _ENGINE_EXPORTS:
+        from . import engine
+        return getattr(engine, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
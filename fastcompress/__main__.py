@@ -0,0 +1,6 @@
+import sys
+
+# Import absolut: file ini juga dipakai sebagai skrip entry EXE CLI (PyInstaller).
+from fastcompress.cli import main
+
+sys.exit(main())
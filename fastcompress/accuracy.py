@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+# Nama File: fastcompress/accuracy.py
+# Kontrol akurasi ukuran. Setelah encode, ukuran output diverifikasi terhadap
+# target; rasio (bit video aktual / bit video yang diminta) disimpan per
+# encoder + preset + mode (dan per kelas resolusi/durasi) sebagai model
+# koreksi persisten. Job berikutnya memakai model itu untuk menyesuaikan
+# bitrate sebelum encode, dan bila hasil tetap di luar toleransi engine
+# melakukan paling banyak satu re-encode korektif.
+
+import json
+import os
+import threading
+import time
+
+from .paths import cache_dir
+
+MODEL_FILE = "size_model.json"
+# Bobot observasi baru pada rata-rata bergerak rasio.
+SMOOTHING = 0.3
+# Observasi minimal sebelum model dipakai.
+MIN_SAMPLES = 2
+# Batas faktor koreksi agar satu job aneh tidak merusak job berikutnya.
+MIN_SCALE = 0.7
+MAX_SCALE = 1.15
+# Toleransi: di atas target dikoreksi bila lebih dari OVERSHOOT_TOLERANCE (kira-kira
+# overhead container/mux yang tidak dikendalikan rate control); di bawah target
+# bila lebih dari UNDERSHOOT_TOLERANCE.
+OVERSHOOT_TOLERANCE = 0.01
+UNDERSHOOT_TOLERANCE = 0.10
+# Margin tambahan pada re-encode korektif setelah overshoot.
+CORRECTIVE_MARGIN = 0.98
+
+
+def height_class(height):
+    if not height:
+        return "unknown"
+    for limit in (480, 720, 1080, 1440):
+        if height <= limit:
+            return f"{limit}p"
+    return "2160p"
+
+
+def duration_class(duration):
+    if not duration:
+        return "unknown"
+    if duration < 60:
+        return "short"
+    if duration < 600:
+        return "medium"
+    return "long"
+
+
+def model_keys(job, media, mode):
+    """Kunci kasar (encoder|preset|mode) dan halus (+ resolusi & durasi)."""
+    coarse = f"{job.ffmpeg_encoder}|{job.preset}|{mode}"
+    fine = f"{coarse}|{height_class(media.height)}|{duration_class(media.duration)}"
+    return coarse, fine
+
+
+def size_verdict(actual_bytes, target_bytes):
+    """"over", "under" atau "ok"."""
+    if actual_bytes > target_bytes * (1 + OVERSHOOT_TOLERANCE):
+        return "over"
+    if actual_bytes < target_bytes * (1 - UNDERSHOOT_TOLERANCE):
+        return "under"
+    return "ok"
+
+
+def corrective_scale(actual_video_bits, desired_video_bits, verdict):
+    """Faktor pengali bitrate video untuk re-encode korektif."""
+    if actual_video_bits <= 0:
+        return 1.0
+    scale = desired_video_bits / actual_video_bits
+    if verdict == "over":
+        scale *= CORRECTIVE_MARGIN
+    return scale
+
+
+class SizeModel:
+    """Model koreksi per encoder/preset (file JSON di direktori cache)."""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(cache_dir(), MODEL_FILE)
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, data):
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, sort_keys=True)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+    def correction(self, job, media, mode):
+        """Kembalikan (faktor pengali bitrate video, jumlah observasi yang dipakai)."""
+        data = self._load()
+        for key in reversed(model_keys(job, media, mode)):
+            entry = data.get(key)
+            if entry and entry.get("count", 0) >= MIN_SAMPLES and entry.get("ratio"):
+                scale = min(MAX_SCALE, max(MIN_SCALE, 1.0 / entry["ratio"]))
+                return scale, entry["count"]
+        return 1.0, 0
+
+    def record(self, job, media, mode, requested_video_bits, actual_video_bits):
+        """Catat satu observasi encode (bit video diminta vs aktual)."""
+        if requested_video_bits <= 0 or actual_video_bits <= 0:
+            return
+        ratio = actual_video_bits / requested_video_bits
+        with self._lock:
+            data = self._load()
+            for key in model_keys(job, media, mode):
+                entry = data.get(key) or {"ratio": ratio, "count": 0}
+                entry["ratio"] = SMOOTHING * ratio + (1 - SMOOTHING) * entry["ratio"] if entry["count"] else ratio
+                entry["count"] += 1
+                entry["updated_at"] = time.time()
+                data[key] = entry
+            self._save(data)
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
@@ -0,0 +1,359 @@
+# -*- coding: utf-8 -*-
+# Nama File: fastcompress/benchmark.py
+# Benchmark encoder: sumber uji sintetis deterministik (lavfi color/testsrc2/
+# noise) dijalankan lewat pipeline CompressionEngine yang sebenarnya. Hasil
+# (fps, waktu per pass, puncak RSS, error ukuran vs target) disimpan ke JSON
+# dan dua file hasil bisa dibandingkan untuk mendeteksi regresi. Mode split
+# menjalankan N salinan kasus yang sama bersamaan (core dibagi N lewat
+# anggaran CPU JobQueue) dan melaporkan throughput agregat per pembagian.
+
+import itertools
+import json
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+
+from . import APP_VERSION
+from .defaults import (DEFAULT_DURATIONS, DEFAULT_RESOLUTIONS, DEFAULT_SOURCES, DEFAULT_TARGET_KBPS,
+                       FPS_TOLERANCE, SIZE_TOLERANCE_PCT, SOURCES)
+from .options import ENCODER_MAP
+from .planner import MIN_PLAN_DURATION
+from .scheduler import JobQueue
+from .system import CREATE_NO_WINDOW
+
+# Sumber, durasi, target dan toleransi default ada di defaults.py (dibaca parser CLI).
+# Sumber dibuat CBR beberapa kali lebih besar dari target agar jalur
+# stream-copy (remux / video-copy) tidak pernah terpilih.
+SOURCE_BITRATE_FACTOR = 4
+AUDIO_KBPS = 128
+# Format 2: peak_rss_mb = puncak RSS ffmpeg sendiri (VmHWM, lihat system.child_usage).
+# Di format 1 nilai itu di Linux berlantai RSS proses benchmark, jadi dibuang saat dimuat.
+RESULTS_FORMAT = 2
+
+
+def parse_resolution(text):
+    w, _, h = text.lower().partition("x")
+    if not (w.isdigit() and h.isdigit()):
+        raise ValueError(f"Resolusi tidak valid: {text!r} (format WxH)")
+    return int(w), int(h)
+
+
+def source_name(kind, resolution, duration):
+    return f"{kind}_{resolution}_{duration}s"
+
+
+def build_source_command(ffmpeg, kind, resolution, duration, path, target_kbps=DEFAULT_TARGET_KBPS):
+    """Perintah ffmpeg untuk membuat sumber uji (H.264 CBR + AAC) yang deterministik."""
+    src_k = target_kbps * SOURCE_BITRATE_FACTOR
+    return [
+        ffmpeg, "-hide_banner", "-v", "error", "-y",
+        "-f", "lavfi", "-i", SOURCES[kind].format(s=resolution, d=duration),
+        "-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=48000:d={duration}",
+        "-c:v", "libx264", "-preset", "ultrafast", "-threads", "1",
+        "-b:v", f"{src_k}k", "-minrate", f"{src_k}k", "-maxrate", f"{src_k}k",
+        "-bufsize", f"{src_k}k", "-x264-params", "nal-hrd=cbr",
+        "-c:a", "aac", "-b:a", f"{AUDIO_KBPS}k",
+        "-shortest", path
+    ]
+
+
+class PassTimer:
+    """Listener event engine untuk satu job: waktu tiap pass dari spawn sampai exit
+    proses ffmpeg, puncak RSS proses ffmpeg (bukan proses benchmark), serta
+    fps/speed terakhir per pass."""
+
+    def __init__(self, job):
+        self.job = job
+        self.passes = {}
+        self.peak_rss_kb = None
+
+    def __call__(self, event):
+        if event.job is not self.job:
+            return
+        if event.kind == "timing":
+            rss = event.data.get("peak_rss_kb")
+            if rss:
+                self.peak_rss_kb = max(self.peak_rss_kb or 0, rss)
+            stage = event.data.get("stage", "")
+            if stage.startswith("pass") and stage[4:].isdigit():
+                entry = self.passes.setdefault(int(stage[4:]), {})
+                entry["wall_s"] = entry.get("wall_s", 0.0) + (event.data.get("seconds") or 0.0)
+        elif event.kind == "progress" and "info" in event.data:
+            info = event.data["info"]
+            entry = self.passes.setdefault(info.pass_index, {})
+            if info.fps:
+                entry["fps"] = info.fps
+            if info.speed:
+                entry["speed"] = info.speed
+
+    @property
+    def peak_mb(self):
+        return round(self.peak_rss_kb / 1024, 1) if self.peak_rss_kb else None
+
+    def results(self):
+        return [{
+            "pass": index,
+            "wall_s": round(entry.get("wall_s", 0.0), 3),
+            "fps": entry.get("fps"),
+            "speed": entry.get("speed"),
+        } for index, entry in sorted(self.passes.items())]
+
+
+class BenchmarkCase:
+    """Satu kombinasi sumber x codec/encoder/preset yang diukur."""
+
+    def __init__(self, kind, resolution, duration, codec, encoder_type, algorithm, rate_mode="2pass"):
+        self.kind = kind
+        self.resolution = resolution
+        self.duration = duration
+        self.codec = codec
+        self.encoder_type = encoder_type
+        self.algorithm = algorithm
+        self.rate_mode = rate_mode
+
+    @property
+    def source(self):
+        return source_name(self.kind, self.resolution, self.duration)
+
+    @property
+    def key(self):
+        return "|".join((self.source, self.codec, self.encoder_type, self.algorithm, self.rate_mode))
+
+
+class BenchmarkRunner:
+    """Buat sumber uji, jalankan tiap kasus lewat engine.run, kumpulkan hasil."""
+
+    def __init__(self, engine, workdir=None, target_kbps=DEFAULT_TARGET_KBPS, keep=False):
+        self.engine = engine
+        self.target_kbps = target_kbps
+        self.keep = keep
+        self._own_workdir = workdir is None
+        self.workdir = workdir or tempfile.mkdtemp(prefix="fastcompress-bench-")
+        os.makedirs(self.workdir, exist_ok=True)
+
+    def source_path(self, case):
+        # Bitrate sumber ikut nama file agar --workdir bisa dipakai ulang antar target.
+        src_k = self.target_kbps * SOURCE_BITRATE_FACTOR
+        return os.path.join(self.workdir, f"{case.source}_{src_k}k.mp4")
+
+    def ensure_source(self, case):
+        path = self.source_path(case)
+        if os.path.exists(path):
+            return path
+        self.engine.log(f"Membuat sumber uji {case.source}...")
+        cmd = build_source_command(self.engine.ffmpeg, case.kind, case.resolution, case.duration,
+                                   path, self.target_kbps)
+        res = subprocess.run(cmd, capture_output=True, text=True, encoding="utf-8",
+                             errors="replace", creationflags=CREATE_NO_WINDOW)
+        if res.returncode != 0 or not os.path.exists(path):
+            err = (res.stderr or "").strip().splitlines()
+            raise RuntimeError(err[-1] if err else f"ffmpeg exit code {res.returncode}")
+        return path
+
+    def target_mb(self, case):
+        return (self.target_kbps + AUDIO_KBPS) * 1000 * case.duration / 8 / 1024 / 1024
+
+    def run_case(self, case):
+        result = {
+            "key": case.key, "source": case.source, "kind": case.kind,
+            "resolution": case.resolution, "duration": case.duration,
+            "codec": case.codec, "encoder_type": case.encoder_type,
+            "encoder": ENCODER_MAP[case.codec][case.encoder_type],
+            "algorithm": case.algorithm, "rate_mode": case.rate_mode,
+            "target_mb": round(self.target_mb(case), 4),
+        }
+        try:
+            source = self.ensure_source(case)
+        except Exception as e:
+            result.update(success=False, message=f"Gagal membuat sumber: {e}")
+            return result
+
+        from .engine import Job  # lazy: parser CLI mengimpor modul ini untuk default opsi
+        output = os.path.join(self.workdir, f"out_{case.key.replace('|', '_').replace(' ', '')}.mp4")
+        job = Job(source, result["target_mb"], output_path=output, codec=case.codec,
+                  encoder_type=case.encoder_type, algorithm=case.algorithm,
+                  audio_mode="Re-encode (AAC 128k)", audio_bitrate_k=AUDIO_KBPS,
+                  rate_mode=case.rate_mode)
+        timer = self.engine.subscribe(PassTimer(job))
+        started = time.monotonic()
+        try:
+            ok = self.engine.run(job)
+        finally:
+            self.engine.unsubscribe(timer)
+        wall = time.monotonic() - started
+
+        frames = case.duration * 30
+        result.update(
+            success=bool(ok), message=job.message,
+            wall_s=round(wall, 3),
+            fps=round(frames / wall, 2) if ok and wall > 0 else None,
+            passes=timer.results(),
+            peak_rss_mb=timer.peak_mb,
+        )
+        if ok and os.path.exists(output):
+            actual_mb = os.path.getsize(output) / 1024 / 1024
+            result["output_mb"] = round(actual_mb, 4)
+            result["size_error_pct"] = round((actual_mb - result["target_mb"]) / result["target_mb"] * 100, 2)
+            if not self.keep:
+                os.remove(output)
+        return result
+
+    def run_split(self, case, jobs):
+        """Jalankan `jobs` salinan kasus bersamaan (core dibagi rata); throughput agregat."""
+        result = {
+            "key": f"{case.key}|x{jobs}", "case": case.key, "jobs": jobs,
+            "encoder": ENCODER_MAP[case.codec][case.encoder_type],
+        }
+        try:
+            source = self.ensure_source(case)
+        except Exception as e:
+            result.update(success=False, message=f"Gagal membuat sumber: {e}")
+            return result
+        from .engine import Job
+        target_mb = round(self.target_mb(case), 4)
+        batch = [
+            Job(source, target_mb, codec=case.codec, encoder_type=case.encoder_type, algorithm=case.algorithm,
+                output_path=os.path.join(self.workdir, f"split_{jobs}_{i}.mp4"),
+                audio_mode="Re-encode (AAC 128k)", audio_bitrate_k=AUDIO_KBPS, rate_mode=case.rate_mode)
+            for i in range(jobs)
+        ]
+        pool = JobQueue(self.engine, slots={"Software": jobs})
+        result["threads_per_job"] = len(pool.cpu_budget.groups[0][0]) if pool.cpu_budget else None
+        started = time.monotonic()
+        pool.submit_many(batch)
+        pool.start()
+        pool.close()
+        ok = pool.wait()
+        wall = time.monotonic() - started
+        frames = case.duration * 30 * jobs
+        result.update(
+            success=ok, message="" if ok else "; ".join(sorted({j.message for j in batch if j.status != "done"})),
+            wall_s=round(wall, 3),
+            aggregate_fps=round(frames / wall, 2) if ok and wall > 0 else None,
+        )
+        if not self.keep:
+            for job in batch:
+                try:
+                    os.remove(job.output_path)
+                except OSError:
+                    pass
+        return result
+
+    def run(self, cases, on_result=None, splits=()):
+        results = []
+        try:
+            for index, case in enumerate(cases, start=1):
+                self.engine.log(f"\n=== Benchmark {index}/{len(cases)}: {case.key} ===")
+                result = self.run_case(case)
+                results.append(result)
+                if on_result is not None:
+                    on_result(result)
+                for jobs in splits:
+                    self.engine.log(f"\n=== Split {jobs} job paralel: {case.key} ===")
+                    result = self.run_split(case, jobs)
+                    results.append(result)
+                    if on_result is not None:
+                        on_result(result)
+        finally:
+            if self._own_workdir and not self.keep:
+                shutil.rmtree(self.workdir, ignore_errors=True)
+        return results
+
+
+def build_cases(sources=DEFAULT_SOURCES, resolutions=DEFAULT_RESOLUTIONS, durations=DEFAULT_DURATIONS,
+                codecs=("H.264",), encoder_types=("Software",), algorithms=("Standard",), rate_modes=("2pass",),
+                on_skip=None):
+    cases = []
+    for kind, res, dur, codec, enc, algo, mode in itertools.product(
+            sources, resolutions, durations, codecs, encoder_types, algorithms, rate_modes):
+        if kind not in SOURCES:
+            raise ValueError(f"Sumber tidak dikenal: {kind!r} (pilihan: {', '.join(SOURCES)})")
+        parse_resolution(res)
+        if enc not in ENCODER_MAP.get(codec, {}):
+            raise ValueError(f"Kombinasi codec/encoder tidak dikenal: {codec}/{enc}")
+        if mode == "fast" and int(dur) < MIN_PLAN_DURATION:
+            # Perencana akan jatuh ke 2-pass; kasus ini tidak mengukur apa pun yang baru.
+            if on_skip is not None:
+                on_skip(f"{source_name(kind, res, dur)} ({codec}/{enc}): durasi < {MIN_PLAN_DURATION:g} detik, "
+                        f"--fast-plan dilewati")
+            continue
+        cases.append(BenchmarkCase(kind, res, int(dur), codec, enc, algo, mode))
+    return cases
+
+
+def results_document(engine, results):
+    return {
+        "format": RESULTS_FORMAT,
+        "app_version": APP_VERSION,
+        "ffmpeg_version": engine.ffmpeg_version,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+
+
+def save_results(path, document):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2)
+
+
+def load_results(path):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or not isinstance(data.get("results"), list):
+        raise ValueError(f"Bukan file hasil benchmark: {path}")
+    if not isinstance(data.get("format"), int) or data["format"] < 2:
+        for result in data["results"]:
+            if isinstance(result, dict):
+                result.pop("peak_rss_mb", None)
+    return data
+
+
+def compare_results(base, new, fps_tolerance=FPS_TOLERANCE, size_tolerance=SIZE_TOLERANCE_PCT):
+    """Bandingkan dua dokumen hasil. Kembalikan list (key, jenis, pesan) regresi.
+
+    Hanya throughput dan akurasi ukuran yang dibandingkan; puncak RSS informatif saja.
+    """
+    base_by_key = {r["key"]: r for r in base["results"]}
+    regressions = []
+    for r in new["results"]:
+        b = base_by_key.get(r["key"])
+        if b is None:
+            continue
+        key = r["key"]
+        if b.get("success") and not r.get("success"):
+            regressions.append((key, "gagal", f"sebelumnya sukses, sekarang gagal: {r.get('message')}"))
+            continue
+        if not (b.get("success") and r.get("success")):
+            continue
+        fps = "aggregate_fps" if "jobs" in r else "fps"
+        if b.get(fps) and r.get(fps) is not None and r[fps] < b[fps] * (1 - fps_tolerance):
+            drop = (1 - r[fps] / b[fps]) * 100
+            regressions.append((key, "throughput", f"fps {b[fps]:g} -> {r[fps]:g} (-{drop:.1f}%)"))
+        b_err, r_err = b.get("size_error_pct"), r.get("size_error_pct")
+        if b_err is not None and r_err is not None and abs(r_err) > abs(b_err) + size_tolerance:
+            regressions.append((key, "akurasi", f"error ukuran {b_err:+.2f}% -> {r_err:+.2f}%"))
+    return regressions
+
+
+def format_result(result):
+    if not result.get("success"):
+        return f"{result['key']}: GAGAL ({result.get('message')})"
+    if "jobs" in result:
+        return (f"{result['key']}: {result['aggregate_fps']:g} fps agregat, {result['jobs']} job x "
+                f"{result['threads_per_job']} thread, {result['wall_s']:.1f}s")
+    passes = ", ".join(f"p{p['pass']} {p['wall_s']:.1f}s" for p in result.get("passes", []))
+    rss = f", RSS {result['peak_rss_mb']:g} MB" if result.get("peak_rss_mb") else ""
+    err = result.get("size_error_pct")
+    err_txt = f", error {err:+.2f}%" if err is not None else ""
+    return f"{result['key']}: {result['fps']:g} fps, {result['wall_s']:.1f}s ({passes}){rss}{err_txt}"
+
+
+def run_benchmark(engine, cases, workdir=None, target_kbps=DEFAULT_TARGET_KBPS, keep=False, on_result=None,
+                  splits=()):
+    runner = BenchmarkRunner(engine, workdir=workdir, target_kbps=target_kbps, keep=keep)
+    return results_document(engine, runner.run(cases, on_result=on_result, splits=splits))
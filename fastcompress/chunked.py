@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+# Nama File: fastcompress/chunked.py
+# Mode chunked: input dipotong di keyframe, tiap segmen di-encode 2-pass
+# dalam proses ffmpeg terpisah secara paralel, lalu digabung tanpa re-encode
+# (concat demuxer, -c:v copy). Membuat libx265/libaom-av1 memakai semua core.
+
+import bisect
+import decimal
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .cpubudget import encoder_thread_args
+from .system import CREATE_NO_WINDOW, NULL_DEVICE
+from .progress import EtaEstimator
+from .resume import JobState, prune_states
+
+# Segmen minimal (detik); segmen yang terlalu pendek merusak rate control 2-pass.
+MIN_CHUNK_SECONDS = 10.0
+# Thread per proses encoder; jumlah worker default = core / nilai ini.
+THREADS_PER_CHUNK = {"libx264": 4, "libx265": 4, "libaom-av1": 2}
+
+
+class Chunk:
+    def __init__(self, index, start, end, start_text, source_bytes=0):
+        self.index = index
+        self.start = start
+        self.end = end
+        # Awal segmen untuk -ss: pts_time ffprobe dikurangi awal timeline, tanpa pembulatan.
+        self.start_text = start_text
+        self.source_bytes = source_bytes
+        self.bitrate_k = 0
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+    def to_dict(self):
+        return {"index": self.index, "start": self.start, "end": self.end, "start_text": self.start_text,
+                "source_bytes": self.source_bytes, "bitrate_k": self.bitrate_k}
+
+    @classmethod
+    def from_dict(cls, data):
+        chunk = cls(data["index"], data["start"], data["end"], data["start_text"], data.get("source_bytes", 0))
+        chunk.bitrate_k = data["bitrate_k"]
+        return chunk
+
+
+def probe_keyframes(ffprobe, filepath, supervisor=None):
+    """Kembalikan list (pts_time_text, pts_time, size, is_key) paket video pertama."""
+    cmd = [
+        ffprobe, "-v", "error",
+        "-select_streams", "v:0",
+        "-show_entries", "packet=pts_time,size,flags",
+        "-of", "csv=p=0",
+        filepath
+    ]
+    if supervisor is not None:
+        res = supervisor.capture(cmd)
+        if res.returncode != 0:
+            raise subprocess.CalledProcessError(res.returncode, cmd, res.stdout, res.stderr)
+    else:
+        res = subprocess.run(cmd, capture_output=True, text=True, check=True, creationflags=CREATE_NO_WINDOW)
+    packets = []
+    for line in res.stdout.splitlines():
+        parts = line.strip().split(",")
+        if len(parts) < 3 or parts[0] in ("", "N/A"):
+            continue
+        try:
+            packets.append((parts[0], float(parts[0]), int(parts[1]), "K" in parts[2]))
+        except ValueError:
+            continue
+    packets.sort(key=lambda p: p[1])
+    return packets
+
+
+def _relative_time(text, origin):
+    """pts_time (teks) dikurangi origin secara eksak; kembalikan (teks, float)."""
+    try:
+        value = decimal.Decimal(text) - decimal.Decimal(repr(origin))
+    except decimal.InvalidOperation:
+        value = decimal.Decimal(repr(float(text) - origin))
+    return format(value, "f"), float(value)
+
+
+def plan_chunks(packets, duration, workers, min_chunk=MIN_CHUNK_SECONDS, start_time=None):
+    """Bagi durasi menjadi segmen yang batasnya selalu jatuh di keyframe.
+
+    -ss input ffmpeg relatif terhadap start_time container (MPEG-TS, edit list MP4
+    yang dipotong), jadi waktu paket digeser ke timeline yang mulai dari 0.
+    start_time None = pts paket pertama.
+    """
+    if start_time is None:
+        start_time = packets[0][1] if packets else 0.0
+    if start_time:
+        packets = [_relative_time(text, start_time) + (size, key) for text, _, size, key in packets]
+    keyframes = [(text, t) for text, t, _, key in packets if key]
+    count = max(1, min(int(duration // min_chunk), workers * 2))
+
+    boundaries = [("0", 0.0)]
+    for k in range(1, count):
+        ideal = duration * k / count
+        candidates = [
+            kf for kf in keyframes
+            if kf[1] >= boundaries[-1][1] + min_chunk / 2 and kf[1] <= duration - min_chunk / 2
+        ]
+        if not candidates:
+            break
+        best = min(candidates, key=lambda kf: abs(kf[1] - ideal))
+        if best[1] > boundaries[-1][1]:
+            boundaries.append(best)
+
+    chunks = []
+    for i, (text, start) in enumerate(boundaries):
+        end = boundaries[i + 1][1] if i + 1 < len(boundaries) else duration
+        chunks.append(Chunk(i, start, end, text))
+
+    # Ukuran paket sumber per segmen sebagai proxy kompleksitas.
+    starts = [c.start for c in chunks]
+    for _, t, size, _ in packets:
+        i = bisect.bisect_right(starts, t) - 1
+        if i >= 0:
+            chunks[i].source_bytes += size
+    return chunks
+
+
+def allocate_bits(chunks, video_bits_available, weighting="complexity"):
+    """Bagi anggaran bit video ke tiap segmen (berdasarkan durasi/kompleksitas)."""
+    total_duration = sum(c.duration for c in chunks) or 1.0
+    total_bytes = sum(c.source_bytes for c in chunks)
+    for chunk in chunks:
+        share = chunk.duration / total_duration
+        if weighting == "complexity" and total_bytes > 0:
+            # Campur 50/50 agar segmen sangat statis tidak kelaparan bit.
+            share = 0.5 * share + 0.5 * (chunk.source_bytes / total_bytes)
+        bits = video_bits_available * share
+        chunk.bitrate_k = max(1, int(bits / max(chunk.duration, 0.001) / 1000))
+    return chunks
+
+
+class ChunkedEncoder:
+    """Menjalankan encode chunked untuk satu Job lewat CompressionEngine."""
+
+    def __init__(self, engine, weighting="complexity"):
+        self.engine = engine
+        self.weighting = weighting
+        self._lock = threading.Lock()
+        self._done_seconds = {}
+        self._failed = False
+        self._eta = None
+
+    def default_workers(self, encoder, cores=None):
+        cores = cores or os.cpu_count() or 1
+        return max(1, cores // THREADS_PER_CHUNK.get(encoder, 4))
+
+    def thread_args(self, encoder, threads):
+        return encoder_thread_args(encoder, threads)
+
+    def build_chunk_commands(self, job, chunk, workdir, threads):
+        engine = self.engine
+        encoder = job.ffmpeg_encoder
+        passlog = os.path.join(workdir, f"chunk_{chunk.index:04d}")
+        common = [
+            engine.ffmpeg, "-y",
+            "-ss", chunk.start_text, "-i", job.input_path,
+            "-t", f"{chunk.duration:.6f}",
+            "-map", "0:v:0",
+            "-c:v", encoder,
+            "-b:v", f"{chunk.bitrate_k}k",
+        ] + self.thread_args(encoder, threads)
+        pass1_cmd = common + ["-pass", "1", "-passlogfile", passlog, "-preset", job.preset, "-an"]
+        pass2_cmd = common + ["-pass", "2", "-passlogfile", passlog, "-preset", job.preset, "-an"]
+        if encoder == "libaom-av1":
+            pass1_cmd.extend(["-cpu-used", "4"])
+            pass2_cmd.extend(["-cpu-used", "1"])
+        pass1_cmd.extend(["-f", "mp4", NULL_DEVICE])
+        pass2_cmd.append(self.chunk_path(workdir, chunk))
+        return pass1_cmd, pass2_cmd
+
+    def chunk_path(self, workdir, chunk):
+        return os.path.join(workdir, f"chunk_{chunk.index:04d}.mkv")
+
+    def build_concat_command(self, job, chunks, workdir, audio_bitrate_k):
+        list_path = os.path.join(workdir, "concat.txt")
+        with open(list_path, "w", encoding="utf-8") as f:
+            for chunk in chunks:
+                path = self.chunk_path(workdir, chunk).replace("'", "'\\''")
+                f.write(f"file '{path}'\n")
+        cmd = [
+            self.engine.ffmpeg, "-y",
+            "-f", "concat", "-safe", "0", "-i", list_path,
+            "-i", job.input_path,
+            "-map", "0:v:0", "-map", "1:a:0?",
+            "-c:v", "copy",
+        ]
+        if "Copy" in job.audio_mode:
+            cmd.extend(["-c:a", "copy"])
+        else:
+            cmd.extend(["-c:a", "aac", "-b:a", f"{audio_bitrate_k}k"])
+        cmd.append(job.output_path)
+        return cmd
+
+    def _report(self, job, total_work, key, info):
+        """Gabungkan progress semua segmen menjadi progress keseluruhan job."""
+        with self._lock:
+            self._done_seconds[key] = info.out_time_us / 1_000_000
+            done = sum(self._done_seconds.values())
+            eta = self._eta.update(done)
+        progress = min(1.0, done / total_work) if total_work > 0 else 0.0
+        info = info._replace(value=progress, eta=eta)
+        job.progress = progress
+        self.engine.emit("progress", job, value=progress, speed=info.speed, eta=eta, info=info)
+
+    def _encode_chunk(self, job, chunk, workdir, threads, total_work, state=None):
+        engine = self.engine
+        pass1_cmd, pass2_cmd = self.build_chunk_commands(job, chunk, workdir, threads)
+        for n, cmd in ((1, pass1_cmd), (2, pass2_cmd)):
+            # Satu segmen gagal -> segmen lain tidak perlu dilanjutkan.
+            if job.cancel_requested or self._failed:
+                return False
+            key = (chunk.index, n)
+            ok = engine.execute_ffmpeg_command(
+                cmd, chunk.duration, job, pass_index=n, pass_count=2, quiet=True, stage=f"chunk_pass{n}",
+                on_progress=lambda info, key=key: self._report(job, total_work, key, info)
+            )
+            if not ok:
+                self._failed = True
+                return False
+        if state is not None:
+            with self._lock:
+                state.mark_done(chunk.index)
+        engine.log(f"Segmen {chunk.index + 1} selesai ({chunk.start:.2f}s - {chunk.end:.2f}s, {chunk.bitrate_k}k)", job)
+        return True
+
+    def run(self, job, duration, video_bits_available, audio_bitrate_k):
+        engine = self.engine
+        encoder = job.ffmpeg_encoder
+        # Jatah CPU dari JobQueue (job software paralel) membatasi core yang dibagi ke segmen.
+        cores = job.cpu_alloc.threads if job.cpu_alloc is not None else (os.cpu_count() or 1)
+        workers = job.chunk_workers or self.default_workers(encoder, cores)
+        threads = max(1, cores // workers)
+
+        engine.log(f"Menggunakan encoder: {encoder} (mode chunked, {workers} worker x {threads} thread)", job)
+        # Mode resumable: rencana segmen dan checkpoint di direktori persisten.
+        state = JobState.open(job, job.media) if job.resumable else None
+        chunks = None
+        if state is not None:
+            removed = prune_states(keep=state.key)
+            if removed:
+                engine.log(f"Membersihkan {removed} state resume lama.", job)
+        if state is not None and state.resumed:
+            try:
+                chunks = [Chunk.from_dict(c) for c in state.chunks]
+            except (KeyError, TypeError, ValueError):
+                engine.log("State resume tidak valid, rencana segmen dibuat ulang.", job)
+            else:
+                state.done = {i for i in state.done if os.path.exists(self.chunk_path(state.dir, chunks[i]))}
+                state.save()  # perbarui updated_at: state aktif tidak ikut dibersihkan prune_states
+                engine.log(f"Melanjutkan job: {len(state.done)} dari {len(chunks)} segmen sudah selesai.", job)
+        if chunks is None:
+            engine.set_status("Status: Mencari keyframe...", job=job)
+            try:
+                packets = probe_keyframes(engine.ffprobe, job.input_path, engine.supervisor)
+            except Exception as e:
+                return engine.finish(job, False, f"Gagal membaca keyframe: {e}")
+
+            # Segmen minimal beberapa GOP agar batas keyframe selalu tersedia.
+            gop = job.media.keyframe_interval if job.media is not None else None
+            min_chunk = max(MIN_CHUNK_SECONDS, 2 * (gop or 0))
+            start_time = job.media.start_time if job.media is not None else None
+            chunks = allocate_bits(plan_chunks(packets, duration, workers, min_chunk, start_time),
+                                   video_bits_available, self.weighting)
+            engine.log(f"Dibagi menjadi {len(chunks)} segmen di batas keyframe.", job)
+            if state is not None:
+                state.chunks = [c.to_dict() for c in chunks]
+                state.done = set()
+                state.save()
+
+        workdir = state.dir if state is not None else tempfile.mkdtemp(prefix="chunks-", dir=job.workdir)
+        total_work = 2 * sum(c.duration for c in chunks)
+        self._eta = EtaEstimator(total_work)
+        pending = [c for c in chunks if state is None or c.index not in state.done]
+        for chunk in chunks:
+            if chunk not in pending:
+                self._done_seconds[(chunk.index, 1)] = self._done_seconds[(chunk.index, 2)] = chunk.duration
+        self._eta.update(sum(self._done_seconds.values()))
+        try:
+            engine.set_status(f"Status: Encode {len(pending)} segmen paralel...", job=job)
+            # Segmen terpanjang lebih dulu agar beban worker lebih rata.
+            ordered = sorted(pending, key=lambda c: c.duration, reverse=True)
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(
+                    lambda c: self._encode_chunk(job, c, workdir, threads, total_work, state), ordered
+                ))
+            if not all(results):
+                if state is not None:
+                    engine.log(f"Checkpoint disimpan ({len(state.done)} dari {len(chunks)} segmen); "
+                               "jalankan ulang job yang sama untuk melanjutkan.", job)
+                if job.canceled or job.cancel_requested:
+                    job.canceled = True
+                    return engine.finish(job, False, "Dibatalkan.")
+                return engine.finish(job, False, "Gagal meng-encode segmen.")
+
+            engine.set_status("Status: Menggabungkan segmen...", job=job)
+            engine.log("\n--- MENGGABUNGKAN SEGMEN ---", job)
+            concat_cmd = self.build_concat_command(job, chunks, workdir, audio_bitrate_k)
+            if not engine.execute_ffmpeg_command(concat_cmd, duration, job, on_progress=lambda info: None, stage="concat"):
+                if job.canceled:
+                    return engine.finish(job, False, "Dibatalkan.")
+                return engine.finish(job, False, "Gagal menggabungkan segmen.")
+            if state is not None:
+                state.remove()
+            # Verifikasi ukuran dan finish dilakukan engine.
+            return True
+        finally:
+            # Direktori state resumable dipertahankan sampai job sukses.
+            if state is None:
+                shutil.rmtree(workdir, ignore_errors=True)
@@ -0,0 +1,439 @@
+# -*- coding: utf-8 -*-
+# Nama File: fastcompress/cli.py
+# Entry point headless: python -m fastcompress compress <input> -t <MB>
+# Tidak mengimpor tkinter/customtkinter. Engine (asyncio, sqlite3) dan modul
+# per perintah (benchmark, watch, metrics, startup) diimpor di dalam fungsi
+# cmd_*; default opsi parser dibaca dari defaults.py, sehingga --version dan
+# --help start tanpa memuatnya (diperiksa oleh bench-startup).
+
+import argparse
+import json
+import os
+import signal
+import sys
+
+from . import APP_CHANNEL, APP_VERSION
+from .config import CONFIG_FILE, load_config
+from .defaults import (DEFAULT_DURATIONS, DEFAULT_RESOLUTIONS, DEFAULT_RUNS, DEFAULT_SLOTS, DEFAULT_SOURCES,
+                       DEFAULT_TARGET_KBPS, FPS_TOLERANCE, HEADLESS_BUDGET_MS, POLL_SECONDS, SETTLE_SECONDS,
+                       SIZE_TOLERANCE_PCT, SOURCES)
+from .options import ALGORITHMS, AUDIO_MODES, CODECS
+from .progress import format_eta
+
+
+class ConsolePrinter:
+    """Listener yang menulis event engine ke stderr."""
+
+    def __init__(self, stream=None, quiet=False, prefix_jobs=False):
+        self.stream = stream or sys.stderr
+        self.quiet = quiet
+        # Untuk batch: awali tiap baris dengan id job dan tanpa progress \r.
+        self.prefix_jobs = prefix_jobs
+        self._progress_shown = False
+
+    def __call__(self, event):
+        if event.kind == "log":
+            if self.quiet:
+                return
+            self._end_progress()
+            message = event.data["message"]
+            if self.prefix_jobs and event.job is not None:
+                message = "\n".join(f"[#{event.job.id}] {line}" for line in message.splitlines() if line)
+            print(message, file=self.stream)
+        elif event.kind == "progress":
+            if self.quiet or self.prefix_jobs or not self.stream.isatty():
+                return
+            value = event.data.get("value", 0.0)
+            speed = event.data.get("speed")
+            speed_txt = f" speed={speed:g}x" if speed else ""
+            eta_txt = f" ETA {format_eta(event.data['eta'])}" if event.data.get("eta") is not None else ""
+            self.stream.write(f"\r[{int(value * 100):3d}%]{speed_txt}{eta_txt}   ")
+            self.stream.flush()
+            self._progress_shown = True
+        elif event.kind == "finished":
+            self._end_progress()
+            status = "OK" if event.data["success"] else "GAGAL"
+            print(f"[{status}] {event.job.input_path}: {event.data['message']}", file=self.stream)
+
+    def _end_progress(self):
+        if self._progress_shown:
+            self.stream.write("\n")
+            self._progress_shown = False
+
+
+def attach_log_file(engine, path):
+    """Alirkan semua event log engine ke file yang dirotasi."""
+    from .logsink import LogSink
+    sink = LogSink(max_lines=0, log_file=path)
+
+    def listener(event):
+        if event.kind == "log":
+            message = event.data["message"]
+            sink.write(f"[#{event.job.id}] {message}" if event.job is not None else message)
+    engine.subscribe(listener)
+    return sink
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m fastcompress",
+        description=f"FastCompress {APP_CHANNEL} v{APP_VERSION} (headless)",
+    )
+    parser.add_argument("--version", action="version", version=f"FastCompress {APP_VERSION}")
+    sub = parser.add_subparsers(dest="command")
+
+    p = sub.add_parser("compress", help="Kompres file video ke target ukuran (MB)")
+    p.add_argument("inputs", nargs="*", metavar="input", help="File video input (boleh banyak)")
+    p.add_argument("-i", "--input-list", help="File teks berisi daftar input (satu path per baris)")
+    p.add_argument("-o", "--output", help="File output, hanya untuk satu input (default: <nama>_compressed.mp4)")
+    p.add_argument("-t", "--target-mb", type=float, help="Target ukuran dalam MB")
+    p.add_argument("-c", "--codec", choices=CODECS)
+    p.add_argument("-e", "--encoder", dest="encoder_type",
+                   help="Software / NVIDIA / AMD / Intel")
+    p.add_argument("-a", "--algorithm", choices=ALGORITHMS)
+    p.add_argument("--audio-mode", choices=AUDIO_MODES)
+    p.add_argument("--config", default=CONFIG_FILE,
+                   help=f"File konfigurasi default (default: {CONFIG_FILE})")
+    p.add_argument("--ffmpeg", default="ffmpeg")
+    p.add_argument("--ffprobe", default="ffprobe")
+    p.add_argument("-q", "--quiet", action="store_true", help="Hanya tampilkan hasil akhir")
+    p.add_argument("--log-file", help="Tulis log lengkap ke file (dirotasi otomatis)")
+    p.add_argument("--chunked", action="store_true", default=None,
+                   help="Encode segmen paralel di semua core (libx264/libx265/libaom-av1)")
+    p.add_argument("--resumable", action="store_true", default=None,
+                   help="Encode segmen ber-checkpoint; jalankan ulang perintah yang sama untuk melanjutkan")
+    p.add_argument("--chunk-workers", type=int, help="Jumlah proses segmen paralel (default: core/4)")
+    p.add_argument("--fast-plan", dest="rate_mode", action="store_const", const="fast",
+                   help="Prediksi ukuran dari sampel pendek lalu encode satu pass (bukan 2-pass penuh)")
+    p.add_argument("--scratch-dir",
+                   help="Induk direktori kerja per job (pass log, segmen); \"tmpfs\" = /dev/shm")
+    p.add_argument("--output-cache", action="store_true", default=None,
+                   help="Ambil hasil job identik dari cache output (tanpa encode ulang)")
+    p.add_argument("--no-size-correction", dest="size_correction", action="store_false", default=None,
+                   help="Tanpa model koreksi ukuran dan re-encode korektif")
+    p.add_argument("--metrics-file", help="Tambahkan metrik per job ke file JSONL")
+    p.add_argument("--metrics-prom", help="Tulis metrik ke file teks Prometheus (textfile collector)")
+    p.add_argument("--stream", action="store_true", default=None,
+                   help="Mode streaming: input/output boleh pipe atau '-' (stdin/stdout), output fragmented MP4")
+    p.add_argument("--duration", type=float,
+                   help="Durasi sumber streaming (detik) untuk anggaran bitrate; tanpa ini awal stream di-probe")
+    p.add_argument("--sw-slots", type=int, help=f"Maks. job encoder software paralel (default: {DEFAULT_SLOTS['Software']})")
+    p.add_argument("--hw-slots", action="append", default=[], metavar="BRAND=N",
+                   help="Maks. job paralel per brand hardware, mis. NVIDIA=3 (boleh diulang)")
+
+    p = sub.add_parser("benchmark", help="Ukur throughput & akurasi ukuran dengan sumber uji sintetis")
+    p.add_argument("-o", "--output", default="benchmark_results.json", help="File hasil JSON")
+    p.add_argument("--sources", default=",".join(DEFAULT_SOURCES),
+                   help=f"Jenis sumber lavfi, dipisah koma ({', '.join(SOURCES)})")
+    p.add_argument("--resolutions", default=",".join(DEFAULT_RESOLUTIONS), help="Daftar WxH, dipisah koma")
+    p.add_argument("--durations", default=",".join(map(str, DEFAULT_DURATIONS)),
+                   help="Durasi sumber (detik), dipisah koma")
+    p.add_argument("-c", "--codec", action="append", choices=CODECS, help="Codec (boleh diulang; default H.264)")
+    p.add_argument("-e", "--encoder", dest="encoder_type", action="append",
+                   help="Software / NVIDIA / AMD / Intel (boleh diulang; default Software)")
+    p.add_argument("-a", "--algorithm", action="append", choices=ALGORITHMS,
+                   help="Preset (boleh diulang; default Standard)")
+    p.add_argument("--fast-plan", action="store_true", help="Ukur juga mode perencanaan cepat")
+    p.add_argument("--target-kbps", type=int, default=DEFAULT_TARGET_KBPS, help="Bitrate video target")
+    p.add_argument("--splits", default="",
+                   help="Ukur juga N job paralel per kasus dengan core dibagi N, mis. 2,4 (throughput agregat)")
+    p.add_argument("--workdir", help="Direktori sumber uji (dipakai ulang antar run bila diisi)")
+    p.add_argument("--keep", action="store_true", help="Jangan hapus sumber uji dan output")
+    p.add_argument("--ffmpeg", default="ffmpeg")
+    p.add_argument("--ffprobe", default="ffprobe")
+    p.add_argument("-q", "--quiet", action="store_true", help="Hanya tampilkan ringkasan per kasus")
+
+    p = sub.add_parser("bench-compare", help="Bandingkan dua file hasil benchmark dan tandai regresi")
+    p.add_argument("base", help="Hasil acuan (JSON)")
+    p.add_argument("new", help="Hasil baru (JSON)")
+    p.add_argument("--fps-tolerance", type=float, default=FPS_TOLERANCE,
+                   help=f"Penurunan fps yang ditoleransi (pecahan, default {FPS_TOLERANCE:.2f})")
+    p.add_argument("--size-tolerance", type=float, default=SIZE_TOLERANCE_PCT,
+                   help=f"Kenaikan |error ukuran| yang ditoleransi (poin persen, default {SIZE_TOLERANCE_PCT:g})")
+
+    p = sub.add_parser("bench-startup", help="Ukur cold start perintah headless terhadap anggaran waktu")
+    p.add_argument("args", nargs=argparse.REMAINDER, metavar="perintah",
+                   help="Argumen CLI yang diukur (default: --version)")
+    p.add_argument("--runs", type=int, default=DEFAULT_RUNS, help=f"Jumlah run (default: {DEFAULT_RUNS})")
+    p.add_argument("--budget-ms", type=float, default=HEADLESS_BUDGET_MS,
+                   help=f"Anggaran median cold start (default: {HEADLESS_BUDGET_MS} ms)")
+    p.add_argument("-o", "--output", help="Simpan hasil ke file JSON")
+
+    p = sub.add_parser("watch", help="Pantau direktori dan kompres video baru secara otomatis")
+    p.add_argument("directories", nargs="+", metavar="dir", help="Direktori input yang dipantau")
+    p.add_argument("-o", "--output-dir", help="Direktori output (default: di samping file input)")
+    p.add_argument("--config", default=CONFIG_FILE,
+                   help=f"Pengaturan kompresi, dibaca ulang tiap siklus (default: {CONFIG_FILE})")
+    p.add_argument("--index", help="File indeks SQLite status file (default: di direktori cache)")
+    p.add_argument("--settle", type=float, default=SETTLE_SECONDS,
+                   help="Detik tanpa perubahan ukuran sebelum file diproses")
+    p.add_argument("--poll", type=float, default=POLL_SECONDS, help="Interval pindai (detik)")
+    p.add_argument("--ffmpeg", default="ffmpeg")
+    p.add_argument("--ffprobe", default="ffprobe")
+    p.add_argument("-q", "--quiet", action="store_true", help="Hanya tampilkan hasil akhir")
+    p.add_argument("--log-file", help="Tulis log lengkap ke file (dirotasi otomatis)")
+    p.add_argument("--scratch-dir", help="Induk direktori kerja per job")
+    p.add_argument("--output-cache", action="store_true", default=None, help="Gunakan cache output")
+    p.add_argument("--metrics-file", help="Tambahkan metrik per job ke file JSONL")
+    p.add_argument("--metrics-prom", help="Tulis metrik ke file teks Prometheus (textfile collector)")
+    p.add_argument("--sw-slots", type=int, help=f"Maks. job encoder software paralel (default: {DEFAULT_SLOTS['Software']})")
+    p.add_argument("--hw-slots", action="append", default=[], metavar="BRAND=N",
+                   help="Maks. job paralel per brand hardware, mis. NVIDIA=3 (boleh diulang)")
+
+    p = sub.add_parser("cache", help="Statistik atau kosongkan cache output")
+    p.add_argument("action", choices=("stats", "clear"))
+    p.add_argument("--config", default=CONFIG_FILE)
+
+    p = sub.add_parser("detect", help="Deteksi encoder hardware yang tersedia")
+    p.add_argument("--force", action="store_true", help="Abaikan cache dan uji ulang semua encoder")
+    p.add_argument("--ffmpeg", default="ffmpeg")
+    return parser
+
+
+def size_model_option(config, enabled=None):
+    """None = model koreksi ukuran bawaan; False = nonaktif."""
+    if enabled is None:
+        enabled = config.get("size_correction", True)
+    return None if enabled else False
+
+
+def read_input_list(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def parse_slots(args):
+    slots = {}
+    if args.sw_slots:
+        slots["Software"] = args.sw_slots
+    for item in args.hw_slots:
+        brand, _, n = item.partition("=")
+        if not n.isdigit():
+            raise SystemExit(f"--hw-slots tidak valid: {item!r} (format BRAND=N)")
+        slots[brand] = int(n)
+    return slots
+
+
+def cmd_compress(args):
+    from . import metrics, outputcache, supervisor
+    from .engine import CompressionEngine, Job
+    from .scheduler import JobQueue
+
+    inputs = list(args.inputs)
+    if args.input_list:
+        inputs.extend(read_input_list(args.input_list))
+    if not inputs:
+        raise SystemExit("Tidak ada file input.")
+    if args.output and len(inputs) > 1:
+        raise SystemExit("--output hanya bisa dipakai dengan satu input.")
+    if len(inputs) > 1 and (args.stream or "-" in inputs):
+        raise SystemExit("Mode streaming hanya untuk satu input.")
+
+    config = load_config(args.config)
+    jobs = [
+        Job.from_config(
+            path, config,
+            output_path=args.output,
+            target_mb=args.target_mb,
+            codec=args.codec,
+            encoder_type=args.encoder_type,
+            algorithm=args.algorithm,
+            audio_mode=args.audio_mode,
+            chunked=args.chunked,
+            chunk_workers=args.chunk_workers,
+            rate_mode=args.rate_mode,
+            resumable=args.resumable,
+            streaming=args.stream,
+            duration=args.duration,
+        )
+        for path in inputs
+    ]
+    printer = ConsolePrinter(quiet=args.quiet, prefix_jobs=len(jobs) > 1)
+    engine = CompressionEngine(ffmpeg=args.ffmpeg, ffprobe=args.ffprobe, listener=printer,
+                               scratch_dir=args.scratch_dir or config.get("scratch_dir"),
+                               output_cache=outputcache.from_config(config, args.output_cache),
+                               size_model=size_model_option(config, args.size_correction),
+                               supervisor=supervisor.from_config(config))
+    log_file = args.log_file or config.get("log_file")
+    if log_file:
+        attach_log_file(engine, log_file)
+    collector = metrics.from_config(config, args.metrics_file, args.metrics_prom)
+    if collector is not None:
+        engine.subscribe(collector)
+    if not engine.check_ffmpeg():
+        return 2
+
+    if len(jobs) == 1:
+        job = jobs[0]
+        # Ctrl+C -> batalkan job (ffmpeg dihentikan), bukan traceback.
+        signal.signal(signal.SIGINT, lambda *_: engine.cancel(job))
+        return 0 if engine.run(job) else 1
+
+    pool = JobQueue(engine, slots=parse_slots(args))
+    signal.signal(signal.SIGINT, lambda *_: pool.cancel_all())
+    pool.submit_many(jobs)
+    pool.start()
+    pool.close()
+    # wait() dengan timeout agar Ctrl+C tetap diproses di thread utama.
+    while any(not job.finished for job in jobs):
+        pool.wait(timeout=0.5)
+    counts = pool.counts()
+    print(f"Batch selesai: {counts.get('done', 0)} sukses, {counts.get('failed', 0)} gagal, "
+          f"{counts.get('canceled', 0)} dibatalkan dari {len(jobs)} file.", file=sys.stderr)
+    return 0 if counts.get("done", 0) == len(jobs) else 1
+
+
+def _split_list(text):
+    return [item.strip() for item in text.split(",") if item.strip()]
+
+
+def cmd_benchmark(args):
+    from . import benchmark
+    from .engine import CompressionEngine
+
+    try:
+        cases = benchmark.build_cases(
+            sources=_split_list(args.sources),
+            resolutions=_split_list(args.resolutions),
+            durations=[int(d) for d in _split_list(args.durations)],
+            codecs=args.codec or ("H.264",),
+            encoder_types=args.encoder_type or ("Software",),
+            algorithms=args.algorithm or ("Standard",),
+            rate_modes=("2pass", "fast") if args.fast_plan else ("2pass",),
+            on_skip=lambda message: print(f"PERINGATAN: {message}", file=sys.stderr),
+        )
+        splits = [int(n) for n in _split_list(args.splits)]
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    # Tanpa model koreksi ukuran: benchmark mengukur akurasi encoder apa adanya.
+    engine = CompressionEngine(ffmpeg=args.ffmpeg, ffprobe=args.ffprobe, listener=ConsolePrinter(quiet=args.quiet),
+                               size_model=False)
+    if not engine.check_ffmpeg():
+        return 2
+    document = benchmark.run_benchmark(
+        engine, cases, workdir=args.workdir, target_kbps=args.target_kbps, keep=args.keep,
+        on_result=lambda r: print(benchmark.format_result(r), file=sys.stderr), splits=splits)
+    benchmark.save_results(args.output, document)
+    failed = sum(1 for r in document["results"] if not r.get("success"))
+    print(f"Hasil benchmark ({len(document['results'])} hasil, {failed} gagal) disimpan di {args.output}", file=sys.stderr)
+    return 0 if not failed else 1
+
+
+def cmd_bench_compare(args):
+    from . import benchmark
+
+    try:
+        base = benchmark.load_results(args.base)
+        new = benchmark.load_results(args.new)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"Tidak bisa membaca hasil: {e}")
+    regressions = benchmark.compare_results(base, new, args.fps_tolerance, args.size_tolerance)
+    for key, kind, message in regressions:
+        print(f"REGRESI [{kind}] {key}: {message}")
+    if not regressions:
+        print("Tidak ada regresi.")
+    return 1 if regressions else 0
+
+
+def cmd_bench_startup(args):
+    from . import startup
+
+    command = args.args[1:] if args.args[:1] == ["--"] else args.args
+    result = startup.measure(command or ["--version"], runs=args.runs)
+    print(startup.format_report(result))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    problems = startup.check_budget(result, args.budget_ms)
+    for problem in problems:
+        print(f"MELEBIHI ANGGARAN: {problem}")
+    if not problems:
+        print(f"Dalam anggaran ({args.budget_ms:g} ms).")
+    return 1 if problems else 0
+
+
+def cmd_watch(args):
+    from . import metrics, outputcache, supervisor, watch
+    from .engine import CompressionEngine
+
+    config = load_config(args.config)
+    engine = CompressionEngine(ffmpeg=args.ffmpeg, ffprobe=args.ffprobe,
+                               listener=ConsolePrinter(quiet=args.quiet, prefix_jobs=True),
+                               scratch_dir=args.scratch_dir or config.get("scratch_dir"),
+                               output_cache=outputcache.from_config(config, args.output_cache),
+                               size_model=size_model_option(config),
+                               supervisor=supervisor.from_config(config))
+    log_file = args.log_file or config.get("log_file")
+    if log_file:
+        attach_log_file(engine, log_file)
+    collector = metrics.from_config(config, args.metrics_file, args.metrics_prom)
+    if collector is not None:
+        engine.subscribe(collector)
+    if not engine.check_ffmpeg():
+        return 2
+    for directory in args.directories:
+        if not os.path.isdir(directory):
+            raise SystemExit(f"Bukan direktori: {directory}")
+    watcher = watch.WatchFolder(
+        engine, args.directories, config_path=args.config,
+        index=watch.WatchIndex(args.index) if args.index else None,
+        output_dir=args.output_dir, settle_seconds=args.settle, poll_seconds=args.poll,
+        slots=parse_slots(args))
+    signal.signal(signal.SIGINT, lambda *_: watcher.stop())
+    watcher.run()
+    counts = watcher.index.counts()
+    print(f"Watch berhenti: {counts.get('done', 0)} selesai, {counts.get('failed', 0)} gagal, "
+          f"{counts.get('pending', 0)} menunggu.", file=sys.stderr)
+    return 0
+
+
+def cmd_cache(args):
+    from . import outputcache
+
+    cache = outputcache.from_config(load_config(args.config), enabled=True)
+    if cache is None:
+        raise SystemExit("Cache output tidak bisa dibuka.")
+    if args.action == "clear":
+        cache.clear()
+        print("Cache output dikosongkan.")
+        return 0
+    st = cache.stats()
+    print(f"Lokasi   : {cache.root}")
+    print(f"Entri    : {st['entries']} ({st['bytes'] / 1024 / 1024:.1f} / {st['max_bytes'] / 1024 / 1024:.0f} MB)")
+    print(f"Hit/miss : {st['hits']}/{st['misses']} (hit rate {st['hit_rate']:.0%})")
+    print(f"Eviksi   : {st['evictions']}")
+    return 0
+
+
+def cmd_detect(args):
+    from .engine import CompressionEngine
+
+    engine = CompressionEngine(ffmpeg=args.ffmpeg, listener=ConsolePrinter())
+    if not engine.check_ffmpeg():
+        return 2
+    available = engine.detect_hw_encoders(force=args.force)
+    for codec, brands in available.items():
+        print(f"{codec}: {', '.join(['Software'] + brands)}")
+    return 0
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "compress":
+        return cmd_compress(args)
+    if args.command == "detect":
+        return cmd_detect(args)
+    if args.command == "watch":
+        return cmd_watch(args)
+    if args.command == "cache":
+        return cmd_cache(args)
+    if args.command == "benchmark":
+        return cmd_benchmark(args)
+    if args.command == "bench-compare":
+        return cmd_bench_compare(args)
+    if args.command == "bench-startup":
+        return cmd_bench_startup(args)
+    parser.print_help()
+    return 0
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+# Nama File: fastcompress/config.py
+# Simpan / muat konfigurasi fastcompress_config.json (dipakai GUI dan CLI).
+
+import json
+import os
+
+CONFIG_FILE = "fastcompress_config.json"
+
+CONFIG_KEYS = ("codec", "encoder_type", "algorithm", "audio_mode", "target_mb", "chunked", "rate_mode",
+               "resumable")
+# Kunci opsional (tidak diatur dari UI):
+#   log_max_lines : batas baris log di memori/textbox (default 5000)
+#   log_file      : path log lengkap, dirotasi otomatis (default: tidak ada)
+#   scratch_dir   : induk direktori kerja per job, mis. SSD cepat atau "tmpfs"
+#                   untuk /dev/shm (default: direktori temp sistem)
+#   output_cache  : true = ambil hasil job identik dari cache output (default: false)
+#   output_cache_max_mb : batas ukuran cache output, eviksi LRU (default 2048)
+#   size_correction : false = tanpa model koreksi ukuran & re-encode korektif (default: true)
+#   metrics_file  : file JSONL metrik per job (default: tidak ada)
+#   metrics_prom_file : file teks Prometheus untuk textfile collector (default: tidak ada)
+#   process_timeout : batas waktu satu proses ffmpeg/ffprobe dalam detik (default: tanpa batas)
+#   process_idle_timeout : hentikan ffmpeg yang tidak menulis output selama N detik (default: tanpa batas)
+
+
+def parse_target_mb(value):
+    """Normalisasi target_mb dari input pengguna/config ("5,5", " 50 ", 12) -> float > 0, atau None."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        value = value.strip().replace(",", ".")
+    try:
+        target = float(value)
+    except (TypeError, ValueError):
+        return None
+    # NaN/inf juga ditolak.
+    return target if 0 < target < float("inf") else None
+
+
+def load_config(path=CONFIG_FILE):
+    """Baca konfigurasi; kembalikan dict kosong jika file tidak ada/rusak."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            return data
+    except Exception:
+        pass
+    return {}
+
+
+def save_config(data, path=CONFIG_FILE):
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+    except Exception:
+        pass
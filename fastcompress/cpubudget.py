@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+# Nama File: fastcompress/cpubudget.py
+# Anggaran thread CPU untuk encode software yang berjalan bersamaan. Core
+# host (per node NUMA, core fisik utuh beserta hyperthread-nya) dibagi menjadi
+# kelompok disjoint sebanyak slot Software di JobQueue. Tiap job mendapat satu
+# kelompok: jumlah thread encoder (-threads / x265 pools=) disesuaikan dan
+# proses ffmpeg-nya di-pin ke CPU kelompok itu, sehingga job paralel tidak
+# saling berebut core dan cache.
+
+import glob
+import os
+import re
+import threading
+from collections import namedtuple
+
+# Encoder software yang jumlah thread-nya diatur anggaran.
+THREADED_ENCODERS = ("libx264", "libx265", "libaom-av1")
+
+# Satu jatah CPU untuk satu job.
+#   cpus    : tuple nomor CPU logis
+#   threads : jumlah thread encoder (= jumlah CPU)
+#   node    : node NUMA (None bila kelompok lintas node / tidak diketahui)
+#   pin     : True = proses ffmpeg di-pin ke cpus
+CpuAllocation = namedtuple("CpuAllocation", ["cpus", "threads", "node", "pin"])
+
+
+def parse_cpulist(text):
+    """'0-3,8-11' -> [0, 1, 2, 3, 8, 9, 10, 11]."""
+    cpus = []
+    for part in text.strip().split(","):
+        if not part:
+            continue
+        lo, _, hi = part.partition("-")
+        cpus.extend(range(int(lo), int(hi or lo) + 1))
+    return cpus
+
+
+def _read(path):
+    try:
+        with open(path, "r") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def allowed_cpus():
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def cpu_topology():
+    """List node NUMA -> list core fisik -> list CPU logis (hanya CPU yang diizinkan)."""
+    allowed = set(allowed_cpus())
+    nodes = []
+    for path in sorted(glob.glob("/sys/devices/system/node/node[0-9]*/cpulist"),
+                       key=lambda p: int(re.search(r"node(\d+)", p).group(1))):
+        text = _read(path)
+        cpus = [c for c in parse_cpulist(text) if c in allowed] if text else []
+        if cpus:
+            nodes.append(cpus)
+    if not nodes:
+        nodes = [sorted(allowed)]
+
+    topology = []
+    for cpus in nodes:
+        cores = {}
+        for cpu in cpus:
+            text = _read(f"/sys/devices/system/cpu/cpu{cpu}/topology/thread_siblings_list")
+            siblings = [c for c in parse_cpulist(text) if c in allowed] if text else [cpu]
+            cores.setdefault(min(siblings or [cpu]), []).append(cpu)
+        topology.append([sorted(core) for _, core in sorted(cores.items())])
+    return topology
+
+
+def _split(items, parts):
+    """Bagi list menjadi `parts` potongan berurutan yang hampir sama besar.
+
+    Tidak pernah lebih dari len(items) potongan: potongan tidak boleh berbagi item.
+    """
+    parts = min(parts, len(items))
+    size, extra = divmod(len(items), parts)
+    out, start = [], 0
+    for i in range(parts):
+        end = start + size + (1 if i < extra else 0)
+        out.append(items[start:end])
+        start = end
+    return out
+
+
+def partition_cpus(topology, parts):
+    """Bagi CPU menjadi `parts` kelompok disjoint (list (cpus, node)).
+
+    Kelompok sebisa mungkin berada di satu node NUMA dan berisi core fisik utuh.
+    Bila `parts` melebihi jumlah CPU, hasilnya satu kelompok per CPU (lebih
+    sedikit dari `parts`); pemanggil menjalankan worker sebanyak kelompok.
+    """
+    nodes = [node for node in topology if node]
+    sizes = [sum(len(core) for core in node) for node in nodes]
+    parts = min(parts, sum(sizes))
+    if parts <= len(nodes):
+        groups = [([], set()) for _ in range(parts)]
+        for index, node in enumerate(nodes):
+            cpus, owners = groups[index % parts]
+            cpus.extend(cpu for core in node for cpu in core)
+            owners.add(index)
+        return [(sorted(cpus), owners.pop() if len(owners) == 1 else None) for cpus, owners in groups]
+
+    # Lebih banyak kelompok daripada node: jatah tiap node sebanding jumlah core-nya.
+    shares = [0] * len(nodes)
+    for _ in range(parts):
+        room = [i for i in range(len(nodes)) if shares[i] < sizes[i]]
+        best = max(room, key=lambda i: len(nodes[i]) / (shares[i] + 1))
+        shares[best] += 1
+    result = []
+    for index, (node, share) in enumerate(zip(nodes, shares)):
+        if share == 0:
+            continue
+        units = node if share <= len(node) else [[cpu] for core in node for cpu in core]
+        for chunk in _split(units, share):
+            result.append((sorted(cpu for unit in chunk for cpu in unit), index))
+    return result
+
+
+def encoder_thread_args(encoder, threads):
+    """Argumen ffmpeg untuk membatasi thread encoder software."""
+    if encoder == "libx265":
+        return ["-x265-params", f"pools={threads}"]
+    if encoder == "libaom-av1":
+        return ["-threads", str(threads), "-row-mt", "1"]
+    return ["-threads", str(threads)]
+
+
+def apply_thread_args(command, threads):
+    """Sisipkan batas thread setelah '-c:v <encoder>' bila belum diatur perintahnya."""
+    try:
+        index = command.index("-c:v") + 1
+    except ValueError:
+        return command
+    encoder = command[index] if index < len(command) else None
+    if encoder not in THREADED_ENCODERS:
+        return command
+    if "-threads" in command or any("pools=" in str(arg) for arg in command):
+        return command  # sudah diatur (mis. mode chunked)
+    command = list(command)
+    if encoder == "libx265" and "-x265-params" in command:
+        at = command.index("-x265-params") + 1
+        command[at] = f"pools={threads}:{command[at]}"
+        return command
+    command[index + 1:index + 1] = encoder_thread_args(encoder, threads)
+    return command
+
+
+class CpuBudget:
+    """Kelompok CPU tetap untuk `parts` job software paralel; acquire/release per job.
+
+    len(groups) bisa lebih kecil dari `parts` bila CPU yang tersedia lebih sedikit.
+    """
+
+    def __init__(self, parts, topology=None, pin=True):
+        self.topology = topology if topology is not None else cpu_topology()
+        self.pin = pin and (hasattr(os, "sched_setaffinity") or os.name == "nt")
+        self.groups = partition_cpus(self.topology, max(1, parts))
+        self._free = list(range(len(self.groups)))
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Ambil satu kelompok CPU; None bila semua sedang dipakai."""
+        with self._lock:
+            if not self._free:
+                return None
+            index = self._free.pop(0)
+        cpus, node = self.groups[index]
+        return CpuAllocation(tuple(cpus), len(cpus), node, self.pin)
+
+    def release(self, allocation):
+        if allocation is None:
+            return
+        with self._lock:
+            for index, (cpus, _) in enumerate(self.groups):
+                if tuple(cpus) == allocation.cpus and index not in self._free:
+                    self._free.append(index)
+                    self._free.sort()
+                    return
+
+
+def describe(allocation):
+    cpus = allocation.cpus
+    ranges, start = [], None
+    for i, cpu in enumerate(cpus):
+        if start is None:
+            start = cpu
+        if i + 1 == len(cpus) or cpus[i + 1] != cpu + 1:
+            ranges.append(f"{start}-{cpu}" if cpu != start else str(cpu))
+            start = None
+    node = f", node {allocation.node}" if allocation.node is not None else ""
+    return f"{allocation.threads} thread (CPU {','.join(ranges)}{node})"
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+# Nama File: fastcompress/defaults.py
+# Nilai default perintah CLI (benchmark, watch, bench-startup, slot antrean).
+# Seperti options.py, modul ini sengaja tanpa import lain: parser CLI membaca
+# default dari sini sehingga --version/--help tidak memuat benchmark, watch
+# (sqlite3) atau engine (asyncio). Modul pemiliknya mengimpor ulang nama ini.
+
+# --- Benchmark ---
+# Filter lavfi per jenis sumber: {s}=WxH, {d}=durasi. color = konten statis
+# (paling mudah), testsrc2 = gerakan/grafik, noise = hampir tak terkompresi.
+SOURCES = {
+    "color": "color=c=0x336699:s={s}:r=30:d={d}",
+    "testsrc2": "testsrc2=s={s}:r=30:d={d}",
+    "noise": "color=c=gray:s={s}:r=30:d={d},noise=alls=60:allf=t+u",
+}
+DEFAULT_SOURCES = ("color", "testsrc2", "noise")
+DEFAULT_RESOLUTIONS = ("1280x720", "1920x1080")
+# 45 detik: cukup panjang untuk perencana ukuran (lihat planner.MIN_PLAN_DURATION).
+DEFAULT_DURATIONS = (10, 45)
+# Bitrate video target benchmark.
+DEFAULT_TARGET_KBPS = 1500
+# Batas default regresi untuk bench-compare.
+FPS_TOLERANCE = 0.10        # fps turun > 10%
+SIZE_TOLERANCE_PCT = 2.0    # |error ukuran| naik > 2 poin persen
+
+# --- Watch folder ---
+# File dianggap selesai disalin bila ukuran & mtime tidak berubah selama ini (detik).
+SETTLE_SECONDS = 10.0
+POLL_SECONDS = 2.0
+
+# --- Antrean ---
+# Slot default per kelas sumber daya. Software = encoder CPU (libx264/libx265/
+# libaom-av1); sisanya mengikuti nama brand di available_hw_encoders.
+DEFAULT_SLOTS = {"Software": 1, "NVIDIA": 3, "Intel": 2, "AMD": 2}
+
+# --- Cold start ---
+# Anggaran waktu start (ms) perintah headless dan jendela GUI.
+HEADLESS_BUDGET_MS = 300
+GUI_BUDGET_MS = 1500
+DEFAULT_RUNS = 10
@@ -0,0 +1,746 @@
+# -*- coding: utf-8 -*-
+# Nama File: fastcompress/engine.py
+# Mesin kompresi headless: logika 2-pass target-MB yang sebelumnya ada di
+# VideoCompressorApp. Tidak mengimpor tkinter/customtkinter sama sekali;
+# log, status dan progress dikirim sebagai event ke listener.
+
+import itertools
+import os
+import shutil
+import sqlite3
+import subprocess
+import tempfile
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from .config import parse_target_mb
+from .cpubudget import apply_thread_args
+from .accuracy import SizeModel, corrective_scale, size_verdict
+from .hwcache import HwCapabilityCache, ffmpeg_fingerprint
+from .options import ENCODER_MAP, HW_ENCODERS
+from .outputcache import unlink_if_shared
+from .paths import scratch_dir
+from .probe import MediaProber, ProbeCache
+from .progress import PROGRESS_ARGS, STDERR_PROGRESS_ARGS, EtaEstimator, ProgressParser, format_eta, split_progress_line
+from .ratecontrol import STDIO, TwoPassStrategy, build_audio_command, strategy_for
+from .streamcopy import build_copy_command, plan_stream_copy
+from .supervisor import default_supervisor
+from .system import CREATE_NO_WINDOW, NULL_DEVICE
+
+# Mode khusus (chunked, perencanaan cepat, streaming) diimpor saat dipakai
+# agar start CLI/GUI tidak memuat modul yang tidak dibutuhkan job biasa.
+
+# --- Konstanta ---
+
+# Encoder software yang bisa di-encode per segmen secara paralel (mode chunked).
+CHUNKABLE_ENCODERS = ("libx264", "libx265", "libaom-av1")
+
+# Batas waktu satu uji inisialisasi encoder hardware (detik).
+ENCODER_TEST_TIMEOUT = 8
+
+# Event yang dikirim engine ke listener.
+#   kind: "log" | "status" | "progress" | "plan" | "hw" | "timing" | "finished"
+#   job : Job terkait (None untuk event global seperti deteksi hardware)
+#   data: dict payload, mis. {"message": ...}, {"text": ..., "level": ...};
+#         "progress" membawa value/speed/eta dan "info" (ProgressInfo);
+#         "timing" membawa stage/seconds (+ cpu_seconds/peak_rss_kb per proses ffmpeg).
+Event = namedtuple("Event", ["kind", "job", "data"])
+
+
+def default_output_path(input_path):
+    path, filename = os.path.split(input_path)
+    name, _ = os.path.splitext(filename)
+    return os.path.join(path, f"{name}_compressed.mp4")
+
+
+_job_ids = itertools.count(1)
+
+
+class Job:
+    """Satu pekerjaan kompresi (input, pengaturan, dan status runtime)."""
+
+    def __init__(self, input_path, target_mb, output_path=None, codec="H.264",
+                 encoder_type="Software", algorithm="Standard",
+                 audio_mode="Re-encode (AAC 128k)", audio_bitrate_k=128, priority=0,
+                 chunked=False, chunk_workers=None, rate_mode="2pass", resumable=False, streaming=False,
+                 duration=None):
+        self.id = next(_job_ids)
+        self.priority = priority
+        self.input_path = input_path
+        # Streaming: input "-" (stdin) / named pipe, output fragmented MP4 ke "-" (stdout) / pipe.
+        self.streaming = bool(streaming) or STDIO in (input_path, output_path)
+        if output_path is None and self.streaming:
+            output_path = STDIO
+        self.output_path = output_path or default_output_path(input_path)
+        self.target_mb = float(target_mb)
+        self.codec = codec
+        self.encoder_type = encoder_type
+        self.algorithm = algorithm
+        self.audio_mode = audio_mode
+        self.audio_bitrate_k = audio_bitrate_k  # default saat re-encode
+        # Mode chunked: encode segmen paralel (libx264/libx265/libaom-av1).
+        self.chunked = chunked
+        self.chunk_workers = chunk_workers  # None = jumlah core
+        # "2pass" (klasik) atau "fast" (prediksi dari sampel, lalu satu pass).
+        self.rate_mode = rate_mode
+        # Segmen ber-checkpoint yang dilanjutkan setelah batal/crash (lihat resume.py).
+        self.resumable = resumable
+        # Durasi sumber (detik) bila sudah diketahui; None = di-probe (streaming: dari awal stream).
+        self.duration = float(duration) if duration else None
+
+        # --- Status runtime ---
+        self.status = "pending"
+        self.message = ""
+        self.cancel_requested = False
+        self.canceled = False
+        self.current_process = None
+        self.progress = 0.0
+        self.started_at = None  # time.time() saat run() dimulai
+        self.media = None  # MediaInfo hasil probe
+        self.workdir = None  # direktori kerja sementara selama job berjalan
+        self.cpu_alloc = None  # CpuAllocation dari JobQueue (encoder software), None = semua core
+        self.audio_bytes = None  # ukuran nyata audio terpisah (2-pass), None = hanya estimasi
+        # Dengan audio terpisah: anggaran bit video dari ukuran audio nyata dan bit
+        # video yang benar-benar diminta pass terakhir (None = pakai estimasi).
+        self.video_budget_bits = None
+        self.video_bits_requested = None
+        self.source = None  # URL input ffmpeg bila bukan input_path (mis. "pipe:0" saat streaming)
+
+    @classmethod
+    def from_config(cls, input_path, data, **overrides):
+        """Buat Job dari dict konfigurasi (format fastcompress_config.json)."""
+        kwargs = {
+            "codec": data.get("codec", "H.264"),
+            "encoder_type": data.get("encoder_type", "Software"),
+            "algorithm": data.get("algorithm", "Standard"),
+            "audio_mode": data.get("audio_mode", "Re-encode (AAC 128k)"),
+            "target_mb": parse_target_mb(data.get("target_mb")) or 0,
+            "chunked": bool(data.get("chunked", False)),
+            "rate_mode": data.get("rate_mode", "2pass"),
+            "resumable": bool(data.get("resumable", False)),
+        }
+        kwargs.update({k: v for k, v in overrides.items() if v is not None})
+        return cls(input_path, **kwargs)
+
+    @property
+    def ffmpeg_encoder(self):
+        return ENCODER_MAP[self.codec][self.encoder_type]
+
+    @property
+    def preset(self):
+        return "slow" if self.algorithm == "AI (Efisien)" else "medium"
+
+    @property
+    def passlog_prefix(self):
+        # Pass log di direktori kerja job sendiri agar job/instance paralel
+        # tidak saling menimpa statistik pass 1.
+        if self.workdir:
+            return os.path.join(self.workdir, "ffmpeg2pass")
+        return f"ffmpeg2pass-{os.getpid()}-{self.id}"
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed", "canceled")
+
+    def cancel(self):
+        self.cancel_requested = True
+
+    def __repr__(self):
+        return f"Job(#{self.id} {os.path.basename(self.input_path)!r}, {self.codec}/{self.encoder_type}, {self.target_mb} MB, {self.status})"
+
+
+class CompressionEngine:
+    """Menjalankan Job kompresi dan memancarkan Event ke semua listener."""
+
+    def __init__(self, ffmpeg="ffmpeg", ffprobe="ffprobe", listener=None, hw_cache=None, probe_cache=None,
+                 scratch_dir=None, output_cache=None, size_model=None, supervisor=None):
+        self.ffmpeg = ffmpeg
+        self.ffprobe = ffprobe
+        # Semua proses anak (ffmpeg/ffprobe) berjalan di satu event loop asyncio.
+        self.supervisor = supervisor or default_supervisor()
+        # Induk direktori kerja job (None = FASTCOMPRESS_SCRATCH_DIR / temp sistem).
+        self.scratch_dir = scratch_dir
+        self.ffmpeg_version = ""
+        self.available_hw_encoders = {}
+        self.hw_cache = hw_cache if hw_cache is not None else HwCapabilityCache()
+        if probe_cache is None:
+            try:
+                probe_cache = ProbeCache()
+            except sqlite3.Error:
+                probe_cache = None  # tanpa cache: tetap satu probe per job
+        self.prober = MediaProber(ffprobe, probe_cache, self.supervisor)
+        # OutputCache opsional: job identik diambil dari cache, tanpa encode.
+        self.output_cache = output_cache
+        # Model koreksi ukuran (riwayat target vs aktual); False = nonaktif.
+        self.size_model = SizeModel() if size_model is None else (size_model or None)
+        self._listeners = []
+        if listener is not None:
+            self.subscribe(listener)
+
+    # --- Event ---
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+        return listener
+
+    def unsubscribe(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def emit(self, kind, job=None, **data):
+        event = Event(kind, job, data)
+        for listener in list(self._listeners):
+            try:
+                listener(event)
+            except Exception:
+                pass
+
+    def subscribe_progress(self, callback):
+        """Daftarkan callback(job, ProgressInfo) khusus untuk event progress."""
+        def listener(event):
+            if event.kind == "progress" and "info" in event.data:
+                callback(event.job, event.data["info"])
+        return self.subscribe(listener)
+
+    def log(self, message, job=None):
+        self.emit("log", job, message=message)
+
+    def set_status(self, text, level="info", job=None):
+        self.emit("status", job, text=text, level=level)
+
+    # --- FFmpeg / Hardware ---
+    def check_ffmpeg(self):
+        """Memeriksa apakah ffmpeg ada di PATH."""
+        try:
+            res = subprocess.run([self.ffmpeg, "-version"], check=True, capture_output=True, text=True, creationflags=CREATE_NO_WINDOW)
+            self.ffmpeg_version = (res.stdout.splitlines() or [""])[0].strip()
+            self.log("ffmpeg ditemukan.")
+            return True
+        except (subprocess.CalledProcessError, FileNotFoundError, OSError):
+            self.log("ERROR: ffmpeg tidak ditemukan. Pastikan ffmpeg terinstall dan ada di PATH sistem Anda.")
+            self.log("Unduh: https://ffmpeg.org/download.html")
+            return False
+
+    def encoder_test_command(self, encoder_name):
+        return [
+            self.ffmpeg, "-hide_banner", "-v", "error",
+            "-f", "lavfi", "-i", "color=c=black:s=128x72:r=30:d=1",
+            "-an", "-sn",
+            "-c:v", encoder_name,
+            "-b:v", "300k",
+            "-t", "1",
+            "-f", "mp4", NULL_DEVICE
+        ]
+
+    @staticmethod
+    def encoder_test_result(res):
+        """(tersedia, alasan) dari CaptureResult uji encoder."""
+        if res.timed_out:
+            return False, f"timeout {ENCODER_TEST_TIMEOUT:g} detik"
+        if res.returncode == 0:
+            return True, ""
+        err = (res.stderr or res.stdout or "").strip().splitlines()
+        reason = err[-1] if err else "exit code != 0"
+        return False, reason
+
+    def test_encoder_available(self, encoder_name):
+        res = self.supervisor.capture(self.encoder_test_command(encoder_name), timeout=ENCODER_TEST_TIMEOUT)
+        return self.encoder_test_result(res)
+
+    def detect_hw_encoders(self, force=False):
+        """Deteksi encoder hardware; pakai cache bila sidik jari tidak berubah.
+
+        force=True mengabaikan cache (aksi "deteksi ulang").
+        """
+        started = time.monotonic()
+        if not self.ffmpeg_version:
+            self.check_ffmpeg()
+        fingerprint, ffmpeg_path = ffmpeg_fingerprint(self.ffmpeg, self.ffmpeg_version)
+
+        cached = None if force else self.hw_cache.get(fingerprint)
+        if cached is not None:
+            available = {codec: list(cached["encoders"].get(codec, [])) for codec in HW_ENCODERS}
+            self.log("Hardware dari cache (ffmpeg & driver tidak berubah).")
+            from_cache = True
+        else:
+            available, reasons = self.probe_hw_encoders()
+            self.hw_cache.put(fingerprint, ffmpeg_path, self.ffmpeg_version, available, reasons)
+            from_cache = False
+
+        if not any(available.values()):
+            self.log("INFO: Tidak ada akselerasi hardware terdeteksi.")
+        self.available_hw_encoders = available
+        self.emit("timing", None, stage="hw_detect", seconds=time.monotonic() - started, cached=from_cache)
+        self.emit("hw", None, encoders=available, cached=from_cache)
+        return available
+
+    def probe_hw_encoders(self):
+        """Uji semua encoder hardware secara paralel. Kembalikan (available, reasons)."""
+        self.log("Mendeteksi perangkat keras (uji inisialisasi encoder)...")
+        tests = [(codec, brand, enc) for codec, brands in HW_ENCODERS.items() for brand, enc in brands.items()]
+        # Semua uji berjalan bersamaan di event loop supervisor (tanpa thread per uji).
+        captures = self.supervisor.capture_many([self.encoder_test_command(t[2]) for t in tests],
+                                                timeout=ENCODER_TEST_TIMEOUT)
+        results = [self.encoder_test_result(res) for res in captures]
+
+        available = {codec: [] for codec in HW_ENCODERS}
+        reasons = {}
+        for (codec, brand, enc_name), (ok, reason) in zip(tests, results):
+            if ok:
+                available[codec].append(brand)
+                self.log(f"OK: {brand} untuk {codec} tersedia ({enc_name})")
+            else:
+                reasons[enc_name] = reason
+                self.log(f"Skip: {brand} {codec} tidak tersedia -> {reason}")
+        return available, reasons
+
+    # --- Probe ---
+    def probe_media(self, job):
+        """Probe input job sekali (atau dari cache) dan simpan di job.media."""
+        self.log("Membaca metadata video...", job)
+        started = time.monotonic()
+        try:
+            media, cached = self.prober.probe(job.input_path)
+        except Exception as e:
+            self.log(f"ERROR: Gagal membaca metadata video: {e}", job)
+            return None
+        self.emit("timing", job, stage="probe", seconds=time.monotonic() - started, cached=cached)
+        job.media = media
+        src = " (cache)" if cached else ""
+        self.log(f"Durasi video: {media.duration:.2f} detik{src}", job)
+        if media.width and media.height:
+            fps_txt = f" @ {media.fps:.3g} fps" if media.fps else ""
+            self.log(f"Video: {media.video_codec} {media.width}x{media.height}{fps_txt}", job)
+        return media
+
+    def get_video_duration(self, filepath, job=None):
+        try:
+            return self.prober.probe(filepath)[0].duration
+        except Exception as e:
+            self.log(f"ERROR: Gagal mendapatkan durasi video: {e}", job)
+            return None
+
+    def get_source_audio_bitrate(self, filepath):
+        """Ambil bitrate audio (k) jika ada; fallback 128k."""
+        if not filepath:
+            return 128
+        try:
+            return self.prober.probe(filepath)[0].audio_bitrate_k
+        except Exception:
+            return 128
+
+    # --- Kompresi ---
+    def validate(self, job):
+        """Kembalikan pesan error (str) jika job tidak valid, atau None."""
+        if not job.input_path or (job.input_path != STDIO and not os.path.exists(job.input_path)):
+            return "File input tidak ditemukan."
+        if job.target_mb <= 0:
+            return "Target ukuran MB harus angka positif."
+        if job.codec not in ENCODER_MAP or job.encoder_type not in ENCODER_MAP[job.codec]:
+            return f"Kombinasi codec/encoder tidak dikenal: {job.codec}/{job.encoder_type}"
+        # Target >= ukuran sumber tidak lagi ditolak: engine memilih jalur remux.
+        return None
+
+    def run(self, job):
+        """Jalankan job secara sinkron. Mengembalikan True jika sukses."""
+        error = self.validate(job)
+        if error:
+            return self.finish(job, False, error)
+
+        if job.cancel_requested:
+            job.canceled = True
+            return self.finish(job, False, "Dibatalkan.")
+
+        job.status = "running"
+        job.started_at = time.time()
+        self.set_status("Status: Memulai...", job=job)
+        self.emit("progress", job, value=0.0)
+
+        if job.streaming:
+            # Pipe tidak bisa di-cache, di-seek atau diverifikasi ukurannya.
+            from .streaming import StreamEncoder
+            return StreamEncoder(self).run(job)
+
+        cache_key = self.lookup_output_cache(job)
+        if cache_key is True:
+            return self.finish(job, True, "Diambil dari cache (tanpa encode).")
+
+        # Output lama yang ter-hardlink ke cache tidak boleh ditimpa ffmpeg di tempat.
+        unlink_if_shared(job.output_path)
+        try:
+            self.create_workdir(job)
+        except OSError as e:
+            return self.finish(job, False, f"Tidak bisa membuat direktori kerja: {e}")
+        try:
+            ok = self.run_compression(job)
+        finally:
+            self.remove_workdir(job)
+        if ok and cache_key:
+            self.output_cache.put(cache_key, job.output_path)
+        return ok
+
+    def lookup_output_cache(self, job):
+        """True bila output sudah dipasang dari cache; selain itu kunci cache (atau None)."""
+        if self.output_cache is None:
+            return None
+        if not self.ffmpeg_version:
+            self.check_ffmpeg()
+        try:
+            key = self.output_cache.key_for(job, self.ffmpeg_version)
+        except OSError as e:
+            self.log(f"Cache output dilewati: {e}", job)
+            return None
+        if self.output_cache.fetch(key, job.output_path):
+            self.log(f"Cache output: hit ({key[:12]}), output dipasang tanpa encode.", job)
+            return True
+        self.log(f"Cache output: miss ({key[:12]}).", job)
+        return key
+
+    def run_compression(self, job):
+        media = self.probe_media(job)
+        if media is None:
+            return self.finish(job, False, "Gagal mendapatkan durasi video.")
+        duration = media.duration
+
+        total_bits_target = job.target_mb * 8 * 1024 * 1024
+
+        if "Copy" in job.audio_mode:
+            audio_bitrate_k = media.audio_bitrate_k
+            self.log(f"Audio mode: COPY (estimasi {audio_bitrate_k}k)", job)
+        else:
+            audio_bitrate_k = job.audio_bitrate_k
+            self.log(f"Audio mode: Re-encode AAC {audio_bitrate_k}k", job)
+
+        audio_bits_total = audio_bitrate_k * 1000 * duration
+
+        copy_plan = plan_stream_copy(job, media, total_bits_target / 8, audio_bitrate_k)
+        if copy_plan is not None:
+            result = self.run_stream_copy(job, copy_plan, duration, total_bits_target / 8)
+            if result is not None:
+                return result
+            # None -> copy gagal/melebihi target (copy_plan.failure), lanjut encode ulang.
+        else:
+            self.log("Jalur: encode ulang video (stream copy tidak memenuhi target).", job)
+        if media.size and media.size <= total_bits_target / 8:
+            # Sumber sudah muat tapi remux gagal/tidak mungkin: encode ulang hanya memperbesar file.
+            if copy_plan is not None and copy_plan.kind == "remux":
+                why = f"remux sudah dicoba tetapi {copy_plan.failure or 'gagal'}"
+            else:
+                why = f"codec sumber ({media.video_codec}) tidak bisa di-remux ke MP4"
+            return self.finish(job, False, f"Target ({job.target_mb:.2f} MB) >= ukuran sumber "
+                                           f"({media.size / 1024 / 1024:.2f} MB), {why}. "
+                                           "Kompresi dibatalkan.")
+
+        video_bits_available = total_bits_target - audio_bits_total
+        source_video_bits = (media.estimated_video_bit_rate or 0) * duration
+        capped = bool(source_video_bits) and video_bits_available > source_video_bits
+        if capped:
+            # Jangan encode ulang ke bitrate di atas sumber (lebih besar dan lebih buruk).
+            self.log(f"Anggaran video dibatasi ke bitrate sumber ({int(source_video_bits / duration / 1000)}k).", job)
+            video_bits_available = source_video_bits
+        if video_bits_available <= 200000:
+            return self.finish(job, False, "Target terlalu kecil setelah alokasi audio.")
+
+        # Model koreksi dari riwayat job: sesuaikan bitrate sebelum encode.
+        mode = self.size_mode(job)
+        scale = 1.0
+        if self.size_model is not None:
+            scale, samples = self.size_model.correction(job, media, mode)
+            if scale != 1.0:
+                self.log(f"Koreksi ukuran dari riwayat ({samples} observasi): bitrate video x{scale:.3f}", job)
+
+        target_bytes = total_bits_target / 8
+        for attempt in (1, 2):
+            video_bits = video_bits_available * scale
+            job.audio_bytes = job.video_budget_bits = job.video_bits_requested = None
+            self.log(f"Target video bitrate (disesuaikan): {int(video_bits / duration / 1000)}k", job)
+            ok = self.encode_video(job, media, video_bits, scale, total_bits_target, audio_bitrate_k,
+                                   audio_bits_total, allow_plan=attempt == 1)
+            if not ok:
+                return False
+            try:
+                actual = os.path.getsize(job.output_path)
+            except OSError:
+                return self.finish(job, False, "File output tidak ditemukan setelah encode.")
+            # Audio terpisah: ukuran file nyata, bukan estimasi bitrate x durasi; rasio
+            # dan koreksi dihitung terhadap bitrate yang benar-benar diminta pass 2.
+            audio_bits = job.audio_bytes * 8 if job.audio_bytes else audio_bits_total
+            actual_video_bits = actual * 8 - audio_bits
+            requested_video_bits = job.video_bits_requested or video_bits
+            desired_video_bits = job.video_budget_bits or video_bits_available
+            if self.size_model is not None:
+                self.size_model.record(job, media, mode, requested_video_bits, actual_video_bits)
+            verdict = size_verdict(actual, target_bytes)
+            error = (actual / target_bytes - 1) * 100
+            self.log(f"Verifikasi ukuran: {actual / 1024 / 1024:.2f} MB vs target {job.target_mb:.2f} MB "
+                     f"({error:+.1f}%)", job)
+            # Tanpa bit video terukur (audio mendominasi) koreksi tidak bermakna.
+            # Anggaran dibatasi bitrate sumber: hasil di bawah target memang disengaja.
+            capped_now = bool(source_video_bits) and desired_video_bits >= source_video_bits
+            if verdict == "ok" or (capped_now and verdict == "under") or self.size_model is None \
+                    or actual_video_bits <= 0:
+                break
+            if attempt == 2:
+                self.log("PERINGATAN: ukuran masih di luar toleransi setelah re-encode korektif.", job)
+                return self.finish(job, True, f"Kompresi Selesai (ukuran {error:+.1f}% dari target).")
+            scale *= corrective_scale(actual_video_bits, desired_video_bits, verdict)
+            label = "melebihi" if verdict == "over" else "jauh di bawah"
+            self.log(f"Hasil {label} target: re-encode korektif dengan bitrate video x{scale:.3f}.", job)
+
+        return self.finish(job, True, "Kompresi Selesai!")
+
+    def size_mode(self, job):
+        """Mode encode untuk model koreksi ukuran (jalur yang akan dipakai job)."""
+        if (job.chunked or job.resumable) and job.ffmpeg_encoder in CHUNKABLE_ENCODERS:
+            return "chunked"
+        return job.rate_mode
+
+    def encode_video(self, job, media, video_bits, scale, total_bits_target, audio_bitrate_k,
+                     audio_bits_total, allow_plan=True):
+        """Encode video ke job.output_path. True jika sukses; saat gagal job sudah di-finish."""
+        duration = media.duration
+        target_video_bitrate_k = int(video_bits / duration / 1000)
+        ffmpeg_encoder = job.ffmpeg_encoder
+        if (job.chunked or job.resumable) and ffmpeg_encoder in CHUNKABLE_ENCODERS:
+            from .chunked import ChunkedEncoder
+            return ChunkedEncoder(self).run(job, duration, video_bits, audio_bitrate_k)
+        if job.resumable:
+            self.log("Mode resumable hanya untuk encoder software (segmen); job berjalan tanpa checkpoint.", job)
+
+        if job.codec == "AV1" and job.encoder_type == "Software":
+            return self.finish(job, False, "AV1 Software terlalu lambat untuk mode ini. Gunakan mode chunked (paralel).")
+
+        self.log(f"Menggunakan encoder: {ffmpeg_encoder}", job)
+
+        strategy = strategy_for(ffmpeg_encoder)
+        # Perencana sampel hanya berguna untuk menggantikan 2-pass software;
+        # encoder hardware sudah satu pass dengan rate control internal.
+        if allow_plan and job.rate_mode == "fast" and isinstance(strategy, TwoPassStrategy):
+            result = self.run_planned(job, duration, target_video_bitrate_k, audio_bitrate_k, audio_bits_total)
+            if result is not None:
+                return result
+            # None -> rencana tidak layak, lanjut 2-pass klasik.
+
+        # 2-pass: audio di-encode ke file terpisah paralel dengan pass 1, lalu
+        # di-mux dengan -c:a copy pada pass 2 (anggaran video dari ukuran nyata).
+        audio_path = audio_future = pool = None
+        if isinstance(strategy, TwoPassStrategy) and media.has_audio and job.workdir:
+            audio_path = os.path.join(job.workdir, "audio.m4a")
+            pool = ThreadPoolExecutor(max_workers=1)
+            audio_future = pool.submit(
+                self.execute_ffmpeg_command, build_audio_command(self.ffmpeg, job, audio_bitrate_k, audio_path),
+                duration, job, quiet=True, on_progress=lambda info: None, stage="audio")
+            self.log("Audio di-encode paralel dengan pass 1 (file terpisah).", job)
+
+        steps = strategy.build_steps(self.ffmpeg, job, target_video_bitrate_k, audio_bitrate_k, audio_path)
+        self.log(f"Rate control: {strategy.description}", job)
+        # Satu estimator untuk semua pass agar ETA mencakup sisa seluruh job.
+        eta = EtaEstimator(duration * len(steps))
+
+        try:
+            index = 0
+            while index < len(steps):
+                if audio_future is not None and index == len(steps) - 1:
+                    steps = self.apply_split_audio(job, strategy, audio_future, audio_path, duration,
+                                                   total_bits_target, target_video_bitrate_k, audio_bitrate_k, scale)
+                    audio_future = None
+                step = steps[index]
+                index += 1
+                self.set_status(f"Status: Pass {index} dari {len(steps)}...", job=job)
+                self.log(f"\n--- MEMULAI {step.label} ---", job)
+                ok = self.execute_ffmpeg_command(step.command, duration, job,
+                                                 pass_index=index, pass_count=len(steps), eta=eta)
+                if not ok:
+                    if job.canceled:
+                        return self.finish(job, False, "Dibatalkan.")
+                    return self.finish(job, False, f"Gagal pada {step.label.title()}.")
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True)
+        return True
+
+    def apply_split_audio(self, job, strategy, audio_future, audio_path, duration,
+                          total_bits_target, target_video_bitrate_k, audio_bitrate_k, scale=1.0):
+        """Tunggu audio terpisah, lalu susun ulang pass terakhir dengan bitrate video dari ukuran audio nyata."""
+        ok = audio_future.result()
+        if not ok or not os.path.exists(audio_path):
+            if not job.cancel_requested:
+                self.log("Audio terpisah gagal, audio di-encode bersama pass 2.", job)
+            return strategy.build_steps(self.ffmpeg, job, target_video_bitrate_k, audio_bitrate_k)
+        audio_bytes = os.path.getsize(audio_path)
+        budget_bits = total_bits_target - audio_bytes * 8
+        source_bit_rate = job.media.estimated_video_bit_rate if job.media is not None else None
+        if source_bit_rate:
+            # Batas bitrate sumber tetap berlaku setelah anggaran dihitung ulang.
+            budget_bits = min(budget_bits, source_bit_rate * duration)
+        video_k = int(budget_bits * scale / duration / 1000)
+        if video_k <= 0:
+            return strategy.build_steps(self.ffmpeg, job, target_video_bitrate_k, audio_bitrate_k)
+        job.audio_bytes = audio_bytes
+        job.video_budget_bits = budget_bits
+        job.video_bits_requested = video_k * 1000 * duration
+        audio_bits = audio_bytes * 8
+        self.log(f"Audio aktual {audio_bits / 8 / 1024:.0f} KB -> target video bitrate {video_k}k "
+                 f"(estimasi {target_video_bitrate_k}k)", job)
+        return strategy.build_steps(self.ffmpeg, job, video_k, audio_bitrate_k, audio_path)
+
+    def run_planned(self, job, duration, target_video_bitrate_k, audio_bitrate_k, audio_bits_total):
+        """Mode cepat: sampel -> prediksi -> satu pass. None jika harus 2-pass.
+
+        True saat sukses (verifikasi ukuran dan finish dilakukan pemanggil).
+        """
+        self.log("\n--- PERENCANAAN (SAMPEL) ---", job)
+        from .planner import SizePlanner
+        planner = SizePlanner(self)
+        plan = planner.plan(job, duration, target_video_bitrate_k, audio_bits_total)
+        if plan is None:
+            job.canceled = True
+            return self.finish(job, False, "Dibatalkan.")
+        self.log(f"Rencana: {plan.describe()}", job)
+        self.emit("plan", job, plan=plan)
+        if not plan.single_pass:
+            self.log("Kembali ke 2-pass klasik.", job)
+            return None
+
+        self.set_status("Status: Encode satu pass...", job=job)
+        self.log("\n--- MEMULAI ENCODE (SATU PASS) ---", job)
+        cmd = planner.build_final_command(job, plan, target_video_bitrate_k, audio_bitrate_k)
+        if not self.execute_ffmpeg_command(cmd, duration, job):
+            if job.canceled:
+                return self.finish(job, False, "Dibatalkan.")
+            return self.finish(job, False, "Gagal pada encode satu pass.")
+        self.log(f"Prediksi rencana: {plan.predicted_mb:.2f} MB", job)
+        return True
+
+    def run_stream_copy(self, job, plan, duration, target_bytes):
+        """Jalur tanpa re-encode video. None jika hasilnya tidak muat target."""
+        self.log(f"\n--- JALUR CEPAT: {plan.describe()} ---", job)
+        self.set_status("Status: Menyalin stream (tanpa encode video)...", job=job)
+        if not self.execute_ffmpeg_command(build_copy_command(self.ffmpeg, job, plan), duration, job, stage="copy"):
+            if job.canceled:
+                return self.finish(job, False, "Dibatalkan.")
+            self.log("Stream copy gagal, kembali ke encode ulang.", job)
+            plan.failure = "ffmpeg gagal menyalin stream"
+            return None
+        try:
+            actual = os.path.getsize(job.output_path)
+        except OSError:
+            plan.failure = "file hasil tidak ditemukan"
+            return None
+        if actual > target_bytes:
+            self.log(f"Hasil copy {actual / 1024 / 1024:.2f} MB melebihi target, kembali ke encode ulang.", job)
+            plan.failure = f"hasilnya {actual / 1024 / 1024:.2f} MB melebihi target"
+            return None
+        self.log(f"Ukuran hasil: {actual / 1024 / 1024:.2f} MB (target {job.target_mb:.2f} MB)", job)
+        return self.finish(job, True, "Selesai tanpa encode ulang video!")
+
+    def execute_ffmpeg_command(self, command, duration, job, pass_index=1, pass_count=1,
+                               eta=None, on_progress=None, quiet=False, stage=None, stdin=None, stdout=None):
+        """Jalankan satu proses ffmpeg sampai selesai/dibatalkan.
+
+        Progress dibaca dari kanal -progress (key=value), bukan dari log.
+        on_progress(info) menggantikan event progress bawaan (dipakai saat
+        beberapa proses berjalan paralel untuk satu job); quiet=True tidak
+        meneruskan output ffmpeg ke log. Setelah proses selesai dikirim event
+        "timing" dengan nama stage (default "pass<N>"). stdin/stdout: fd yang
+        diwariskan ke ffmpeg (streaming); dengan stdout, progress lewat stderr.
+        """
+        progress_args = PROGRESS_ARGS if stdout is None else STDERR_PROGRESS_ARGS
+        command = [command[0]] + progress_args + list(command[1:])
+        parser = ProgressParser(duration, pass_index, pass_count, eta)
+        started = time.monotonic()
+
+        alloc = job.cpu_alloc
+        if alloc is not None:
+            command = apply_thread_args(command, alloc.threads)
+        try:
+            process = self.supervisor.start(command, cpus=alloc.cpus if alloc is not None and alloc.pin else None,
+                                            stdin=stdin, stdout=stdout)
+        except OSError as e:
+            self.log(f"ERROR: Tidak bisa menjalankan ffmpeg: {e}", job)
+            return False
+        job.current_process = process
+
+        # Batal diperiksa supervisor walau ffmpeg tidak menulis apa pun;
+        # proses dihentikan (terminate -> kill) sebelum lines() berakhir.
+        for line in process.lines(should_cancel=lambda: job.cancel_requested):
+            pair = split_progress_line(line)
+            if pair is None:
+                line_stripped = line.strip()
+                if line_stripped and not quiet:
+                    self.log(line_stripped, job)
+                continue
+
+            info = parser.feed(*pair)
+            if info is None:
+                continue
+            if on_progress is not None:
+                on_progress(info)
+            else:
+                self.report_progress(job, info)
+
+        result = process.wait()
+        if job.current_process is process:
+            job.current_process = None
+        ret = result.returncode
+        self.emit("timing", job, stage=stage or f"pass{pass_index}", seconds=time.monotonic() - started,
+                  cpu_seconds=result.cpu_seconds, peak_rss_kb=result.peak_rss_kb, ok=ret == 0)
+        if result.canceled:
+            job.canceled = True
+            return False
+        if result.timed_out:
+            self.log("ERROR: ffmpeg melewati batas waktu / tidak merespons, proses dihentikan.", job)
+            return False
+        if ret != 0 and quiet:
+            self.log(f"ffmpeg keluar dengan kode {ret}: {' '.join(command)}", job)
+        return ret == 0
+
+    def report_progress(self, job, info):
+        """Kirim ProgressInfo sebagai event "progress" plus teks status."""
+        job.progress = info.value
+        self.emit("progress", job, value=info.value, speed=info.speed, eta=info.eta, info=info)
+        speed_txt = f" speed={info.speed:g}x" if info.speed is not None else ""
+        eta_txt = f" ETA {format_eta(info.eta)}" if info.eta is not None else ""
+        percent = int(info.value * 100)
+        self.set_status(f"Status: Pass {info.pass_index} dari {info.pass_count}... {percent}%{speed_txt}{eta_txt}", job=job)
+
+    def cancel(self, job):
+        if job.finished:
+            return
+        job.cancel()
+        self.set_status("Status: Membatalkan...", level="warn", job=job)
+        self.log("Permintaan pembatalan dikirim...", job)
+
+    def create_workdir(self, job):
+        """Buat direktori kerja terisolasi untuk job (pass log, sampel, segmen)."""
+        base = scratch_dir(self.scratch_dir)
+        job.workdir = tempfile.mkdtemp(prefix=f"fastcompress-job-{os.getpid()}-{job.id}-", dir=base)
+        return job.workdir
+
+    def remove_workdir(self, job):
+        """Hapus direktori kerja job; dipanggil setelah sukses, gagal maupun batal."""
+        if job.workdir:
+            shutil.rmtree(job.workdir, ignore_errors=True)
+            job.workdir = None
+
+    def finish(self, job, success, message):
+        job.message = message
+        if success:
+            job.status = "done"
+            self.set_status(f"Status: {message}", level="ok", job=job)
+            job.progress = 1.0
+            self.emit("progress", job, value=1.0)
+            target = "stdout" if job.output_path == STDIO else job.output_path
+            self.log(f"\nSUKSES: File disimpan di {target}", job)
+        else:
+            if job.canceled:
+                job.status = "canceled"
+                self.set_status(f"Status: {message}", level="warn", job=job)
+                self.log("\nDIBATALKAN oleh pengguna.", job)
+            else:
+                job.status = "failed"
+                self.set_status(f"Status: {message}", level="error", job=job)
+                self.log(f"\nGAGAL: {message}", job)
+            self.emit("progress", job, value=0.0)
+        self.emit("finished", job, success=success, message=message)
+        return success
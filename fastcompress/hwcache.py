@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+# Nama File: fastcompress/hwcache.py
+# Cache kapabilitas encoder hardware. Hasil uji inisialisasi encoder disimpan
+# per sidik jari (versi + path ffmpeg + driver GPU), sehingga peluncuran
+# berikutnya tidak perlu menjalankan ulang sembilan uji encode.
+
+import glob
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+
+from .paths import cache_dir
+
+CACHE_FILE = "hw_encoders.json"
+# Jumlah sidik jari yang disimpan (mis. beberapa build ffmpeg berbeda).
+MAX_ENTRIES = 8
+
+
+def _read_text(path):
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+def gpu_driver_fingerprint():
+    """String yang berubah bila GPU atau versi drivernya berubah."""
+    parts = []
+    if sys.platform == "win32":
+        try:
+            import winreg
+            key_path = r"SYSTEM\CurrentControlSet\Control\Class\{4d36e968-e325-11ce-bfc1-08002be10318}"
+            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, key_path) as root:
+                for i in range(64):
+                    try:
+                        sub = winreg.EnumKey(root, i)
+                    except OSError:
+                        break
+                    try:
+                        with winreg.OpenKey(root, sub) as k:
+                            desc = winreg.QueryValueEx(k, "DriverDesc")[0]
+                            ver = winreg.QueryValueEx(k, "DriverVersion")[0]
+                            parts.append(f"{desc}={ver}")
+                    except OSError:
+                        continue
+        except Exception:
+            pass
+    else:
+        for card in sorted(glob.glob("/sys/class/drm/card[0-9]*/device")):
+            driver = os.path.basename(os.path.realpath(os.path.join(card, "driver")))
+            vendor = _read_text(os.path.join(card, "vendor"))
+            device = _read_text(os.path.join(card, "device"))
+            version = _read_text(f"/sys/module/{driver}/version")
+            parts.append(f"{vendor}:{device}:{driver}:{version}")
+        parts.append(_read_text("/proc/driver/nvidia/version"))
+    return "|".join(p for p in parts if p)
+
+
+def ffmpeg_fingerprint(ffmpeg, version_line):
+    """Sidik jari gabungan: path nyata ffmpeg, ukuran/mtime, versi, driver GPU."""
+    path = shutil.which(ffmpeg) or ffmpeg
+    path = os.path.realpath(path)
+    try:
+        st = os.stat(path)
+        stat_txt = f"{st.st_size}:{int(st.st_mtime)}"
+    except OSError:
+        stat_txt = ""
+    raw = "\n".join((path, stat_txt, version_line or "", gpu_driver_fingerprint()))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest(), path
+
+
+class HwCapabilityCache:
+    """File JSON berisi hasil deteksi per sidik jari."""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(cache_dir(), CACHE_FILE)
+
+    def _load_all(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, fingerprint):
+        entry = self._load_all().get(fingerprint)
+        if entry and isinstance(entry.get("encoders"), dict):
+            return entry
+        return None
+
+    def put(self, fingerprint, ffmpeg_path, version_line, encoders, reasons):
+        data = self._load_all()
+        data[fingerprint] = {
+            "ffmpeg_path": ffmpeg_path,
+            "ffmpeg_version": version_line,
+            "detected_at": time.time(),
+            "encoders": encoders,
+            "reasons": reasons,
+        }
+        # Buang entri terlama bila melebihi batas.
+        if len(data) > MAX_ENTRIES:
+            oldest = sorted(data, key=lambda k: data[k].get("detected_at", 0))
+            for key in oldest[:len(data) - MAX_ENTRIES]:
+                del data[key]
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
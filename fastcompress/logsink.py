@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+# Nama File: fastcompress/logsink.py
+# Penampung log thread-safe dengan batas baris (ring buffer). Thread kerja
+# hanya menulis ke sini; UI mengambil isinya per batch lewat drain().
+# Log lengkap bisa dialirkan ke file yang dirotasi otomatis.
+
+import itertools
+import logging
+import logging.handlers
+import threading
+from collections import deque
+
+DEFAULT_MAX_LINES = 5000
+DEFAULT_LOG_FILE_BYTES = 10 * 1024 * 1024
+DEFAULT_LOG_FILE_BACKUPS = 3
+
+_sink_ids = itertools.count(1)
+
+
+class LogSink:
+    """Ring buffer log: memori konstan berapa pun panjang proses encode.
+
+    max_lines=0 berarti tidak menyimpan di memori (hanya ke file, mis. CLI).
+    Baris yang terbuang karena buffer penuh dihitung di `dropped`.
+    """
+
+    def __init__(self, max_lines=DEFAULT_MAX_LINES, log_file=None,
+                 max_bytes=DEFAULT_LOG_FILE_BYTES, backup_count=DEFAULT_LOG_FILE_BACKUPS):
+        self.max_lines = max(0, int(max_lines))
+        self._pending = deque(maxlen=self.max_lines or None)
+        self._lock = threading.Lock()
+        self._dropped = 0
+        self._file_logger = None
+        if log_file:
+            self.open_file(log_file, max_bytes, backup_count)
+
+    def open_file(self, path, max_bytes=DEFAULT_LOG_FILE_BYTES, backup_count=DEFAULT_LOG_FILE_BACKUPS):
+        handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        logger = logging.getLogger(f"fastcompress.logsink.{next(_sink_ids)}")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        logger.addHandler(handler)
+        self._file_logger = logger
+
+    def write(self, message):
+        lines = str(message).splitlines() or [""]
+        if self.max_lines:
+            with self._lock:
+                for line in lines:
+                    if len(self._pending) == self.max_lines:
+                        self._dropped += 1
+                    self._pending.append(line)
+        if self._file_logger is not None:
+            for line in lines:
+                if line:
+                    self._file_logger.info(line)
+
+    def drain(self):
+        """Ambil semua baris tertunda: (list_baris, jumlah_baris_terbuang)."""
+        with self._lock:
+            lines = list(self._pending)
+            self._pending.clear()
+            dropped, self._dropped = self._dropped, 0
+        return lines, dropped
+
+    def close(self):
+        if self._file_logger is not None:
+            for handler in list(self._file_logger.handlers):
+                handler.close()
+                self._file_logger.removeHandler(handler)
+            self._file_logger = None
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+# Nama File: fastcompress/metrics.py
+# Metrik per job dari event engine: waktu probe dan deteksi hardware, waktu
+# wall tiap pass, fps/speed rata-rata dan p95, waktu CPU serta puncak RSS
+# proses ffmpeg, byte masuk/keluar dan galat ukuran terhadap target. Setiap
+# job yang selesai ditambahkan sebagai satu baris JSON (JSONL); opsional juga
+# file teks Prometheus (format node_exporter textfile collector).
+
+import json
+import os
+import threading
+import time
+
+METRICS_FORMAT = 1
+PROM_PREFIX = "fastcompress"
+
+
+def percentile(values, pct):
+    """Persentil (interpolasi linear) dari list angka, atau None bila kosong."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def _mean(values):
+    return sum(values) / len(values) if values else None
+
+
+def _round(value, digits=3):
+    return round(value, digits) if value is not None else None
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class JobMetrics:
+    """Akumulator metrik untuk satu job yang sedang berjalan."""
+
+    def __init__(self):
+        self.stages = {}  # stage -> {"seconds", "count", "cpu_seconds"}
+        self.fps = []
+        self.speed = []
+        self.cpu_seconds = 0.0
+        self.peak_rss_kb = None
+        self.probe_cached = None
+
+    def add_timing(self, data):
+        stage = data.get("stage", "?")
+        entry = self.stages.setdefault(stage, {"seconds": 0.0, "count": 0, "cpu_seconds": 0.0})
+        entry["seconds"] += data.get("seconds") or 0.0
+        entry["count"] += 1
+        cpu = data.get("cpu_seconds")
+        if cpu is not None:
+            entry["cpu_seconds"] += cpu
+            self.cpu_seconds += cpu
+        rss = data.get("peak_rss_kb")
+        if rss is not None:
+            self.peak_rss_kb = max(self.peak_rss_kb or 0, rss)
+        if stage == "probe":
+            self.probe_cached = bool(data.get("cached"))
+
+    def add_progress(self, info):
+        if info.fps:
+            self.fps.append(info.fps)
+        if info.speed:
+            self.speed.append(info.speed)
+
+    def stage_seconds(self, *names):
+        found = [self.stages[n]["seconds"] for n in names if n in self.stages]
+        return _round(sum(found)) if found else None
+
+
+class MetricsCollector:
+    """Listener engine: kumpulkan metrik per job, tulis JSONL (+ Prometheus) saat job selesai."""
+
+    def __init__(self, path=None, prom_path=None):
+        self.path = path
+        self.prom_path = prom_path
+        self._lock = threading.Lock()
+        self._jobs = {}  # job.id -> JobMetrics
+        self.hw_detect_seconds = None
+        # Counter kumulatif sejak proses dimulai (untuk Prometheus).
+        self._jobs_total = {}       # (encoder, status) -> jumlah
+        self._stage_seconds = {}    # (encoder, stage) -> detik
+        self._cpu_seconds = {}      # encoder -> detik
+        self._bytes = {}            # (encoder, "in"/"out") -> byte
+        self._last = {}             # encoder -> record job terakhir
+
+    def __call__(self, event):
+        if event.kind == "timing":
+            with self._lock:
+                if event.job is None:
+                    if event.data.get("stage") == "hw_detect":
+                        self.hw_detect_seconds = event.data.get("seconds")
+                    return
+                self._metrics(event.job).add_timing(event.data)
+        elif event.kind == "progress" and event.job is not None and "info" in event.data:
+            with self._lock:
+                self._metrics(event.job).add_progress(event.data["info"])
+        elif event.kind == "finished" and event.job is not None:
+            record = self.record(event.job, event.data)
+            self.write(record)
+
+    def _metrics(self, job):
+        metrics = self._jobs.get(job.id)
+        if metrics is None:
+            metrics = self._jobs[job.id] = JobMetrics()
+        return metrics
+
+    def record(self, job, data):
+        """Susun record metrik untuk job yang selesai (dict siap-JSON)."""
+        with self._lock:
+            metrics = self._jobs.pop(job.id, None) or JobMetrics()
+            hw_detect = self.hw_detect_seconds
+        now = time.time()
+        try:
+            bytes_in = os.path.getsize(job.input_path)
+        except (OSError, TypeError):
+            bytes_in = None
+        bytes_out = None
+        if data.get("success"):
+            try:
+                bytes_out = os.path.getsize(job.output_path)
+            except OSError:
+                pass
+        target_bytes = int(job.target_mb * 1024 * 1024)
+        # Audio terpisah (2-pass) terukur; selain itu tidak ada pembagian video/audio yang nyata.
+        audio_bytes = job.audio_bytes
+        video_bytes = bytes_out - audio_bytes if bytes_out and audio_bytes else None
+        size_error = (bytes_out - target_bytes) / target_bytes * 100 if bytes_out and target_bytes else None
+        try:
+            encoder = job.ffmpeg_encoder
+        except KeyError:
+            encoder = None
+        return {
+            "format": METRICS_FORMAT,
+            "job_id": job.id,
+            "finished_at": now,
+            "status": job.status,
+            "message": data.get("message", job.message),
+            "input": job.input_path,
+            "output": job.output_path,
+            "codec": job.codec,
+            "encoder_type": job.encoder_type,
+            "encoder": encoder,
+            "preset": job.preset,
+            "rate_mode": job.rate_mode,
+            "chunked": bool(job.chunked or job.resumable),
+            "wall_seconds": _round(now - job.started_at) if job.started_at else None,
+            "hw_detect_seconds": _round(hw_detect),
+            "probe_seconds": metrics.stage_seconds("probe"),
+            "probe_cached": metrics.probe_cached,
+            # Mode chunked: jumlah waktu semua segmen (paralel), bukan waktu wall.
+            "pass1_seconds": metrics.stage_seconds("pass1", "chunk_pass1"),
+            "pass2_seconds": metrics.stage_seconds("pass2", "chunk_pass2"),
+            "stages": {name: {"seconds": _round(s["seconds"]), "count": s["count"],
+                              "cpu_seconds": _round(s["cpu_seconds"])}
+                       for name, s in sorted(metrics.stages.items())},
+            "fps_avg": _round(_mean(metrics.fps), 2),
+            "fps_p95": _round(percentile(metrics.fps, 95), 2),
+            "speed_avg": _round(_mean(metrics.speed)),
+            "speed_p95": _round(percentile(metrics.speed, 95)),
+            "cpu_seconds": _round(metrics.cpu_seconds),
+            "peak_rss_kb": metrics.peak_rss_kb,
+            "bytes_in": bytes_in,
+            "bytes_out": bytes_out,
+            "audio_bytes": audio_bytes,
+            "video_bytes": video_bytes,
+            "target_bytes": target_bytes,
+            "size_error_pct": _round(size_error, 2),
+        }
+
+    # --- Output ---
+    def write(self, record):
+        with self._lock:
+            self._accumulate(record)
+            if self.path:
+                try:
+                    with open(self.path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(record, ensure_ascii=False, sort_keys=True) + "\n")
+                except OSError:
+                    pass
+            if self.prom_path:
+                self._write_prom()
+
+    def _accumulate(self, record):
+        encoder = record["encoder"] or "unknown"
+        key = (encoder, record["status"])
+        self._jobs_total[key] = self._jobs_total.get(key, 0) + 1
+        for stage, entry in record["stages"].items():
+            self._stage_seconds[(encoder, stage)] = self._stage_seconds.get((encoder, stage), 0.0) + entry["seconds"]
+        self._cpu_seconds[encoder] = self._cpu_seconds.get(encoder, 0.0) + (record["cpu_seconds"] or 0.0)
+        for direction in ("in", "out"):
+            value = record[f"bytes_{direction}"] or 0
+            self._bytes[(encoder, direction)] = self._bytes.get((encoder, direction), 0) + value
+        self._last[encoder] = record
+
+    def prometheus_text(self):
+        p = PROM_PREFIX
+        lines = [
+            f"# HELP {p}_jobs_total Job yang selesai per encoder dan status.",
+            f"# TYPE {p}_jobs_total counter",
+        ]
+        for (encoder, status), count in sorted(self._jobs_total.items()):
+            lines.append(f'{p}_jobs_total{{encoder="{_label(encoder)}",status="{_label(status)}"}} {count}')
+        lines += [f"# HELP {p}_stage_seconds_total Waktu wall per tahap.", f"# TYPE {p}_stage_seconds_total counter"]
+        for (encoder, stage), seconds in sorted(self._stage_seconds.items()):
+            lines.append(f'{p}_stage_seconds_total{{encoder="{_label(encoder)}",stage="{_label(stage)}"}} {seconds:.3f}')
+        lines += [f"# HELP {p}_cpu_seconds_total Waktu CPU proses ffmpeg.", f"# TYPE {p}_cpu_seconds_total counter"]
+        for encoder, seconds in sorted(self._cpu_seconds.items()):
+            lines.append(f'{p}_cpu_seconds_total{{encoder="{_label(encoder)}"}} {seconds:.3f}')
+        lines += [f"# HELP {p}_bytes_total Byte input/output job.", f"# TYPE {p}_bytes_total counter"]
+        for (encoder, direction), value in sorted(self._bytes.items()):
+            lines.append(f'{p}_bytes_total{{encoder="{_label(encoder)}",direction="{direction}"}} {value}')
+
+        gauges = (
+            ("last_job_wall_seconds", "wall_seconds", "Waktu wall job terakhir."),
+            ("last_job_fps_p95", "fps_p95", "Persentil 95 fps job terakhir."),
+            ("last_job_speed_avg", "speed_avg", "Rata-rata speed job terakhir."),
+            ("last_job_peak_rss_kb", "peak_rss_kb", "Puncak RSS ffmpeg job terakhir (KB)."),
+            ("last_job_size_error_pct", "size_error_pct", "Galat ukuran job terakhir terhadap target (%)."),
+            ("last_job_timestamp_seconds", "finished_at", "Waktu selesai job terakhir (epoch)."),
+        )
+        for name, field, help_text in gauges:
+            lines += [f"# HELP {p}_{name} {help_text}", f"# TYPE {p}_{name} gauge"]
+            for encoder, record in sorted(self._last.items()):
+                if record.get(field) is not None:
+                    lines.append(f'{p}_{name}{{encoder="{_label(encoder)}"}} {record[field]}')
+        if self.hw_detect_seconds is not None:
+            lines += [f"# HELP {p}_hw_detect_seconds Waktu deteksi encoder hardware terakhir.",
+                      f"# TYPE {p}_hw_detect_seconds gauge",
+                      f"{p}_hw_detect_seconds {self.hw_detect_seconds:.3f}"]
+        return "\n".join(lines) + "\n"
+
+    def _write_prom(self):
+        # Ganti file secara atomik agar collector tidak membaca file setengah jadi.
+        tmp = self.prom_path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(self.prometheus_text())
+            os.replace(tmp, self.prom_path)
+        except OSError:
+            pass
+
+
+def from_config(config, path=None, prom_path=None):
+    """MetricsCollector dari kunci config metrics_file / metrics_prom_file, atau None."""
+    path = path or config.get("metrics_file")
+    prom_path = prom_path or config.get("metrics_prom_file")
+    if not path and not prom_path:
+        return None
+    return MetricsCollector(path, prom_path)
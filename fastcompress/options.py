@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+# Nama File: fastcompress/options.py
+# Pilihan codec, encoder, algoritma dan mode audio. Modul ini sengaja tanpa
+# import lain agar parser CLI dan GUI bisa membangun pilihannya tanpa memuat
+# engine (asyncio, sqlite3, dst.) saat start.
+
+CODECS = ["H.264", "H.265", "AV1"]
+ALGORITHMS = ["Standard", "AI (Efisien)"]
+AUDIO_MODES = ["Re-encode (AAC 128k)", "Copy"]
+
+ENCODER_MAP = {
+    "H.264": {"Software": "libx264", "NVIDIA": "h264_nvenc", "AMD": "h264_amf", "Intel": "h264_qsv"},
+    "H.265": {"Software": "libx265", "NVIDIA": "hevc_nvenc", "AMD": "hevc_amf", "Intel": "hevc_qsv"},
+    "AV1": {"Software": "libaom-av1", "NVIDIA": "av1_nvenc", "AMD": "av1_amf", "Intel": "av1_qsv"}
+}
+
+# Encoder hardware yang diuji saat deteksi (tanpa "Software").
+HW_ENCODERS = {
+    codec: {brand: enc for brand, enc in brands.items() if brand != "Software"}
+    for codec, brands in ENCODER_MAP.items()
+}
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+# Nama File: fastcompress/outputcache.py
+# Cache hasil kompresi berbasis isi. Kunci = sidik jari cepat input (hash
+# blok sampel + ukuran) + seluruh parameter encode efektif + versi ffmpeg.
+# Job identik yang dikirim ulang cukup di-hardlink/copy dari cache.
+# Indeks SQLite menyimpan waktu pakai terakhir (eviksi LRU berbasis ukuran)
+# serta statistik hit/miss.
+
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+
+from .paths import cache_dir
+
+INDEX_FILE = "index.sqlite"
+CACHE_SUBDIR = "outputs"
+DEFAULT_MAX_MB = 2048
+# Sidik jari isi: blok sampel yang tersebar merata (selalu termasuk awal & akhir).
+SAMPLE_BLOCKS = 16
+BLOCK_SIZE = 1024 * 1024
+
+
+def content_fingerprint(path, blocks=SAMPLE_BLOCKS, block_size=BLOCK_SIZE):
+    """Hash blok sampel + ukuran file; membaca paling banyak blocks * block_size byte."""
+    size = os.path.getsize(path)
+    h = hashlib.sha256(str(size).encode("ascii"))
+    with open(path, "rb") as f:
+        if size <= blocks * block_size:
+            h.update(f.read())
+        else:
+            step = (size - block_size) / (blocks - 1)
+            for i in range(blocks):
+                f.seek(int(i * step))
+                h.update(f.read(block_size))
+    return h.hexdigest()
+
+
+def encode_params(job):
+    """Parameter encode efektif yang memengaruhi file output."""
+    return {
+        "codec": job.codec,
+        "encoder": job.ffmpeg_encoder,
+        "preset": job.preset,
+        "target_mb": round(job.target_mb, 6),
+        "audio_mode": job.audio_mode,
+        "audio_bitrate_k": job.audio_bitrate_k,
+        "rate_mode": job.rate_mode,
+        "chunked": bool(job.chunked or job.resumable),
+        "chunk_workers": job.chunk_workers,
+    }
+
+
+class OutputCache:
+    """Direktori berisi output ter-cache + indeks SQLite (LRU dan statistik)."""
+
+    def __init__(self, root=None, max_bytes=DEFAULT_MAX_MB * 1024 * 1024):
+        self.root = root or cache_dir(CACHE_SUBDIR)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(self.root, INDEX_FILE), check_same_thread=False, timeout=10)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, size INTEGER, created_at REAL, last_used REAL, hits INTEGER DEFAULT 0)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER)")
+        self._conn.commit()
+
+    def key_for(self, job, ffmpeg_version):
+        raw = json.dumps({
+            "content": content_fingerprint(job.input_path),
+            "params": encode_params(job),
+            "ffmpeg": ffmpeg_version,
+        }, sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key + ".mp4")
+
+    def _bump(self, name):
+        self._conn.execute("INSERT OR IGNORE INTO stats (name, value) VALUES (?, 0)", (name,))
+        self._conn.execute("UPDATE stats SET value = value + 1 WHERE name = ?", (name,))
+
+    def _drop(self, key):
+        self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def fetch(self, key, dest):
+        """Pasang output ter-cache di dest (hardlink, atau copy). True jika hit."""
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            path = self._path(key)
+            # Ukuran berbeda -> file cache rusak/diubah (mis. output hardlink ditimpa).
+            if row is not None and (not os.path.exists(path) or os.path.getsize(path) != row[0]):
+                self._drop(key)
+                row = None
+            if row is None:
+                self._bump("misses")
+                self._conn.commit()
+                return False
+            try:
+                place_file(path, dest)
+            except OSError:
+                self._bump("misses")
+                self._conn.commit()
+                return False
+            self._conn.execute("UPDATE entries SET last_used = ?, hits = hits + 1 WHERE key = ?", (time.time(), key))
+            self._bump("hits")
+            self._conn.commit()
+            return True
+
+    def put(self, key, src):
+        """Simpan output job ke cache lalu eviksi LRU bila melebihi max_bytes."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            place_file(src, path)
+        except OSError:
+            return False
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, size, created_at, last_used, hits) VALUES (?, ?, ?, ?, 0)",
+                (key, os.path.getsize(path), now, now))
+            self._evict(keep=key)
+            self._conn.commit()
+        return True
+
+    def _evict(self, keep=None):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY last_used").fetchall():
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            self._drop(key)
+            self._bump("evictions")
+            total -= size
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._conn.execute("SELECT name, value FROM stats").fetchall())
+            entries, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        hits, misses = counters.get("hits", 0), counters.get("misses", 0)
+        return {
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "evictions": counters.get("evictions", 0),
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+        }
+
+    def clear(self):
+        with self._lock:
+            for (key,) in self._conn.execute("SELECT key FROM entries").fetchall():
+                self._drop(key)
+            self._conn.execute("DELETE FROM stats")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def from_config(config, enabled=None):
+    """OutputCache dari kunci config output_cache / output_cache_max_mb, atau None."""
+    if enabled is None:
+        enabled = bool(config.get("output_cache", False))
+    if not enabled:
+        return None
+    max_mb = config.get("output_cache_max_mb") or DEFAULT_MAX_MB
+    try:
+        return OutputCache(max_bytes=int(float(max_mb) * 1024 * 1024))
+    except (sqlite3.Error, OSError, ValueError):
+        return None
+
+
+def unlink_if_shared(path):
+    """Hapus output lama yang ter-hardlink (mis. ke cache) agar tidak ditimpa di tempat."""
+    try:
+        if os.stat(path).st_nlink > 1:
+            os.remove(path)
+    except OSError:
+        pass
+
+
+def place_file(src, dest):
+    """Hardlink src ke dest (ganti secara atomik); copy bila beda volume/tidak didukung."""
+    tmp = dest + ".fctmp"
+    try:
+        os.remove(tmp)
+    except OSError:
+        pass
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dest)
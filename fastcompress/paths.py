@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+# Nama File: fastcompress/paths.py
+# Lokasi direktori data/cache FastCompress per pengguna dan direktori
+# scratch untuk file kerja job (pass log, sampel, segmen).
+
+import os
+import sys
+import tempfile
+
+
+def cache_dir(*parts):
+    """Direktori cache (dibuat bila belum ada).
+
+    Windows: %LOCALAPPDATA%\\FastCompress, macOS: ~/Library/Caches/FastCompress,
+    lainnya: $XDG_CACHE_HOME/fastcompress. Bisa dioverride FASTCOMPRESS_CACHE_DIR.
+    """
+    base = os.environ.get("FASTCOMPRESS_CACHE_DIR")
+    if not base:
+        if sys.platform == "win32":
+            base = os.path.join(os.environ.get("LOCALAPPDATA") or os.path.expanduser("~"), "FastCompress")
+        elif sys.platform == "darwin":
+            base = os.path.expanduser("~/Library/Caches/FastCompress")
+        else:
+            base = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "fastcompress")
+    path = os.path.join(base, *parts)
+    try:
+        os.makedirs(path, exist_ok=True)
+    except OSError:
+        # Home read-only (mis. akun servis): jatuh ke direktori temp.
+        path = os.path.join(tempfile.gettempdir(), "fastcompress", *parts)
+        os.makedirs(path, exist_ok=True)
+    return path
+
+
+def scratch_dir(base=None):
+    """Direktori induk untuk direktori kerja per job.
+
+    Urutan: argumen base (mis. kunci config "scratch_dir"), FASTCOMPRESS_SCRATCH_DIR,
+    lalu direktori temp sistem. Nilai "tmpfs" memilih /dev/shm bila ada.
+    """
+    base = base or os.environ.get("FASTCOMPRESS_SCRATCH_DIR")
+    if base == "tmpfs":
+        base = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    if not base:
+        return tempfile.gettempdir()
+    try:
+        os.makedirs(base, exist_ok=True)
+    except OSError:
+        return tempfile.gettempdir()
+    return base
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+# Nama File: fastcompress/planner.py
+# Mode perencanaan cepat: beberapa sampel pendek yang tersebar merata
+# di-encode pada dua nilai CRF/CQ, lalu model ukuran-vs-kualitas
+# (log bitrate linear terhadap q) dipakai untuk memilih q yang diprediksi
+# mendarat di target MB. Encode akhir cukup satu pass (CRF + batas VBV).
+# Hanya untuk encoder software 2-pass; encoder hardware sudah satu pass
+# (lihat ratecontrol.py).
+
+import math
+import os
+import shutil
+import tempfile
+
+SAMPLE_COUNT = 5
+SAMPLE_SECONDS = 4.0
+# Durasi minimum agar sampel tidak saling tumpang tindih; di bawahnya job tetap 2-pass.
+MIN_PLAN_DURATION = SAMPLE_COUNT * SAMPLE_SECONDS * 2
+# Di bawah ini prediksi dianggap tidak layak dan job kembali ke 2-pass.
+MIN_CONFIDENCE = 0.6
+# Batas VBV relatif terhadap bitrate target.
+VBV_MAXRATE_FACTOR = 1.5
+VBV_BUFSIZE_FACTOR = 2.0
+
+# encoder -> (nilai CRF sampel rendah/tinggi, rentang CRF valid).
+# libaom-av1 tidak ada di sini: tanpa mode chunked encoder itu ditolak engine.
+QUALITY_SCALES = {
+    "libx264": ((20, 30), (0, 51)),
+    "libx265": ((24, 32), (0, 51)),
+}
+
+
+def quality_args(encoder, q):
+    """Argumen mode kualitas konstan untuk encoder."""
+    if encoder in QUALITY_SCALES:
+        return ["-crf", f"{q:g}"]
+    raise ValueError(f"Encoder {encoder} tidak punya mode kualitas untuk sampel.")
+
+
+def vbv_args(target_k):
+    return ["-maxrate", f"{int(target_k * VBV_MAXRATE_FACTOR)}k",
+            "-bufsize", f"{int(target_k * VBV_BUFSIZE_FACTOR)}k"]
+
+
+class SizePlan:
+    """Hasil perencanaan: mode akhir, q, prediksi ukuran dan keyakinan."""
+
+    def __init__(self, mode, q=None, predicted_video_k=None, predicted_mb=None,
+                 confidence=0.0, error_pct=None, reason=""):
+        self.mode = mode  # "crf" | "2pass"
+        self.q = q
+        self.predicted_video_k = predicted_video_k
+        self.predicted_mb = predicted_mb
+        self.confidence = confidence
+        self.error_pct = error_pct
+        self.reason = reason
+
+    @property
+    def single_pass(self):
+        return self.mode == "crf"
+
+    def describe(self):
+        if self.mode == "2pass":
+            return f"2-pass klasik ({self.reason})"
+        return (f"CRF/CQ {self.q:g} + VBV, prediksi {self.predicted_mb:.2f} MB "
+                f"(±{self.error_pct:.0f}%, keyakinan {self.confidence:.0%})")
+
+
+def sample_starts(duration, count=SAMPLE_COUNT, length=SAMPLE_SECONDS):
+    """Titik awal sampel yang tersebar merata (tengah tiap segmen)."""
+    return [max(0.0, duration * (i + 0.5) / count - length / 2) for i in range(count)]
+
+
+def fit_quality_model(q_low, q_high, rates_low, rates_high):
+    """Fit ln(bitrate) = a + slope*q dari rata-rata sampel. Kembalikan (a, slope, cv)."""
+    mean_low = sum(rates_low) / len(rates_low)
+    mean_high = sum(rates_high) / len(rates_high)
+    if mean_low <= 0 or mean_high <= 0 or q_high == q_low:
+        raise ValueError("Sampel tidak menghasilkan data.")
+    slope = (math.log(mean_high) - math.log(mean_low)) / (q_high - q_low)
+    if slope >= 0:
+        raise ValueError("Ukuran tidak turun saat q naik.")
+    a = math.log(mean_low) - slope * q_low
+    # Variasi bitrate antar sampel -> ketidakpastian rata-rata.
+    var = sum((r - mean_low) ** 2 for r in rates_low) / len(rates_low)
+    cv = math.sqrt(var) / mean_low
+    return a, slope, cv
+
+
+class SizePlanner:
+    """Encode sampel lewat CompressionEngine dan pilih parameter satu pass."""
+
+    def __init__(self, engine, sample_count=SAMPLE_COUNT, sample_seconds=SAMPLE_SECONDS):
+        self.engine = engine
+        self.sample_count = sample_count
+        self.sample_seconds = sample_seconds
+
+    def build_sample_command(self, job, start, q, out_path):
+        encoder = job.ffmpeg_encoder
+        cmd = [
+            self.engine.ffmpeg, "-y",
+            "-ss", f"{start:.3f}", "-i", job.input_path,
+            "-t", f"{self.sample_seconds:g}",
+            "-map", "0:v:0", "-an",
+            "-c:v", encoder,
+        ] + quality_args(encoder, q) + ["-preset", job.preset, "-f", "mp4", out_path]
+        return cmd
+
+    def plan(self, job, duration, target_video_k, audio_bits_total):
+        encoder = job.ffmpeg_encoder
+
+        def total_mb(video_k):
+            return (video_k * 1000 * duration + audio_bits_total) / 8 / 1024 / 1024
+
+        if encoder not in QUALITY_SCALES:
+            return SizePlan("2pass", reason=f"{encoder} tidak didukung perencana")
+        if duration < self.sample_count * self.sample_seconds * 2:
+            return SizePlan("2pass", reason="video terlalu pendek untuk sampling")
+
+        (q_low, q_high), (q_min, q_max) = QUALITY_SCALES[encoder]
+        workdir = tempfile.mkdtemp(prefix="plan-", dir=job.workdir)
+        try:
+            rates = {q_low: [], q_high: []}
+            starts = sample_starts(duration, self.sample_count, self.sample_seconds)
+            n_total = len(starts) * 2
+            for i, start in enumerate(starts):
+                for q in (q_low, q_high):
+                    if job.cancel_requested:
+                        return None
+                    out_path = os.path.join(workdir, f"sample_{i}_{q}.mp4")
+                    done = len(rates[q_low]) + len(rates[q_high])
+                    self.engine.set_status(f"Status: Sampel {done + 1} dari {n_total}...", job=job)
+                    ok = self.engine.execute_ffmpeg_command(
+                        self.build_sample_command(job, start, q, out_path),
+                        self.sample_seconds, job, quiet=True, on_progress=lambda info: None, stage="sample")
+                    if not ok or not os.path.exists(out_path):
+                        if job.cancel_requested:
+                            return None
+                        return SizePlan("2pass", reason="encode sampel gagal")
+                    rates[q].append(os.path.getsize(out_path) * 8 / self.sample_seconds / 1000)
+
+            try:
+                a, slope, cv = fit_quality_model(q_low, q_high, rates[q_low], rates[q_high])
+            except ValueError as e:
+                return SizePlan("2pass", reason=str(e))
+
+            q = (math.log(target_video_k) - a) / slope
+            q = min(max(q, q_min), q_max)
+            q = round(q, 1)
+            predicted_k = math.exp(a + slope * q)
+
+            # Keyakinan turun dengan variasi antar sampel dan jauhnya ekstrapolasi.
+            sampling_err = cv / math.sqrt(self.sample_count)
+            outside = max(0.0, q_low - q, q - q_high)
+            confidence = max(0.0, min(1.0, 1.0 - sampling_err - 0.05 * outside))
+            plan = SizePlan("crf", q=q, predicted_video_k=predicted_k, predicted_mb=total_mb(predicted_k),
+                            confidence=confidence, error_pct=100 * (sampling_err + 0.02 * outside))
+            if confidence < MIN_CONFIDENCE:
+                plan.mode = "2pass"
+                plan.reason = f"keyakinan prediksi rendah ({confidence:.0%})"
+            return plan
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def build_final_command(self, job, plan, target_video_k, audio_bitrate_k):
+        encoder = job.ffmpeg_encoder
+        cmd = [self.engine.ffmpeg, "-y", "-i", job.input_path, "-c:v", encoder]
+        cmd += quality_args(encoder, plan.q) + vbv_args(target_video_k)
+        cmd += ["-preset", job.preset]
+        if "Copy" in job.audio_mode:
+            cmd += ["-c:a", "copy"]
+        else:
+            cmd += ["-c:a", "aac", "-b:a", f"{audio_bitrate_k}k"]
+        cmd.append(job.output_path)
+        return cmd
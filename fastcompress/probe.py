@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+# Nama File: fastcompress/probe.py
+# Satu panggilan ffprobe (JSON) per file untuk format, stream, codec,
+# resolusi, frame rate, interval keyframe dan bitrate. Hasilnya disimpan di
+# cache SQLite dengan kunci path + ukuran + mtime, sehingga batch dan retry
+# tidak mem-probe ulang file yang tidak berubah.
+
+import json
+import os
+import sqlite3
+import subprocess
+import threading
+import time
+
+from .paths import cache_dir
+from .system import CREATE_NO_WINDOW
+
+CACHE_FILE = "media_probe.sqlite"
+# Paket awal yang dibaca untuk memperkirakan interval keyframe.
+KEYFRAME_SAMPLE_PACKETS = 600
+# Batas waktu satu panggilan ffprobe (detik), mis. share jaringan yang macet.
+PROBE_TIMEOUT = 120
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _int(value):
+    value = _float(value)
+    return int(value) if value is not None else None
+
+
+def _rate(text):
+    """'30000/1001' -> 29.97; '0/0' -> None."""
+    if not text:
+        return None
+    num, _, den = str(text).partition("/")
+    num, den = _float(num), _float(den or 1)
+    if not num or not den:
+        return None
+    return num / den
+
+
+class MediaInfo:
+    """Metadata media hasil probe (bisa diserialisasi ke/dari dict)."""
+
+    FIELDS = (
+        "path", "size", "mtime_ns", "duration", "start_time", "format_name", "bit_rate",
+        "video_codec", "width", "height", "fps", "pix_fmt", "video_bit_rate",
+        "keyframe_interval", "audio_codec", "audio_bit_rate", "audio_channels",
+        "audio_sample_rate", "has_audio",
+    )
+
+    def __init__(self, **fields):
+        for name in self.FIELDS:
+            setattr(self, name, fields.get(name))
+
+    @classmethod
+    def from_ffprobe(cls, path, size, mtime_ns, data):
+        fmt = data.get("format", {})
+        streams = data.get("streams", [])
+        video = next((s for s in streams if s.get("codec_type") == "video"
+                      and not s.get("disposition", {}).get("attached_pic")), {})
+        audio = next((s for s in streams if s.get("codec_type") == "audio"), {})
+
+        duration = _float(fmt.get("duration")) or _float(video.get("duration"))
+        fps = _rate(video.get("avg_frame_rate")) or _rate(video.get("r_frame_rate"))
+
+        # Interval keyframe rata-rata dari paket awal stream video.
+        keyframe_interval = None
+        if video:
+            index = video.get("index")
+            key_times = [
+                _float(p.get("pts_time")) for p in data.get("packets", [])
+                if p.get("stream_index") == index and "K" in p.get("flags", "")
+            ]
+            key_times = sorted(t for t in key_times if t is not None)
+            if len(key_times) >= 2:
+                keyframe_interval = (key_times[-1] - key_times[0]) / (len(key_times) - 1)
+
+        return cls(
+            path=path,
+            size=size,
+            mtime_ns=mtime_ns,
+            duration=duration,
+            start_time=_float(fmt.get("start_time")),
+            format_name=fmt.get("format_name"),
+            bit_rate=_int(fmt.get("bit_rate")),
+            video_codec=video.get("codec_name"),
+            width=_int(video.get("width")),
+            height=_int(video.get("height")),
+            fps=fps,
+            pix_fmt=video.get("pix_fmt"),
+            video_bit_rate=_int(video.get("bit_rate")),
+            keyframe_interval=keyframe_interval,
+            audio_codec=audio.get("codec_name"),
+            audio_bit_rate=_int(audio.get("bit_rate")),
+            audio_channels=_int(audio.get("channels")),
+            audio_sample_rate=_int(audio.get("sample_rate")),
+            has_audio=bool(audio),
+        )
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{k: data.get(k) for k in cls.FIELDS})
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    @property
+    def audio_bitrate_k(self):
+        """Bitrate audio (k) seperti get_source_audio_bitrate: min 32k, fallback 128k."""
+        if self.audio_bit_rate:
+            return max(32, int(self.audio_bit_rate / 1000))
+        return 128
+
+    @property
+    def estimated_video_bit_rate(self):
+        """Bitrate video; bila stream tidak melaporkannya, turunkan dari ukuran file."""
+        if self.video_bit_rate:
+            return self.video_bit_rate
+        if self.duration and self.size:
+            total = self.size * 8 / self.duration
+            audio = self.audio_bit_rate or (128000 if self.has_audio else 0)
+            return max(0, int(total - audio))
+        return None
+
+    def __repr__(self):
+        return (f"MediaInfo({os.path.basename(self.path or '')!r}, {self.duration}s, "
+                f"{self.video_codec} {self.width}x{self.height}@{self.fps}, audio={self.audio_codec})")
+
+
+class ProbeCache:
+    """Cache SQLite: path -> (size, mtime_ns, MediaInfo JSON)."""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(cache_dir(), CACHE_FILE)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS probe ("
+            " path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER,"
+            " data TEXT, probed_at REAL)"
+        )
+        self._conn.commit()
+
+    def get(self, path, size, mtime_ns):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM probe WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (path, size, mtime_ns),
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return MediaInfo.from_dict(json.loads(row[0]))
+        except ValueError:
+            return None
+
+    def put(self, info):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO probe (path, size, mtime_ns, data, probed_at) VALUES (?, ?, ?, ?, ?)",
+                (info.path, info.size, info.mtime_ns, json.dumps(info.to_dict()), time.time()),
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class MediaProber:
+    """Probe file media sekali, lalu layani dari cache selama file tidak berubah."""
+
+    def __init__(self, ffprobe="ffprobe", cache=None, supervisor=None):
+        self.ffprobe = ffprobe
+        self.cache = cache
+        self.supervisor = supervisor  # ProcessSupervisor; None = subprocess.run biasa
+
+    def build_command(self, path):
+        return [
+            self.ffprobe, "-v", "error",
+            "-print_format", "json",
+            "-show_format", "-show_streams",
+            "-show_entries", "packet=stream_index,pts_time,flags",
+            "-read_intervals", f"%+#{KEYFRAME_SAMPLE_PACKETS}",
+            path
+        ]
+
+    def probe(self, path):
+        """Kembalikan (MediaInfo, dari_cache). Raise RuntimeError jika gagal."""
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        if self.cache is not None:
+            info = self.cache.get(path, st.st_size, st.st_mtime_ns)
+            if info is not None:
+                return info, True
+
+        if self.supervisor is not None:
+            res = self.supervisor.capture(self.build_command(path), timeout=PROBE_TIMEOUT)
+            if res.timed_out:
+                raise RuntimeError(f"ffprobe tidak selesai dalam {PROBE_TIMEOUT} detik")
+        else:
+            res = subprocess.run(self.build_command(path), capture_output=True, text=True,
+                                 encoding="utf-8", errors="replace", creationflags=CREATE_NO_WINDOW)
+        if res.returncode != 0:
+            err = (res.stderr or "").strip().splitlines()
+            raise RuntimeError(err[-1] if err else f"ffprobe exit code {res.returncode}")
+        try:
+            data = json.loads(res.stdout or "{}")
+        except ValueError as e:
+            raise RuntimeError(f"Output ffprobe tidak valid: {e}")
+
+        info = MediaInfo.from_ffprobe(path, st.st_size, st.st_mtime_ns, data)
+        if info.duration is None:
+            raise RuntimeError("Durasi tidak diketahui.")
+        if self.cache is not None:
+            self.cache.put(info)
+        return info, False
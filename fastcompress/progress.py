@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+# Nama File: fastcompress/progress.py
+# Kanal progress terstruktur dari ffmpeg "-progress pipe:1 -nostats".
+# ffmpeg menulis blok key=value yang diakhiri "progress=continue|end";
+# tiap blok diubah menjadi satu ProgressInfo (tanpa regex pada log stderr).
+
+import time
+from collections import namedtuple
+
+# Argumen yang disisipkan tepat setelah binary ffmpeg.
+PROGRESS_ARGS = ["-progress", "pipe:1", "-nostats"]
+# Saat stdout ffmpeg dipakai untuk data (streaming ke stdout), progress lewat stderr.
+STDERR_PROGRESS_ARGS = ["-progress", "pipe:2", "-nostats"]
+
+# Key yang ditulis ffmpeg di blok -progress; baris lain dianggap log biasa.
+PROGRESS_KEYS = frozenset((
+    "frame", "fps", "bitrate", "total_size", "out_time_us", "out_time_ms",
+    "out_time", "dup_frames", "drop_frames", "speed", "progress",
+))
+
+# Satu snapshot progress.
+#   out_time_us : posisi output (mikrodetik) dalam pass saat ini
+#   fps, speed  : float atau None ("N/A" dari ffmpeg)
+#   bitrate     : kbit/s atau None
+#   total_size  : byte output sejauh ini atau None
+#   pass_index/pass_count : pass saat ini (1-based) dan jumlah pass job
+#   value       : progress keseluruhan job 0..1 (semua pass)
+#   eta         : sisa waktu keseluruhan (detik) atau None
+#   done        : True pada blok terakhir ("progress=end")
+ProgressInfo = namedtuple("ProgressInfo", [
+    "out_time_us", "frame", "fps", "speed", "bitrate", "total_size",
+    "pass_index", "pass_count", "value", "eta", "done",
+])
+
+
+def _float(text, suffix=""):
+    if text is None:
+        return None
+    text = text.strip()
+    if suffix and text.endswith(suffix):
+        text = text[:-len(suffix)]
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def _int(text):
+    value = _float(text)
+    return int(value) if value is not None else None
+
+
+def split_progress_line(line):
+    """Kembalikan (key, value) jika baris adalah baris -progress, selain itu None."""
+    key, sep, value = line.strip().partition("=")
+    if sep and key in PROGRESS_KEYS:
+        return key, value
+    return None
+
+
+def format_eta(seconds):
+    if seconds is None:
+        return "--:--"
+    seconds = int(seconds)
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}:{m:02d}:{s:02d}" if h else f"{m:02d}:{s:02d}"
+
+
+class EtaEstimator:
+    """Perkiraan sisa waktu dari laju kerja aktual (detik media / detik jam).
+
+    Laju dihaluskan (EWMA) agar pass 1 yang biasanya lebih cepat tidak
+    membuat ETA pass 2 terlalu optimis terlalu lama.
+    """
+
+    def __init__(self, total_work, smoothing=0.2):
+        self.total_work = total_work
+        self.smoothing = smoothing
+        self.rate = None
+        self._last = None
+
+    def update(self, done_work, now=None):
+        now = time.monotonic() if now is None else now
+        if self._last is not None:
+            dt = now - self._last[0]
+            dw = done_work - self._last[1]
+            if dt > 0 and dw >= 0:
+                sample = dw / dt
+                self.rate = sample if self.rate is None else (
+                    self.smoothing * sample + (1 - self.smoothing) * self.rate)
+        self._last = (now, done_work)
+        if not self.rate:
+            return None
+        return max(0.0, (self.total_work - done_work) / self.rate)
+
+
+class ProgressParser:
+    """Menggabungkan baris key=value menjadi ProgressInfo per blok."""
+
+    def __init__(self, duration, pass_index=1, pass_count=1, eta=None):
+        self.duration = duration
+        self.pass_index = pass_index
+        self.pass_count = pass_count
+        self.eta = eta if eta is not None else EtaEstimator(duration * pass_count)
+        self._fields = {}
+
+    def feed(self, key, value):
+        """Tambahkan satu pasangan; kembalikan ProgressInfo saat blok selesai."""
+        if key != "progress":
+            self._fields[key] = value
+            return None
+        fields, self._fields = self._fields, {}
+
+        out_time_us = _int(fields.get("out_time_us"))
+        if out_time_us is None:
+            # ffmpeg lama hanya punya out_time_ms (yang sebenarnya juga mikrodetik).
+            out_time_us = _int(fields.get("out_time_ms"))
+        out_time_us = max(0, out_time_us or 0)
+        done = value.strip() == "end"
+
+        seconds = out_time_us / 1_000_000
+        if self.duration > 0:
+            seconds = min(self.duration, seconds)
+        if done:
+            seconds = self.duration
+        done_work = (self.pass_index - 1) * self.duration + seconds
+        total_work = self.duration * self.pass_count
+        overall = min(1.0, done_work / total_work) if total_work > 0 else 0.0
+
+        return ProgressInfo(
+            out_time_us=out_time_us,
+            frame=_int(fields.get("frame")),
+            fps=_float(fields.get("fps")),
+            speed=_float(fields.get("speed"), "x"),
+            bitrate=_float(fields.get("bitrate"), "kbits/s"),
+            total_size=_int(fields.get("total_size")),
+            pass_index=self.pass_index,
+            pass_count=self.pass_count,
+            value=overall,
+            eta=self.eta.update(done_work),
+            done=done,
+        )
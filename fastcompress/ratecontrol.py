@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+# Nama File: fastcompress/ratecontrol.py
+# Strategi rate control per encoder. libx264/libx265/libaom-av1 tetap
+# 2-pass sejati (-pass 1/2). Encoder hardware (NVENC/QSV/AMF) mengabaikan
+# -pass atau punya multipass internal, jadi cukup satu invocation dengan
+# multipass/lookahead/VBV bawaan encoder: sumber hanya di-decode sekali.
+# Mode streaming (sumber/tujuan berupa pipe) tidak bisa 2-pass: encoder
+# software memakai ABR satu pass dengan batas VBV, output fragmented MP4.
+
+from .system import NULL_DEVICE
+
+# Batas VBV relatif terhadap bitrate target untuk mode satu pass.
+MAXRATE_FACTOR = 1.5
+BUFSIZE_FACTOR = 2.0
+# Path "-" = stdin (input) / stdout (output) pada mode streaming.
+STDIO = "-"
+# MP4 yang bisa ditulis ke pipe: moov kosong di awal, fragmen per keyframe.
+FRAGMENTED_MOVFLAGS = "+frag_keyframe+empty_moov+default_base_moof"
+
+
+def audio_args(job, audio_bitrate_k):
+    if "Copy" in job.audio_mode:
+        return ["-c:a", "copy"]
+    return ["-c:a", "aac", "-b:a", f"{audio_bitrate_k}k"]
+
+
+def input_args(job, audio_path=None):
+    """Input ffmpeg; audio_path = audio yang sudah di-encode terpisah (di-mux dengan copy)."""
+    source = job.source or job.input_path
+    if audio_path is None:
+        return ["-i", source]
+    return ["-i", source, "-i", audio_path, "-map", "0:v:0", "-map", "1:a:0"]
+
+
+def output_args(job):
+    """Tujuan ffmpeg: file biasa, atau fragmented MP4 ke stdout/pipe (streaming)."""
+    if not job.streaming:
+        return [job.output_path]
+    target = "pipe:1" if job.output_path == STDIO else job.output_path
+    return ["-movflags", FRAGMENTED_MOVFLAGS, "-f", "mp4", target]
+
+
+def output_audio_args(job, audio_bitrate_k, audio_path=None):
+    return ["-c:a", "copy"] if audio_path is not None else audio_args(job, audio_bitrate_k)
+
+
+def build_audio_command(ffmpeg, job, audio_bitrate_k, audio_path):
+    """Encode (atau copy) audio saja ke file terpisah, paralel dengan pass 1."""
+    return [ffmpeg, "-y", "-i", job.input_path, "-map", "0:a:0", "-vn",
+            ] + audio_args(job, audio_bitrate_k) + ["-f", "mp4", audio_path]
+
+
+def vbv_args(video_k):
+    return ["-b:v", f"{video_k}k",
+            "-maxrate", f"{int(video_k * MAXRATE_FACTOR)}k",
+            "-bufsize", f"{int(video_k * BUFSIZE_FACTOR)}k"]
+
+
+class EncodeStep:
+    """Satu invocation ffmpeg dalam strategi (label untuk log/status)."""
+
+    def __init__(self, label, command):
+        self.label = label
+        self.command = command
+
+
+class RateControlStrategy:
+    name = ""
+    description = ""
+
+    def build_steps(self, ffmpeg, job, video_k, audio_bitrate_k, audio_path=None):
+        raise NotImplementedError
+
+
+class TwoPassStrategy(RateControlStrategy):
+    """2-pass sejati untuk encoder software."""
+
+    name = "2pass"
+    description = "2-pass (statistik pass 1)"
+
+    def build_steps(self, ffmpeg, job, video_k, audio_bitrate_k, audio_path=None):
+        encoder = job.ffmpeg_encoder
+        pass1_cmd = [
+            ffmpeg, "-y", "-i", job.input_path,
+            "-c:v", encoder,
+            "-b:v", f"{video_k}k",
+            "-pass", "1",
+            "-passlogfile", job.passlog_prefix,
+            "-preset", job.preset,
+            "-an",
+        ]
+        if encoder == "libaom-av1":
+            pass1_cmd.extend(["-cpu-used", "4"])
+        pass1_cmd.extend(["-f", "mp4", NULL_DEVICE])
+
+        pass2_cmd = [ffmpeg, "-y"] + input_args(job, audio_path) + [
+            "-c:v", encoder,
+            "-b:v", f"{video_k}k",
+            "-pass", "2",
+            "-passlogfile", job.passlog_prefix,
+            "-preset", job.preset,
+        ] + output_audio_args(job, audio_bitrate_k, audio_path)
+        if encoder == "libaom-av1":
+            pass2_cmd.extend(["-cpu-used", "1"])
+        pass2_cmd.append(job.output_path)
+        return [EncodeStep("PASS 1", pass1_cmd), EncodeStep("PASS 2", pass2_cmd)]
+
+
+class SinglePassStrategy(RateControlStrategy):
+    """Satu invocation dengan rate control internal encoder hardware."""
+
+    def build_steps(self, ffmpeg, job, video_k, audio_bitrate_k, audio_path=None):
+        cmd = [ffmpeg, "-y"] + input_args(job, audio_path) + ["-c:v", job.ffmpeg_encoder]
+        cmd += self.encoder_args(job, video_k)
+        cmd += output_audio_args(job, audio_bitrate_k, audio_path)
+        cmd += output_args(job)
+        return [EncodeStep("ENCODE (1 PASS)", cmd)]
+
+    def encoder_args(self, job, video_k):
+        raise NotImplementedError
+
+
+class NvencStrategy(SinglePassStrategy):
+    """NVENC: VBR dengan multipass resolusi penuh + lookahead dalam satu proses."""
+
+    name = "nvenc-multipass"
+    description = "NVENC VBR multipass fullres + lookahead"
+
+    def encoder_args(self, job, video_k):
+        slow = job.preset == "slow"
+        return [
+            "-preset", "p7" if slow else "p5",
+            "-tune", "hq",
+            "-rc", "vbr",
+            "-multipass", "fullres",
+            "-rc-lookahead", "32" if slow else "20",
+            "-spatial-aq", "1",
+        ] + vbv_args(video_k)
+
+
+class QsvStrategy(SinglePassStrategy):
+    """Intel QSV: VBR dengan lookahead (LA-BRC / extbrc) dan batas VBV."""
+
+    name = "qsv-lookahead"
+    description = "QSV VBR + lookahead"
+
+    def encoder_args(self, job, video_k):
+        slow = job.preset == "slow"
+        args = ["-preset", "slower" if slow else "medium"]
+        if job.ffmpeg_encoder == "h264_qsv":
+            args += ["-look_ahead", "1", "-look_ahead_depth", "40" if slow else "20"]
+        else:
+            args += ["-extbrc", "1", "-look_ahead_depth", "40" if slow else "20"]
+        return args + vbv_args(video_k)
+
+
+class AmfStrategy(SinglePassStrategy):
+    """AMD AMF: VBR peak-constrained dengan pre-analysis."""
+
+    name = "amf-vbr-peak"
+    description = "AMF VBR peak + pre-analysis"
+
+    def encoder_args(self, job, video_k):
+        slow = job.preset == "slow"
+        return [
+            "-quality", "quality" if slow else "balanced",
+            "-rc", "vbr_peak",
+            "-preanalysis", "1",
+        ] + vbv_args(video_k)
+
+
+class AbrStrategy(SinglePassStrategy):
+    """Encoder software tanpa pass 1 (streaming): ABR dengan batas VBV."""
+
+    name = "abr-vbv"
+    description = "ABR 1 pass + VBV (streaming)"
+
+    def encoder_args(self, job, video_k):
+        args = ["-preset", job.preset]
+        if job.ffmpeg_encoder == "libaom-av1":
+            args = ["-cpu-used", "6", "-row-mt", "1"]
+        return args + vbv_args(video_k)
+
+
+def strategy_for(encoder):
+    """Pilih strategi rate control otomatis dari nama encoder ffmpeg."""
+    if encoder.endswith("_nvenc"):
+        return NvencStrategy()
+    if encoder.endswith("_qsv"):
+        return QsvStrategy()
+    if encoder.endswith("_amf"):
+        return AmfStrategy()
+    return TwoPassStrategy()
+
+
+def streaming_strategy_for(encoder):
+    """Strategi satu pass untuk mode streaming (2-pass diganti ABR + VBV)."""
+    strategy = strategy_for(encoder)
+    return AbrStrategy() if isinstance(strategy, TwoPassStrategy) else strategy
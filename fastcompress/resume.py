@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+# Nama File: fastcompress/resume.py
+# Encode yang bisa dilanjutkan: mode chunked dengan segmen ber-checkpoint.
+# Rencana segmen dan daftar segmen yang selesai disimpan di file state kecil
+# di direktori cache (bukan direktori kerja sementara), sehingga setelah
+# batal, crash atau reboot, job yang sama (input + pengaturan identik)
+# melanjutkan dari segmen terakhir yang selesai. State yang ditinggalkan
+# (job tidak pernah dilanjutkan, atau pengaturannya berubah sehingga kuncinya
+# lain) dibersihkan oleh prune_states() menurut umur dan total ukuran.
+
+import hashlib
+import json
+import os
+import shutil
+import time
+
+from .paths import cache_dir
+
+STATE_FILE = "state.json"
+# Format 2: awal segmen relatif terhadap start_time container (format 1 memakai pts mentah).
+STATE_FORMAT = 2
+RESUME_DIR = "resume"
+# State tanpa pembaruan selama ini dianggap ditinggalkan.
+STATE_TTL_SECONDS = 7 * 24 * 3600
+# Batas total ukuran direktori resume (segmen bisa berukuran GB); yang tertua dihapus dulu.
+MAX_RESUME_BYTES = 20 * 1024 * 1024 * 1024
+# State yang diperbarui dalam jendela ini dianggap milik job yang sedang berjalan
+# (antrean yang sama, atau proses CLI/GUI lain) dan tidak pernah dihapus; state
+# disimpan saat job dimulai/dilanjutkan dan setiap segmen selesai.
+ACTIVE_SECONDS = 24 * 3600
+
+
+def job_key(job, media):
+    """Kunci job: input (path, ukuran, mtime) + semua pengaturan yang memengaruhi hasil."""
+    parts = [
+        os.path.abspath(job.input_path),
+        str(media.size if media is not None else ""),
+        str(media.mtime_ns if media is not None else ""),
+        os.path.abspath(job.output_path),
+        f"{job.target_mb:.6f}", job.codec, job.encoder_type, job.algorithm, job.audio_mode,
+        str(job.audio_bitrate_k),
+    ]
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+class JobState:
+    """Direktori + state.json untuk satu job yang bisa dilanjutkan."""
+
+    def __init__(self, key, directory=None):
+        self.key = key
+        self.dir = directory or cache_dir(RESUME_DIR, key)
+        self.path = os.path.join(self.dir, STATE_FILE)
+        self.chunks = None  # list dict rencana segmen
+        self.done = set()   # indeks segmen yang selesai
+
+    @classmethod
+    def open(cls, job, media, directory=None):
+        """Muat state yang ada untuk job ini, atau state baru yang kosong."""
+        state = cls(job_key(job, media), directory)
+        try:
+            with open(state.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("format") == STATE_FORMAT and data.get("key") == state.key:
+                chunks = data.get("chunks")
+                # Rencana harus list dict berurutan 0..n-1; selain itu state dibuang.
+                if isinstance(chunks, list) and all(isinstance(c, dict) and c.get("index") == i
+                                                    for i, c in enumerate(chunks)):
+                    state.chunks = chunks
+                    state.done = {i for i in data.get("done", []) if isinstance(i, int) and 0 <= i < len(chunks)}
+        except (OSError, ValueError, AttributeError, TypeError):
+            pass
+        return state
+
+    @property
+    def resumed(self):
+        return bool(self.chunks)
+
+    def save(self):
+        data = {
+            "format": STATE_FORMAT,
+            "key": self.key,
+            "chunks": self.chunks or [],
+            "done": sorted(self.done),
+            "updated_at": time.time(),
+        }
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+    def mark_done(self, index):
+        self.done.add(index)
+        self.save()
+
+    def remove(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def _updated_at(path):
+    try:
+        with open(os.path.join(path, STATE_FILE), "r", encoding="utf-8") as f:
+            return float(json.load(f).get("updated_at", 0))
+    except (OSError, ValueError, AttributeError, TypeError):
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return 0.0
+
+
+def prune_states(keep=None, ttl=STATE_TTL_SECONDS, max_bytes=MAX_RESUME_BYTES, root=None,
+                 active=ACTIVE_SECONDS):
+    """Hapus state resume yang kedaluwarsa, lalu yang tertua bila total melebihi max_bytes.
+
+    keep: kunci state yang sedang dipakai (tidak dihapus). State yang diperbarui dalam
+    `active` detik terakhir juga tidak dihapus, tetapi ukurannya tetap dihitung.
+    Kembalikan jumlah state yang dihapus.
+    """
+    root = root or cache_dir(RESUME_DIR)
+    now = time.time()
+    entries = []
+    try:
+        names = os.listdir(root)
+    except OSError:
+        return 0
+    for name in names:
+        path = os.path.join(root, name)
+        if name == keep or not os.path.isdir(path):
+            continue
+        entries.append((_updated_at(path), path))
+
+    removed = 0
+    remaining = []
+    total = 0
+    for updated, path in entries:
+        if now - updated < active:
+            total += _dir_size(path)
+        elif now - updated > ttl:
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+        else:
+            remaining.append((updated, _dir_size(path), path))
+    total += sum(size for _, size, _ in remaining)
+    if keep:
+        total += _dir_size(os.path.join(root, keep))
+    for updated, size, path in sorted(remaining):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+        removed += 1
+    return removed
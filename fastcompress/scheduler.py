@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+# Nama File: fastcompress/scheduler.py
+# Antrean batch dengan worker pool yang sadar sumber daya: slot terpisah
+# untuk encoder software (CPU) dan tiap keluarga hardware (NVIDIA/Intel/AMD),
+# sehingga sesi NVENC bisa berjalan bersamaan dengan job x264. Core CPU
+# dibagi di antara slot Software (lihat cpubudget.py).
+
+import heapq
+import itertools
+import threading
+
+from .cpubudget import CpuBudget, describe
+from .defaults import DEFAULT_SLOTS
+
+
+def resource_class(job):
+    """Kelas sumber daya yang dipakai job: "Software" atau nama brand hardware."""
+    return "Software" if job.encoder_type == "Software" else job.encoder_type
+
+
+class JobQueue:
+    """Antrean job berprioritas yang dijalankan paralel oleh worker pool.
+
+    Prioritas lebih tinggi dijalankan lebih dulu; dengan prioritas sama,
+    urutan submit dipertahankan. Job yang kelas sumber dayanya penuh dilewati
+    sementara sehingga job lain (mis. NVENC) tetap bisa jalan.
+    """
+
+    def __init__(self, engine, slots=None, cpu_budget=None):
+        self.engine = engine
+        self.slots = dict(DEFAULT_SLOTS)
+        if slots:
+            self.slots.update(slots)
+        # Satu kelompok CPU per slot Software; False = tanpa anggaran (semua core, tanpa pin).
+        if cpu_budget is None:
+            cpu_budget = CpuBudget(max(1, self.slots.get("Software", 1)))
+        self.cpu_budget = cpu_budget or None
+        if self.cpu_budget is not None and len(self.cpu_budget.groups) < self.slots.get("Software", 1):
+            # Slot melebihi jumlah CPU: kelompok tidak bisa disjoint, jalankan lebih sedikit worker.
+            self.slots["Software"] = len(self.cpu_budget.groups)
+        self.jobs = []
+        self._heap = []
+        self._seq = itertools.count()
+        self._running = {}  # kelas sumber daya -> jumlah job berjalan
+        self._threads = {}
+        self._cond = threading.Condition()
+        self._closed = False
+        self._dispatcher = None
+
+    # --- Submit / Kontrol ---
+    def submit(self, job, priority=None):
+        if priority is not None:
+            job.priority = priority
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("JobQueue sudah ditutup.")
+            job.status = "queued"
+            self.jobs.append(job)
+            heapq.heappush(self._heap, (-job.priority, next(self._seq), job))
+            self._cond.notify_all()
+        self.engine.set_status(f"Status: Dalam antrean (#{job.id})", level="idle", job=job)
+        return job
+
+    def submit_many(self, jobs):
+        return [self.submit(job) for job in jobs]
+
+    def set_priority(self, job, priority):
+        """Ubah prioritas job yang masih antre."""
+        with self._cond:
+            job.priority = priority
+            if job.status != "queued":
+                return False
+            self._heap = [(-j.priority, seq, j) for _, seq, j in self._heap]
+            heapq.heapify(self._heap)
+            self._cond.notify_all()
+            return True
+
+    def cancel(self, job):
+        with self._cond:
+            queued = job.status == "queued"
+            if queued:
+                self._heap = [entry for entry in self._heap if entry[2] is not job]
+                heapq.heapify(self._heap)
+                job.cancel()
+                job.canceled = True
+            self._cond.notify_all()
+        if queued:
+            self.engine.finish(job, False, "Dibatalkan.")
+        else:
+            self.engine.cancel(job)
+
+    def cancel_all(self):
+        for job in list(self.jobs):
+            if not job.finished:
+                self.cancel(job)
+
+    def prune(self):
+        """Lupakan job yang sudah selesai (antrean berumur panjang, mis. mode watch)."""
+        with self._cond:
+            self.jobs = [job for job in self.jobs if not job.finished]
+
+    def find(self, job_id):
+        for job in self.jobs:
+            if job.id == job_id:
+                return job
+        return None
+
+    # --- Worker Pool ---
+    def start(self):
+        if self._dispatcher is None:
+            self._dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True)
+            self._dispatcher.start()
+        return self
+
+    def close(self):
+        """Tidak menerima job baru; dispatcher berhenti setelah antrean habis."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def wait(self, timeout=None):
+        """Tunggu sampai semua job selesai. True jika semuanya sukses."""
+        with self._cond:
+            self._cond.wait_for(self._idle, timeout)
+        return all(job.status == "done" for job in self.jobs)
+
+    def counts(self):
+        result = {}
+        with self._cond:
+            for job in self.jobs:
+                result[job.status] = result.get(job.status, 0) + 1
+        return result
+
+    def _idle(self):
+        return not self._heap and not self._threads
+
+    def _has_slot(self, resource):
+        return self._running.get(resource, 0) < max(1, self.slots.get(resource, 1))
+
+    def _next_runnable(self):
+        for entry in sorted(self._heap):
+            if self._has_slot(resource_class(entry[2])):
+                self._heap.remove(entry)
+                heapq.heapify(self._heap)
+                return entry[2]
+        return None
+
+    def _dispatch_loop(self):
+        with self._cond:
+            while True:
+                job = self._next_runnable()
+                if job is None:
+                    if self._closed and self._idle():
+                        return
+                    self._cond.wait()
+                    continue
+                resource = resource_class(job)
+                self._running[resource] = self._running.get(resource, 0) + 1
+                job.status = "starting"
+                thread = threading.Thread(target=self._worker, args=(job, resource), daemon=True)
+                self._threads[job.id] = thread
+                thread.start()
+
+    def _worker(self, job, resource):
+        if resource == "Software" and self.cpu_budget is not None:
+            job.cpu_alloc = self.cpu_budget.acquire()
+            if job.cpu_alloc is not None:
+                self.engine.log(f"Anggaran CPU: {describe(job.cpu_alloc)}", job)
+        try:
+            self.engine.run(job)
+        except Exception as e:
+            self.engine.finish(job, False, f"Error tak terduga: {e}")
+        finally:
+            if job.cpu_alloc is not None:
+                self.cpu_budget.release(job.cpu_alloc)
+                job.cpu_alloc = None
+            with self._cond:
+                self._running[resource] -= 1
+                self._threads.pop(job.id, None)
+                self._cond.notify_all()
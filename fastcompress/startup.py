@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+# Nama File: fastcompress/startup.py
+# Pengukuran cold start. Perintah headless (python -m fastcompress ..., atau
+# EXE CLI hasil PyInstaller) dijalankan berulang sebagai proses baru; waktu
+# wall dibandingkan dengan anggaran, dan satu run dengan -X importtime
+# menunjukkan import terlambat serta memastikan Tk tidak pernah dimuat (dan
+# untuk --version/--help juga asyncio/sqlite3).
+
+import os
+import subprocess
+import sys
+import time
+
+from .defaults import DEFAULT_RUNS, HEADLESS_BUDGET_MS
+from .metrics import percentile
+from .system import CREATE_NO_WINDOW
+
+# Modul GUI yang tidak boleh dimuat jalur headless.
+GUI_MODULES = ("tkinter", "_tkinter", "customtkinter")
+# Modul berat (engine, indeks watch) yang tidak boleh dimuat perintah ringan.
+HEAVY_MODULES = ("asyncio", "sqlite3")
+# Perintah yang cukup dengan parser: harus start tanpa HEAVY_MODULES.
+LIGHT_COMMANDS = ("--version", "--help", "-h")
+
+
+def headless_command(args):
+    """Perintah untuk menjalankan CLI pada proses baru (juga saat frozen/EXE)."""
+    if getattr(sys, "frozen", False):
+        return [sys.executable] + list(args)
+    return [sys.executable, "-m", "fastcompress"] + list(args)
+
+
+def parse_importtime(text):
+    """Baris -X importtime -> list (nama modul, self ms, kumulatif ms, kedalaman)."""
+    rows = []
+    for line in text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue  # baris judul
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append((name.strip(), self_us / 1000.0, cumulative_us / 1000.0, depth))
+    return rows
+
+
+def _run(command, env=None):
+    started = time.perf_counter()
+    res = subprocess.run(command, stdin=subprocess.DEVNULL, capture_output=True, text=True, env=env,
+                         creationflags=CREATE_NO_WINDOW)
+    return (time.perf_counter() - started) * 1000.0, res
+
+
+def forbidden_modules(args):
+    """Modul yang tidak boleh dimuat perintah `args` (selain GUI_MODULES)."""
+    args = list(args) or ["--version"]
+    return HEAVY_MODULES if args[0] in LIGHT_COMMANDS or args[-1] in ("--help", "-h") else ()
+
+
+def measure(args, runs=DEFAULT_RUNS, top=8):
+    """Ukur cold start perintah CLI `args`; kembalikan dict hasil."""
+    command = headless_command(args)
+    _run(command)  # pemanasan: cache file OS, __pycache__
+    times, returncode = [], 0
+    for _ in range(max(1, runs)):
+        ms, res = _run(command)
+        times.append(ms)
+        returncode = returncode or res.returncode
+
+    imports, gui_loaded, heavy_loaded = [], None, None
+    if not getattr(sys, "frozen", False):
+        env = dict(os.environ, PYTHONPROFILEIMPORTTIME="1")
+        _, res = _run(command, env)
+        rows = parse_importtime(res.stderr)
+        loaded = {name.split(".")[0] for name, _, _, _ in rows}
+        gui_loaded = sorted(loaded.intersection(GUI_MODULES))
+        heavy_loaded = sorted(loaded.intersection(forbidden_modules(args)))
+        imports = sorted(((name, round(cum, 1)) for name, _, cum, depth in rows if depth == 0),
+                         key=lambda item: -item[1])[:top]
+    return {
+        "command": command,
+        "runs": len(times),
+        "returncode": returncode,
+        "median_ms": round(percentile(times, 50), 1),
+        "p95_ms": round(percentile(times, 95), 1),
+        "min_ms": round(min(times), 1),
+        "gui_modules": gui_loaded,
+        "heavy_modules": heavy_loaded,
+        "slowest_imports": imports,
+    }
+
+
+def check_budget(result, budget_ms=HEADLESS_BUDGET_MS):
+    """List pelanggaran (str); kosong bila cold start memenuhi anggaran."""
+    problems = []
+    if result["returncode"] != 0:
+        problems.append(f"perintah keluar dengan kode {result['returncode']}")
+    if result["median_ms"] > budget_ms:
+        problems.append(f"median {result['median_ms']:g} ms > anggaran {budget_ms:g} ms")
+    if result["gui_modules"]:
+        problems.append(f"modul GUI dimuat: {', '.join(result['gui_modules'])}")
+    if result.get("heavy_modules"):
+        problems.append(f"modul berat dimuat: {', '.join(result['heavy_modules'])}")
+    return problems
+
+
+def format_report(result):
+    lines = [
+        f"Perintah : {' '.join(result['command'])}",
+        f"Cold start ({result['runs']} run): median {result['median_ms']:g} ms, "
+        f"p95 {result['p95_ms']:g} ms, min {result['min_ms']:g} ms",
+    ]
+    if result["slowest_imports"]:
+        lines.append("Import terlama (kumulatif): " +
+                     ", ".join(f"{name} {ms:g} ms" for name, ms in result["slowest_imports"]))
+    return "\n".join(lines)
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# Nama File: fastcompress/streamcopy.py
+# Jalur cepat tanpa re-encode video. Dari bitrate stream hasil probe:
+#   remux       : target >= ukuran sumber -> semua stream di-copy
+#   video-copy  : video sudah di bawah anggaran -> -c:v copy, audio re-encode
+#                 (tidak di atas bitrate audio sumber; AAC sumber di-copy)
+#   audio-trim  : cukup menurunkan bitrate audio -> -c:v copy, audio lebih kecil
+# Selesai secepat disk, bukan berjam-jam encode. Remux juga dipakai bila codec
+# sumber berbeda dari pilihan selama codec itu bisa disimpan di MP4 (encode
+# ulang ke bitrate di atas sumber hanya memperbesar file dan menurunkan
+# kualitas); jalur lain hanya bila codec sumber sama dengan pilihan.
+
+# Nama codec ffprobe untuk pilihan codec di UI.
+CODEC_NAMES = {"H.264": "h264", "H.265": "hevc", "AV1": "av1"}
+# Codec video (nama ffprobe) yang bisa di-remux apa adanya ke MP4.
+MP4_COPY_CODECS = ("h264", "hevc", "av1", "vp9", "mpeg4")
+# Cadangan overhead container MP4 atas jumlah bitrate stream.
+MUX_OVERHEAD = 1.01
+# Bitrate AAC terendah yang masih layak untuk jalur audio-trim.
+MIN_AUDIO_K = 48
+
+
+class CopyPlan:
+    """Jalur stream-copy yang dipilih (kind) beserta bitrate audio dan alasannya."""
+
+    def __init__(self, kind, audio_bitrate_k=None, estimated_bytes=None, reason=""):
+        self.kind = kind  # "remux" | "video-copy" | "audio-trim"
+        self.audio_bitrate_k = audio_bitrate_k  # None = audio di-copy
+        self.estimated_bytes = estimated_bytes
+        self.reason = reason
+        self.failure = None  # diisi engine bila jalur ini dicoba tapi hasilnya tidak dipakai
+
+    def describe(self):
+        if self.audio_bitrate_k is None:
+            video_copy = "video dan audio di-copy"
+        else:
+            video_copy = f"video di-copy, audio re-encode AAC {self.audio_bitrate_k}k"
+        labels = {
+            "remux": "remux (semua stream di-copy)",
+            "video-copy": video_copy,
+            "audio-trim": f"video di-copy, audio diturunkan ke AAC {self.audio_bitrate_k}k",
+        }
+        return f"{labels[self.kind]}: {self.reason}"
+
+
+def plan_stream_copy(job, media, target_bytes, audio_bitrate_k):
+    """Pilih jalur stream-copy, atau None bila video harus di-encode ulang."""
+    if media is None or not media.duration:
+        return None
+    size_mb = (media.size or 0) / 1024 / 1024
+    if media.size and media.size <= target_bytes and media.video_codec in MP4_COPY_CODECS:
+        reason = f"sumber {size_mb:.2f} MB <= target {job.target_mb:.2f} MB"
+        if media.video_codec != CODEC_NAMES.get(job.codec):
+            reason += f", codec sumber ({media.video_codec}) dipertahankan"
+        return CopyPlan("remux", estimated_bytes=media.size, reason=reason)
+    if media.video_codec != CODEC_NAMES.get(job.codec):
+        return None
+    if "Copy" in job.audio_mode:
+        return None  # audio juga di-copy -> sama dengan remux yang tidak muat
+
+    video_bps = media.estimated_video_bit_rate
+    if not video_bps:
+        return None
+    duration = media.duration
+    video_bytes = video_bps * duration / 8 * MUX_OVERHEAD
+    if not media.has_audio:
+        if video_bytes <= target_bytes:
+            return CopyPlan("video-copy", estimated_bytes=int(video_bytes),
+                            reason=f"video {video_bps // 1000}k sudah di bawah anggaran")
+        return None
+
+    plan_audio_k, copy_audio = audio_bitrate_k, False
+    if media.audio_bit_rate and media.audio_bitrate_k <= audio_bitrate_k:
+        # Re-encode ke bitrate di atas sumber hanya memperbesar file: AAC
+        # sumber di-copy, codec lain dibatasi ke bitrate sumber.
+        plan_audio_k, copy_audio = media.audio_bitrate_k, media.audio_codec == "aac"
+    estimate = video_bytes + plan_audio_k * 1000 * duration / 8
+    if estimate <= target_bytes:
+        return CopyPlan("video-copy", None if copy_audio else plan_audio_k, int(estimate),
+                        reason=f"video {video_bps // 1000}k sudah di bawah anggaran")
+
+    # Sisa anggaran untuk audio setelah video di-copy.
+    audio_k = int((target_bytes - video_bytes) * 8 / duration / 1000)
+    if audio_k >= MIN_AUDIO_K:
+        return CopyPlan("audio-trim", audio_k, int(video_bytes + audio_k * 1000 * duration / 8),
+                        reason=f"cukup memangkas audio ({plan_audio_k}k -> {audio_k}k)")
+    return None
+
+
+def build_copy_command(ffmpeg, job, plan):
+    cmd = [ffmpeg, "-y", "-i", job.input_path, "-map", "0:v:0", "-map", "0:a:0?", "-c:v", "copy"]
+    if job.media is not None and job.media.video_codec == "hevc":
+        cmd += ["-tag:v", "hvc1"]  # agar HEVC dalam MP4 terbaca di perangkat Apple
+    if plan.audio_bitrate_k is None:
+        cmd += ["-c:a", "copy"]
+    else:
+        cmd += ["-c:a", "aac", "-b:a", f"{plan.audio_bitrate_k}k"]
+    cmd += ["-movflags", "+faststart", job.output_path]
+    return cmd
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+# Nama File: fastcompress/streaming.py
+# Mode streaming: sumber dibaca dari stdin atau named pipe dan hasilnya
+# ditulis sebagai fragmented MP4 ke stdout atau pipe selama encode berjalan,
+# tanpa salinan sementara di disk. Hanya jalur satu pass (encoder hardware,
+# atau ABR + VBV untuk encoder software). Durasi untuk anggaran bitrate
+# diambil dari Job.duration, dari probe biasa bila input file biasa, atau
+# di-probe dari awal stream (pipe/FIFO): potongan awal itu ditahan di memori
+# lalu diteruskan ke ffmpeg sebelum sisa stream.
+
+import json
+import os
+import shutil
+import stat
+import sys
+import threading
+
+from .probe import PROBE_TIMEOUT, MediaInfo
+from .ratecontrol import STDIO, streaming_strategy_for
+
+# Potongan awal stream yang dibaca untuk ffprobe (header container).
+PROBE_HEAD_BYTES = 4 * 1024 * 1024
+COPY_BUFFER = 1024 * 1024
+
+
+def open_source(job):
+    """File objek biner untuk input job (stdin atau named pipe/file)."""
+    if job.input_path == STDIO:
+        return sys.stdin.buffer
+    return open(job.input_path, "rb")
+
+
+def is_regular_file(path):
+    """True untuk file biasa (bisa di-seek); False untuk stdin, FIFO, socket, dst."""
+    if path == STDIO:
+        return False
+    try:
+        return stat.S_ISREG(os.stat(path).st_mode)
+    except OSError:
+        return False
+
+
+def probe_head(ffprobe, head, supervisor):
+    """MediaInfo dari potongan awal stream, atau None bila header tidak cukup."""
+    cmd = [ffprobe, "-v", "error", "-print_format", "json", "-show_format", "-show_streams", "pipe:0"]
+    res = supervisor.capture(cmd, timeout=PROBE_TIMEOUT, input=head)
+    if res.returncode != 0 or res.timed_out:
+        return None
+    try:
+        data = json.loads(res.stdout or "{}")
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or not data.get("streams"):
+        return None
+    return MediaInfo.from_ffprobe("pipe:0", None, None, data)
+
+
+def feed(head, source, fd):
+    """Tulis potongan awal lalu sisa stream ke pipe stdin ffmpeg (blocking = backpressure)."""
+    try:
+        with open(fd, "wb") as sink:
+            sink.write(head)
+            shutil.copyfileobj(source, sink, COPY_BUFFER)
+    except (BrokenPipeError, OSError, ValueError):
+        pass  # ffmpeg berhenti (selesai/batal/gagal) sebelum stream habis
+
+
+class StreamEncoder:
+    """Menjalankan satu Job streaming lewat CompressionEngine."""
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def run(self, job):
+        engine = self.engine
+        source = head = media = None
+        if job.duration is None and is_regular_file(job.input_path):
+            # File biasa bisa di-seek: probe penuh (moov di akhir file pun terbaca) dan ffmpeg
+            # membaca file langsung, tanpa potongan awal di memori.
+            media = engine.probe_media(job)
+            if media is None or not media.duration:
+                return engine.finish(job, False, "Durasi input tidak diketahui; berikan durasi (--duration).")
+        elif job.duration is None:
+            engine.log("Membaca awal stream untuk probe...", job)
+            try:
+                source = open_source(job)
+                head = source.read(PROBE_HEAD_BYTES)
+            except OSError as e:
+                return engine.finish(job, False, f"Tidak bisa membaca input: {e}")
+            media = probe_head(engine.ffprobe, head, engine.supervisor)
+            if media is None or not media.duration:
+                return engine.finish(job, False, "Durasi stream tidak diketahui; berikan durasi (--duration).")
+            job.media = media
+        duration = job.duration or media.duration
+        if head is not None:
+            engine.log(f"Durasi stream: {duration:.2f} detik (probe awal stream)", job)
+        elif media is None:
+            engine.log(f"Durasi stream: {duration:.2f} detik", job)
+
+        if "Copy" in job.audio_mode:
+            audio_bitrate_k = media.audio_bitrate_k if media is not None else job.audio_bitrate_k
+        else:
+            audio_bitrate_k = job.audio_bitrate_k
+        has_audio = media.has_audio if media is not None else True
+        total_bits_target = job.target_mb * 8 * 1024 * 1024
+        audio_bits_total = audio_bitrate_k * 1000 * duration if has_audio else 0
+        video_k = int((total_bits_target - audio_bits_total) / duration / 1000)
+        if video_k <= 0:
+            return engine.finish(job, False, "Target terlalu kecil setelah alokasi audio.")
+
+        encoder = job.ffmpeg_encoder
+        if job.codec == "AV1" and job.encoder_type == "Software":
+            engine.log("PERINGATAN: AV1 software satu pass sangat lambat untuk streaming.", job)
+        strategy = streaming_strategy_for(encoder)
+        if job.rate_mode != "2pass" or job.chunked or job.resumable:
+            engine.log("Streaming hanya memakai jalur satu pass; mode chunked/perencanaan diabaikan.", job)
+
+        stdin = stdout = None
+        feeder = None
+        if head is not None:
+            read_fd, write_fd = os.pipe()
+            stdin = read_fd
+        elif job.input_path == STDIO:
+            stdin = sys.stdin.fileno()
+        if head is not None or job.input_path == STDIO:
+            job.source = "pipe:0"
+        if job.output_path == STDIO:
+            sys.stdout.flush()
+            stdout = sys.stdout.fileno()
+
+        step = strategy.build_steps(engine.ffmpeg, job, video_k, audio_bitrate_k)[-1]
+        engine.log(f"Menggunakan encoder: {encoder}", job)
+        engine.log(f"Rate control: {strategy.description}, target video bitrate {video_k}k", job)
+        engine.set_status("Status: Streaming...", job=job)
+        engine.log(f"\n--- MEMULAI {step.label} (STREAMING) ---", job)
+
+        if head is not None:
+            feeder = threading.Thread(target=feed, args=(head, source, write_fd), daemon=True)
+        try:
+            if feeder is not None:
+                feeder.start()
+            ok = engine.execute_ffmpeg_command(step.command, duration, job, stage="stream", stdin=stdin, stdout=stdout)
+        finally:
+            if head is not None:
+                os.close(read_fd)  # penulis berikutnya mendapat EPIPE dan berhenti
+            if feeder is not None:
+                feeder.join(timeout=1)
+            # Feeder yang masih menunggu data upstream dibiarkan (daemon); close akan ikut menunggu.
+            if source is not None and source is not sys.stdin.buffer and (feeder is None or not feeder.is_alive()):
+                source.close()
+        if not ok:
+            if job.canceled:
+                return engine.finish(job, False, "Dibatalkan.")
+            return engine.finish(job, False, f"Gagal pada {step.label.title()} (streaming).")
+        return engine.finish(job, True, "Streaming selesai!")
@@ -0,0 +1,377 @@
+# -*- coding: utf-8 -*-
+# Nama File: fastcompress/supervisor.py
+# Supervisor proses berbasis asyncio. Semua proses anak ffmpeg/ffprobe
+# berjalan di satu event loop (satu thread latar, berapa pun jumlah job)
+# dengan pembacaan pipe non-blocking. Fitur:
+#   - timeout per proses: total (timeout) dan tanpa output (idle_timeout)
+#   - batal seketika, walau proses tidak menulis apa pun: terminate, lalu
+#     kill bila tidak keluar dalam KILL_GRACE_SECONDS
+#   - backpressure: baris output masuk antrean terbatas; bila konsumen
+#     lambat, pembacaan berhenti sehingga pipe penuh dan ffmpeg menunggu,
+#     bukan memori yang terus membesar.
+# Di POSIX anak dibuat dengan Popen + connect_read_pipe dan dituai dengan
+# os.wait4 (tanpa child watcher, rusage tetap tersedia); di Windows lewat
+# asyncio.create_subprocess_exec pada ProactorEventLoop.
+
+import asyncio
+import os
+import queue
+import subprocess
+import threading
+import time
+from collections import namedtuple
+
+from .system import (CREATE_NO_WINDOW, child_usage, poll_child, sample_peak_rss, set_process_affinity,
+                     spawn_affinity)
+
+# Jeda antara terminate dan kill saat membatalkan/timeout (detik).
+KILL_GRACE_SECONDS = 5.0
+# Jumlah baris output yang boleh menunggu konsumen sebelum pembacaan ditahan.
+LINE_BUFFER = 256
+# Batas panjang satu baris; baris yang lebih panjang dibuang.
+LINE_LIMIT = 1024 * 1024
+REAP_INTERVAL = 0.05
+# Sisa output yang masih dibaca setelah proses dihentikan (detik); pipe yang
+# masih dipegang proses cucu tidak menahan pemanggil lebih lama dari ini.
+DRAIN_SECONDS = 1.0
+BACKPRESSURE_WAIT = 0.02
+# Interval pembacaan puncak memori anak selama berjalan (detik, lihat system.sample_peak_rss).
+RSS_SAMPLE_SECONDS = 0.2
+# Interval pemeriksaan batal dari sisi konsumen (detik).
+CANCEL_POLL = 0.1
+
+_USE_PIPES = os.name != "nt"
+
+# Hasil satu proses yang diawasi.
+#   returncode : kode keluar (negatif = sinyal di POSIX) atau None bila gagal start
+#   timed_out  : dihentikan karena timeout / idle_timeout
+#   canceled   : dihentikan karena cancel()
+#   cpu_seconds, peak_rss_kb : pemakaian sumber daya (None bila tidak tersedia)
+ProcessResult = namedtuple("ProcessResult", ["returncode", "timed_out", "canceled", "cpu_seconds", "peak_rss_kb"])
+# Hasil capture (ffprobe, uji encoder): stdout/stderr sebagai teks.
+CaptureResult = namedtuple("CaptureResult", ["returncode", "stdout", "stderr", "timed_out"])
+
+
+class _Child:
+    """Proses anak yang sudah berjalan: pembaca pipe + wait/terminate/kill."""
+
+    def __init__(self, popen, stdout, stderr, process=None):
+        self.popen = popen
+        self.stdout = stdout
+        self.stderr = stderr
+        self.process = process  # asyncio.subprocess.Process (Windows)
+        self.pid = process.pid if process is not None else popen.pid
+
+    async def wait(self):
+        if self.process is not None:
+            return await self.process.wait()
+        while poll_child(self.popen) is None:
+            await asyncio.sleep(REAP_INTERVAL)
+        return self.popen.returncode
+
+    def signal(self, kill=False):
+        target = self.process if self.process is not None else self.popen
+        try:
+            target.kill() if kill else target.terminate()
+        except (ProcessLookupError, OSError):
+            pass
+
+    def sample_usage(self):
+        sample_peak_rss(self.popen)
+
+    def usage(self):
+        if self.popen is None:
+            return None, None
+        return child_usage(self.popen)
+
+
+async def _pipe_reader(loop, pipe):
+    reader = asyncio.StreamReader(limit=LINE_LIMIT)
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), pipe)
+    return reader
+
+
+async def _spawn(loop, command, merge_stderr, cpus=None, stdin=None, stdout=None):
+    """stdin/stdout: fd atau file yang diwariskan ke anak (None = DEVNULL / pipe yang dibaca)."""
+    stdin = subprocess.DEVNULL if stdin is None else stdin
+    if stdout is None:
+        stderr = subprocess.STDOUT if merge_stderr else subprocess.PIPE
+        stdout = subprocess.PIPE
+    else:
+        stderr = subprocess.PIPE  # stdout milik pemanggil (mis. streaming): baca stderr
+    if _USE_PIPES:
+        # Spawn terjadi di thread loop: pin sementara agar anak mewarisi affinity.
+        with spawn_affinity(cpus):
+            popen = subprocess.Popen(command, stdin=stdin, stdout=stdout, stderr=stderr,
+                                     creationflags=CREATE_NO_WINDOW)
+        stdout_reader = await _pipe_reader(loop, popen.stdout) if popen.stdout is not None else None
+        stderr_reader = await _pipe_reader(loop, popen.stderr) if popen.stderr is not None else None
+        return _Child(popen, stdout_reader, stderr_reader)
+    process = await asyncio.create_subprocess_exec(
+        *command, stdin=stdin, stdout=stdout, stderr=stderr,
+        limit=LINE_LIMIT, creationflags=CREATE_NO_WINDOW)
+    # Popen di balik transport: handle prosesnya dipakai untuk GetProcessTimes.
+    transport = getattr(process, "_transport", None)
+    popen = transport.get_extra_info("subprocess") if transport is not None else None
+    set_process_affinity(popen, cpus)
+    return _Child(popen, process.stdout, process.stderr, process)
+
+
+async def _write_input(loop, child, data):
+    """Tulis data ke stdin anak tanpa memblokir loop; pipe ditutup setelah buffer terkirim.
+
+    Anak yang berhenti membaca lebih awal (mis. ffprobe setelah header) tidak
+    dianggap error: transport membuang sisa data saat pipe putus.
+    """
+    if child.process is not None:
+        transport = child.process.stdin.transport
+    else:
+        transport, _ = await loop.connect_write_pipe(asyncio.Protocol, child.popen.stdin)
+    transport.write(data)
+    transport.close()
+
+
+async def _stop(child, grace):
+    """terminate -> tunggu grace detik -> kill."""
+    child.signal()
+    try:
+        return await asyncio.wait_for(child.wait(), grace)
+    except asyncio.TimeoutError:
+        child.signal(kill=True)
+        return await child.wait()
+
+
+class ProcessHandle:
+    """Satu proses yang diawasi; dibaca dari thread pemanggil lewat lines()."""
+
+    def __init__(self, supervisor, command, timeout, idle_timeout, cpus=None, stdin=None, stdout=None):
+        self.supervisor = supervisor
+        self.command = command
+        self.cpus = cpus
+        self.stdin = stdin
+        self.stdout = stdout
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.pid = None
+        self.error = None
+        self.last_output = time.monotonic()
+        self._lines = queue.Queue(maxsize=LINE_BUFFER)
+        self._spawned = threading.Event()
+        self._cancel = None  # asyncio.Event, dibuat di loop
+        self._detached = False
+        self._future = None
+
+    # --- Sisi pemanggil (thread mana pun) ---
+    def cancel(self):
+        """Hentikan proses sekarang juga (terminate, lalu kill)."""
+        self.supervisor.call_soon(self._request_cancel)
+
+    def _request_cancel(self):
+        if self._cancel is not None:
+            self._cancel.set()
+
+    def lines(self, should_cancel=None):
+        """Iterasi baris output (str) sampai proses selesai.
+
+        should_cancel() diperiksa tiap CANCEL_POLL detik walau tidak ada output.
+        """
+        try:
+            while True:
+                if should_cancel is not None and should_cancel():
+                    self.cancel()
+                try:
+                    line = self._lines.get(timeout=CANCEL_POLL)
+                except queue.Empty:
+                    continue
+                if line is None:
+                    return
+                yield line
+        finally:
+            self._detached = True
+
+    def wait(self):
+        """Tunggu proses selesai; kembalikan ProcessResult."""
+        self._detached = True
+        return self._future.result()
+
+    # --- Sisi event loop ---
+    async def _offer(self, text):
+        while not self._detached:
+            try:
+                self._lines.put_nowait(text)
+                return
+            except queue.Full:
+                # Konsumen tertinggal: tahan pembacaan (pipe penuh -> ffmpeg menunggu).
+                self.last_output = time.monotonic()
+                await asyncio.sleep(BACKPRESSURE_WAIT)
+
+    async def _pump(self, reader):
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                continue  # baris melebihi LINE_LIMIT, sisanya dibuang
+            if not line:
+                return
+            self.last_output = time.monotonic()
+            await self._offer(line.decode("utf-8", "replace"))
+
+    def _expired(self, started):
+        now = time.monotonic()
+        if self.timeout and now - started > self.timeout:
+            return True
+        return bool(self.idle_timeout) and now - self.last_output > self.idle_timeout
+
+    async def _run(self, loop):
+        self._cancel = asyncio.Event()
+        try:
+            child = await _spawn(loop, self.command, merge_stderr=True, cpus=self.cpus,
+                                 stdin=self.stdin, stdout=self.stdout)
+        except Exception as e:
+            self.error = e
+            self._spawned.set()
+            await self._offer(None)
+            return ProcessResult(None, False, False, None, None)
+        self.pid = child.pid
+        self._spawned.set()
+        started = time.monotonic()
+        pump = loop.create_task(self._pump(child.stdout or child.stderr))
+        canceled = asyncio.ensure_future(self._cancel.wait())
+        timed_out = was_canceled = False
+        try:
+            while not pump.done():
+                child.sample_usage()
+                await asyncio.wait({pump, canceled}, timeout=RSS_SAMPLE_SECONDS, return_when=asyncio.FIRST_COMPLETED)
+                if canceled.done():
+                    was_canceled = True
+                    break
+                if self._expired(started):
+                    timed_out = True
+                    break
+            if timed_out or was_canceled:
+                returncode = await _stop(child, self.supervisor.kill_grace)
+                try:
+                    await asyncio.wait_for(pump, DRAIN_SECONDS)
+                except (asyncio.TimeoutError, asyncio.CancelledError):
+                    pump.cancel()
+            else:
+                returncode = await child.wait()
+        finally:
+            canceled.cancel()
+        cpu_seconds, peak_rss_kb = child.usage()
+        await self._offer(None)
+        return ProcessResult(returncode, timed_out, was_canceled, cpu_seconds, peak_rss_kb)
+
+
+class ProcessSupervisor:
+    """Satu event loop asyncio (thread latar) untuk semua proses anak."""
+
+    def __init__(self, timeout=None, idle_timeout=None, kill_grace=KILL_GRACE_SECONDS):
+        # Default per proses; bisa ditimpa per panggilan start().
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.kill_grace = kill_grace
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="fastcompress-supervisor",
+                                                daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def call_soon(self, callback):
+        self._ensure_loop().call_soon_threadsafe(callback)
+
+    def submit(self, coro):
+        """Jadwalkan coroutine di loop supervisor; kembalikan concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    # --- Proses dengan output baris (ffmpeg) ---
+    def start(self, command, timeout=None, idle_timeout=None, cpus=None, stdin=None, stdout=None):
+        """Jalankan proses (stderr digabung ke stdout). Raise OSError bila gagal start.
+
+        cpus: CPU tempat proses di-pin (None = tanpa pin). stdin/stdout: fd yang
+        diwariskan ke anak; bila stdout diberikan, baris dibaca dari stderr.
+        """
+        loop = self._ensure_loop()
+        handle = ProcessHandle(self, command, timeout if timeout is not None else self.timeout,
+                               idle_timeout if idle_timeout is not None else self.idle_timeout, cpus,
+                               stdin, stdout)
+        handle._future = self.submit(handle._run(loop))
+        handle._spawned.wait()
+        if handle.error is not None:
+            handle._future.result()
+            error = handle.error
+            raise error if isinstance(error, OSError) else OSError(str(error))
+        return handle
+
+    # --- Proses yang outputnya ditampung (ffprobe, uji encoder) ---
+    async def _capture(self, command, timeout, input=None):
+        loop = asyncio.get_running_loop()
+        try:
+            child = await _spawn(loop, command, merge_stderr=False,
+                                 stdin=subprocess.PIPE if input is not None else None)
+        except OSError as e:
+            return CaptureResult(None, "", str(e), False)
+        if input is not None:
+            try:
+                await _write_input(loop, child, input)
+            except OSError:
+                pass  # anak sudah keluar; returncode/stderr menjelaskan sebabnya
+        reads = asyncio.gather(child.stdout.read(), child.stderr.read())
+        timed_out = False
+        try:
+            out, err = await asyncio.wait_for(asyncio.shield(reads), timeout)
+            returncode = await child.wait()
+        except asyncio.TimeoutError:
+            timed_out = True
+            returncode = await _stop(child, self.kill_grace)
+            try:
+                out, err = await asyncio.wait_for(reads, self.kill_grace)
+            except asyncio.TimeoutError:
+                out, err = b"", b""
+        return CaptureResult(returncode, out.decode("utf-8", "replace"), err.decode("utf-8", "replace"), timed_out)
+
+    def capture(self, command, timeout=None, input=None):
+        """Jalankan proses sampai selesai; kembalikan CaptureResult.
+
+        input: bytes yang ditulis ke stdin proses (None = stdin DEVNULL).
+        """
+        return self.submit(self._capture(command, timeout or self.timeout, input)).result()
+
+    def capture_many(self, commands, timeout=None):
+        """Jalankan banyak proses bersamaan di loop yang sama; list CaptureResult sesuai urutan."""
+        async def gather():
+            return await asyncio.gather(*(self._capture(cmd, timeout or self.timeout) for cmd in commands))
+        return self.submit(gather()).result()
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_supervisor():
+    """Supervisor bersama untuk satu proses Python."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = ProcessSupervisor()
+        return _default
+
+
+def from_config(config):
+    """Supervisor dengan timeout dari kunci config process_timeout / process_idle_timeout."""
+    timeout = config.get("process_timeout")
+    idle_timeout = config.get("process_idle_timeout")
+    if not timeout and not idle_timeout:
+        return default_supervisor()
+    try:
+        return ProcessSupervisor(timeout=float(timeout) if timeout else None,
+                                 idle_timeout=float(idle_timeout) if idle_timeout else None)
+    except (TypeError, ValueError):
+        return default_supervisor()
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+# Nama File: fastcompress/system.py
+# Konstanta dan helper khusus platform untuk menjalankan proses ffmpeg/ffprobe.
+
+import os
+import subprocess
+import sys
+
+NULL_DEVICE = 'NUL' if sys.platform == 'win32' else '/dev/null'
+# CREATE_NO_WINDOW hanya ada di Windows; di Linux/macOS pakai 0.
+CREATE_NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+
+# --- Pemakaian sumber daya proses anak ---
+# Di POSIX anak dituai dengan os.wait4 agar waktu CPU dan puncak RSS-nya
+# tersimpan; di Windows dibaca dari handle proses (GetProcessTimes /
+# GetProcessMemoryInfo) setelah proses selesai. Di Linux ru_maxrss anak
+# fork/exec mewarisi puncak RSS induk (high-water mark mm lama terbawa
+# melewati exec), sehingga puncak RSS diambil dari VmHWM /proc/<pid>/status
+# yang dibaca berkala selama proses masih berjalan.
+
+_PROC_HWM = sys.platform.startswith("linux")
+
+
+def _proc_hwm_kb(pid):
+    """VmHWM (KB) proses yang masih berjalan; None bila tidak tersedia (mis. sudah zombie)."""
+    try:
+        with open(f"/proc/{pid}/status", "rb") as f:
+            for line in f:
+                if line.startswith(b"VmHWM:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def sample_peak_rss(process):
+    """Catat VmHWM anak yang masih berjalan (Linux); dipanggil berkala oleh supervisor."""
+    if _PROC_HWM and process is not None and process.returncode is None:
+        hwm = _proc_hwm_kb(process.pid)
+        if hwm:
+            process.fc_hwm_kb = max(getattr(process, "fc_hwm_kb", 0), hwm)
+
+
+def _exit_code(status):
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+def poll_child(process):
+    """Seperti Popen.poll(), tetapi menyimpan rusage anak (POSIX)."""
+    if process.returncode is not None or not hasattr(os, "wait4"):
+        return process.poll()
+    sample_peak_rss(process)
+    try:
+        pid, status, rusage = os.wait4(process.pid, os.WNOHANG)
+    except ChildProcessError:
+        return process.poll()
+    if pid == 0:
+        return None
+    process.returncode = _exit_code(status)
+    process.fc_rusage = rusage
+    return process.returncode
+
+
+def child_usage(process):
+    """(detik CPU user+sys, puncak RSS dalam KB) proses yang sudah selesai; None bila tidak tersedia."""
+    rusage = getattr(process, "fc_rusage", None)
+    if rusage is not None:
+        if _PROC_HWM:
+            # ru_maxrss tidak dipakai (lihat di atas); None bila proses selesai sebelum sempat dibaca.
+            rss = getattr(process, "fc_hwm_kb", None)
+        else:
+            # macOS melaporkan ru_maxrss dalam byte.
+            rss = rusage.ru_maxrss // 1024 if sys.platform == "darwin" else rusage.ru_maxrss
+        return rusage.ru_utime + rusage.ru_stime, rss
+    if sys.platform == "win32":
+        return _win_child_usage(process)
+    return None, None
+
+
+def _win_child_usage(process):
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (name, ctypes.c_size_t) for name in (
+                    "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                    "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")
+            ]
+
+        handle = wintypes.HANDLE(int(process._handle))
+        times = [wintypes.FILETIME() for _ in range(4)]
+        cpu = None
+        if ctypes.windll.kernel32.GetProcessTimes(handle, *[ctypes.byref(t) for t in times]):
+            kernel, user = times[2], times[3]
+            cpu = sum((t.dwHighDateTime << 32 | t.dwLowDateTime) for t in (kernel, user)) / 1e7
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        rss = None
+        if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            rss = counters.PeakWorkingSetSize // 1024
+        return cpu, rss
+    except Exception:
+        return None, None
+
+
+# --- Affinity CPU proses anak ---
+
+class spawn_affinity:
+    """Context manager: pin thread pemanggil ke cpus selama spawn.
+
+    Di Linux affinity berlaku per thread dan diwarisi proses anak dari thread
+    yang membuatnya, jadi anak langsung ter-pin sejak instruksi pertama tanpa
+    preexec_fn. Tanpa sched_setaffinity (Windows/macOS) tidak melakukan apa pun.
+    """
+
+    def __init__(self, cpus):
+        self.cpus = cpus if cpus and hasattr(os, "sched_setaffinity") else None
+        self.previous = None
+
+    def __enter__(self):
+        if self.cpus:
+            try:
+                self.previous = os.sched_getaffinity(0)
+                os.sched_setaffinity(0, self.cpus)
+            except OSError:
+                self.previous = None
+        return self
+
+    def __exit__(self, *exc):
+        if self.previous is not None:
+            try:
+                os.sched_setaffinity(0, self.previous)
+            except OSError:
+                pass
+
+
+def set_process_affinity(process, cpus):
+    """Windows: SetProcessAffinityMask pada proses yang sudah berjalan (CPU 0-63)."""
+    if not cpus or sys.platform != "win32" or process is None:
+        return False
+    try:
+        import ctypes
+        mask = 0
+        for cpu in cpus:
+            if cpu < 64:
+                mask |= 1 << cpu
+        if not mask:
+            return False
+        return bool(ctypes.windll.kernel32.SetProcessAffinityMask(int(process._handle), ctypes.c_size_t(mask)))
+    except Exception:
+        return False
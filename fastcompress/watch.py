@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+# Nama File: fastcompress/watch.py
+# Mode watch-folder: memindai satu atau lebih direktori input, menunggu file
+# berhenti bertambah besar, lalu memasukkan video baru ke JobQueue dengan
+# pengaturan dari fastcompress_config.json. Status per file (pending /
+# inflight / done / failed) disimpan di indeks SQLite, sehingga restart tidak
+# meng-encode ulang file yang sudah selesai. Direktori hanya di-list ulang
+# bila mtime-nya berubah, jadi direktori berisi 100k entri tetap murah dicek.
+
+import os
+import sqlite3
+import threading
+import time
+
+from .config import CONFIG_FILE, load_config
+from .defaults import POLL_SECONDS, SETTLE_SECONDS
+from .paths import cache_dir
+from .scheduler import JobQueue
+
+INDEX_FILE = "watch_index.sqlite"
+VIDEO_EXTENSIONS = (".mp4", ".mkv", ".mov", ".avi", ".webm", ".m4v", ".ts", ".mts", ".wmv", ".flv")
+OUTPUT_SUFFIX = "_compressed.mp4"
+
+
+def is_candidate(name):
+    lower = name.lower()
+    return lower.endswith(VIDEO_EXTENSIONS) and not lower.endswith(OUTPUT_SUFFIX)
+
+
+class WatchIndex:
+    """Indeks SQLite: status tiap file input dan mtime terakhir tiap direktori."""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(cache_dir(), INDEX_FILE)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " path TEXT PRIMARY KEY, dir TEXT, size INTEGER, mtime_ns INTEGER, state TEXT,"
+            " stable_since REAL, output TEXT, message TEXT, attempts INTEGER DEFAULT 0, updated_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS files_state ON files (state)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS files_dir ON files (dir)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS dirs (path TEXT PRIMARY KEY, mtime_ns INTEGER)")
+        self._conn.commit()
+
+    def recover(self):
+        """Job inflight dari sesi sebelumnya (crash/kill) dikembalikan ke pending."""
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE files SET state = 'pending', stable_since = NULL WHERE state = 'inflight'")
+            self._conn.commit()
+            return cur.rowcount
+
+    def dir_mtime(self, path):
+        with self._lock:
+            row = self._conn.execute("SELECT mtime_ns FROM dirs WHERE path = ?", (path,)).fetchone()
+        return row[0] if row else None
+
+    def set_dir_mtime(self, path, mtime_ns):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO dirs (path, mtime_ns) VALUES (?, ?)", (path, mtime_ns))
+            self._conn.commit()
+
+    def known(self, directory):
+        """path -> (size, mtime_ns, state) untuk semua file yang tercatat di direktori."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, size, mtime_ns, state FROM files WHERE dir = ?", (directory,)).fetchall()
+        return {path: (size, mtime_ns, state) for path, size, mtime_ns, state in rows}
+
+    def add_pending(self, entries):
+        """entries: list (path, dir, size, mtime_ns). File lama yang berubah diulang dari awal."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO files (path, dir, size, mtime_ns, state, stable_since, attempts, updated_at)"
+                " VALUES (?, ?, ?, ?, 'pending', ?, 0, ?)",
+                [(p, d, size, mtime_ns, now, now) for p, d, size, mtime_ns in entries])
+            self._conn.commit()
+
+    def pending(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT path, size, mtime_ns, stable_since FROM files WHERE state = 'pending' ORDER BY updated_at"
+            ).fetchall()
+
+    def touch_pending(self, path, size, mtime_ns, stable_since):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE files SET size = ?, mtime_ns = ?, stable_since = ?, updated_at = ? WHERE path = ?",
+                (size, mtime_ns, stable_since, time.time(), path))
+            self._conn.commit()
+
+    def set_state(self, path, state, output=None, message=None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE files SET state = ?, output = COALESCE(?, output), message = ?, updated_at = ?,"
+                " attempts = attempts + (CASE WHEN ? = 'inflight' THEN 1 ELSE 0 END) WHERE path = ?",
+                (state, output, message, time.time(), state, path))
+            self._conn.commit()
+
+    def remove(self, path):
+        with self._lock:
+            self._conn.execute("DELETE FROM files WHERE path = ?", (path,))
+            self._conn.commit()
+
+    def counts(self):
+        with self._lock:
+            return dict(self._conn.execute("SELECT state, COUNT(*) FROM files GROUP BY state").fetchall())
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class WatchFolder:
+    """Loop watch: pindai direktori, tunggu file stabil, kirim ke JobQueue."""
+
+    def __init__(self, engine, directories, config_path=CONFIG_FILE, index=None, output_dir=None,
+                 settle_seconds=SETTLE_SECONDS, poll_seconds=POLL_SECONDS, slots=None, max_inflight=None):
+        self.engine = engine
+        self.directories = [os.path.abspath(d) for d in directories]
+        self.config_path = config_path
+        self.index = index or WatchIndex()
+        self.output_dir = output_dir
+        self.settle_seconds = settle_seconds
+        self.poll_seconds = poll_seconds
+        self.queue = JobQueue(engine, slots=slots)
+        # Backpressure: file stabil lainnya tetap pending sampai ada slot antre.
+        self.max_inflight = max_inflight or 2 * sum(self.queue.slots.values())
+        self._inflight = {}  # path -> Job
+        self._config_error = None  # error config terakhir yang sudah dilog
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        engine.subscribe(self._on_event)
+
+    # --- Pindai ---
+    def scan(self, directory):
+        """List ulang direktori hanya bila mtime-nya berubah; catat file baru sebagai pending."""
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except OSError as e:
+            self.engine.log(f"Watch: direktori tidak bisa dibaca: {directory} ({e})")
+            return 0
+        if self.index.dir_mtime(directory) == mtime_ns:
+            return 0
+        known = self.index.known(directory)
+        new = []
+        with os.scandir(directory) as it:
+            for entry in it:
+                if not is_candidate(entry.name):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    st = entry.stat()
+                except OSError:
+                    continue
+                prev = known.get(entry.path)
+                if prev is not None and prev[:2] == (st.st_size, st.st_mtime_ns):
+                    continue
+                if prev is not None and prev[2] == "inflight":
+                    continue
+                new.append((entry.path, directory, st.st_size, st.st_mtime_ns))
+        if new:
+            self.index.add_pending(new)
+            self.engine.log(f"Watch: {len(new)} file baru di {directory}")
+        self.index.set_dir_mtime(directory, mtime_ns)
+        return len(new)
+
+    def check_pending(self):
+        """Kirim file pending yang sudah stabil ke antrean (maks. max_inflight)."""
+        now = time.time()
+        config = None
+        for path, size, mtime_ns, stable_since in self.index.pending():
+            with self._lock:
+                if len(self._inflight) >= self.max_inflight:
+                    return
+            try:
+                st = os.stat(path)
+            except OSError:
+                self.index.remove(path)  # file dipindah/dihapus sebelum diproses
+                continue
+            if (st.st_size, st.st_mtime_ns) != (size, mtime_ns) or stable_since is None:
+                self.index.touch_pending(path, st.st_size, st.st_mtime_ns, now)
+                continue
+            if now - stable_since < self.settle_seconds:
+                continue
+            if config is None:
+                # Baca ulang config tiap siklus agar perubahan dari GUI ikut terpakai.
+                config = load_config(self.config_path)
+            if not self.submit(path, config):
+                return  # config tidak valid: semua file pending menunggu siklus berikutnya
+
+    def submit(self, path, config):
+        """Masukkan file ke antrean. False bila config tidak valid (file tetap pending).
+
+        Kesalahan config (mis. target_mb kosong atau "5,5x") bukan kesalahan file: file
+        dibiarkan pending dan dicoba lagi setelah config diperbaiki. Hanya kegagalan
+        probe/encode yang menandai file "failed" (lihat _on_event).
+        """
+        from .engine import Job  # lazy: parser CLI mengimpor modul ini untuk default opsi
+        output = None
+        if self.output_dir:
+            name = os.path.splitext(os.path.basename(path))[0]
+            output = os.path.join(self.output_dir, name + OUTPUT_SUFFIX)
+        try:
+            job = Job.from_config(path, config, output_path=output)
+            error = self.engine.validate(job)
+        except (TypeError, ValueError, KeyError) as e:
+            error = str(e) or type(e).__name__
+        if error:
+            if error != self._config_error:
+                self._config_error = error
+                self.engine.log(f"Watch: config {self.config_path} tidak valid ({error}); "
+                                f"file menunggu sampai config diperbaiki.")
+            return False
+        self._config_error = None
+        self.index.set_state(path, "inflight", job.output_path)
+        with self._lock:
+            self._inflight[path] = job
+        self.queue.submit(job)
+        return True
+
+    def _on_event(self, event):
+        if event.kind != "finished" or event.job is None:
+            return
+        with self._lock:
+            job = self._inflight.pop(event.job.input_path, None)
+        if job is not event.job:
+            return
+        if event.data["success"]:
+            state = "done"
+        elif job.canceled:
+            state = "pending"  # dihentikan (mis. shutdown) -> diulang saat start berikutnya
+        else:
+            state = "failed"
+        self.index.set_state(job.input_path, state, job.output_path, event.data["message"])
+
+    # --- Loop ---
+    def run(self):
+        if self.output_dir:
+            os.makedirs(self.output_dir, exist_ok=True)
+        recovered = self.index.recover()
+        if recovered:
+            self.engine.log(f"Watch: {recovered} job yang terputus akan diulang.")
+        self.engine.log(f"Watch: memantau {', '.join(self.directories)} (Ctrl+C untuk berhenti)")
+        self.queue.start()
+        try:
+            while not self._stop.is_set():
+                for directory in self.directories:
+                    self.scan(directory)
+                self.check_pending()
+                self.queue.prune()
+                self._stop.wait(self.poll_seconds)
+        finally:
+            self.queue.cancel_all()
+            self.queue.close()
+            self.queue.wait()
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# Nama File: tests/test_accuracy.py
+# Verifikasi ukuran, re-encode korektif dan model koreksi ukuran.
+
+import os
+
+import pytest
+
+from fastcompress.accuracy import MAX_SCALE, MIN_SCALE, SizeModel, corrective_scale, model_keys, size_verdict
+from fastcompress.engine import CompressionEngine, Job
+from fastcompress.probe import MediaInfo
+
+DURATION = 100.0
+OVERSHOOT = 1.10
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("FASTCOMPRESS_CACHE_DIR", str(tmp_path / "cache"))
+
+
+def value(cmd, flag):
+    return cmd[cmd.index(flag) + 1]
+
+
+@pytest.mark.parametrize("actual, verdict", [(1000, "ok"), (1010, "ok"), (1011, "over"), (900, "ok"), (899, "under")])
+def test_size_verdict_tolerances(actual, verdict):
+    assert size_verdict(actual, 1000) == verdict
+
+
+def test_corrective_scale():
+    assert corrective_scale(1100, 1000, "over") == pytest.approx(0.98 / 1.1)
+    assert corrective_scale(800, 1000, "under") == pytest.approx(1.25)
+    assert corrective_scale(0, 1000, "over") == 1.0
+
+
+def test_size_model_needs_samples_and_clamps(tmp_path):
+    model = SizeModel(str(tmp_path / "model.json"))
+    job = Job("in.mp4", 50, codec="H.264")
+    media = MediaInfo(height=1080, duration=300.0)
+    model.record(job, media, "2pass", 1000, 1100)
+    assert model.correction(job, media, "2pass") == (1.0, 0)
+    model.record(job, media, "2pass", 1000, 1100)
+    scale, count = model.correction(job, media, "2pass")
+    assert scale == pytest.approx(1 / 1.1) and count == 2
+    # Model halus (resolusi/durasi lain) kosong -> jatuh ke kunci kasar.
+    assert model.correction(job, MediaInfo(height=480, duration=30.0), "2pass")[0] == pytest.approx(1 / 1.1)
+    assert model.correction(job, media, "crf") == (1.0, 0)
+    for _ in range(10):
+        model.record(job, media, "2pass", 1000, 3000)
+    assert model.correction(job, media, "2pass")[0] == MIN_SCALE
+    model.clear()
+    for _ in range(2):
+        model.record(job, media, "2pass", 1000, 100)
+    assert model.correction(job, media, "2pass")[0] == MAX_SCALE
+
+
+def make_engine(tmp_path, audio_bytes):
+    """Engine dengan ffmpeg tiruan: audio berukuran tetap, video OVERSHOOT x bitrate yang diminta."""
+    engine = CompressionEngine(size_model=SizeModel(str(tmp_path / "model.json")))
+    requested = []
+
+    def probe_media(job):
+        job.media = MediaInfo(path=job.input_path, size=500 * 1024 * 1024, duration=DURATION, video_codec="h264",
+                              width=1920, height=1080, video_bit_rate=5000000, audio_codec="aac",
+                              audio_bit_rate=128000, has_audio=True)
+        return job.media
+
+    def execute_ffmpeg_command(command, duration, job, **kwargs):
+        out = command[-1]
+        if out.endswith("audio.m4a"):
+            size = audio_bytes
+        elif out == job.output_path:
+            video_k = int(value(command, "-b:v").rstrip("k"))
+            requested.append(video_k)
+            size = int(video_k * 1000 * duration * OVERSHOOT / 8) + audio_bytes
+        else:
+            return True  # pass 1
+        with open(out, "wb") as f:
+            f.truncate(size)
+        return True
+
+    engine.probe_media = probe_media
+    engine.execute_ffmpeg_command = execute_ffmpeg_command
+    return engine, requested
+
+
+def test_split_audio_correction_uses_real_audio_budget(tmp_path):
+    source = tmp_path / "in.mp4"
+    source.write_bytes(b"x")
+    # Audio hampir hening: file nyata 10% dari estimasi 128k x durasi.
+    audio_bytes = int(128000 * DURATION / 8 * 0.10)
+    engine, requested = make_engine(tmp_path, audio_bytes)
+    job = Job(str(source), 10, output_path=str(tmp_path / "out.mp4"), codec="H.265")
+
+    assert engine.run(job)
+    assert len(requested) == 2
+    total_bits = 10 * 8 * 1024 * 1024
+    budget_k = (total_bits - audio_bytes * 8) / DURATION / 1000
+    assert requested[0] == int(budget_k)
+    # Koreksi ~1/1.10 (x margin), bukan dari anggaran estimasi audio.
+    assert requested[1] / requested[0] == pytest.approx(0.98 / OVERSHOOT, abs=0.01)
+    actual = os.path.getsize(job.output_path)
+    assert abs(actual / (total_bits / 8) - 1) < 0.05
+    assert "%" not in job.message  # selesai dalam toleransi
+
+    data = engine.size_model._load()
+    for key in model_keys(job, job.media, "2pass"):
+        assert data[key]["ratio"] == pytest.approx(OVERSHOOT, abs=0.005)
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# Nama File: tests/test_chunked.py
+# Rencana segmen mode chunked dan perintah ffmpeg per segmen.
+
+from types import SimpleNamespace
+
+import pytest
+
+from fastcompress.chunked import Chunk, ChunkedEncoder, allocate_bits, plan_chunks
+from fastcompress.engine import Job
+
+
+def make_packets(duration, fps=30, gop=60, start=0.0):
+    """Paket seperti keluaran probe_keyframes: keyframe tiap `gop` frame, mulai di `start`."""
+    packets = []
+    for i in range(int(duration * fps)):
+        t = start + i / fps
+        packets.append((f"{t:.6f}", float(f"{t:.6f}"), 50000 if i % gop == 0 else 5000, i % gop == 0))
+    return packets
+
+
+def test_plan_chunks_boundaries_on_keyframes():
+    packets = make_packets(100)
+    chunks = plan_chunks(packets, 100.0, workers=2)
+    assert chunks[0].start == 0.0 and chunks[0].start_text == "0"
+    assert chunks[-1].end == 100.0
+    keyframes = {t for _, t, _, key in packets if key}
+    for prev, chunk in zip(chunks, chunks[1:]):
+        assert chunk.start in keyframes
+        assert prev.end == chunk.start
+    assert sum(c.source_bytes for c in chunks) == sum(p[2] for p in packets)
+
+
+@pytest.mark.parametrize("start_time", [None, 1.4])
+def test_plan_chunks_nonzero_start_is_relative(start_time):
+    # MPEG-TS/edit list: pts mulai di 1.4 s, -ss input relatif terhadap start_time.
+    shifted = plan_chunks(make_packets(100, start=1.4), 100.0, workers=2, start_time=start_time)
+    plain = plan_chunks(make_packets(100), 100.0, workers=2)
+    assert [c.start_text for c in shifted] == [c.start_text for c in plain]
+    assert [c.start for c in shifted] == pytest.approx([c.start for c in plain])
+    assert all(float(c.start_text) == pytest.approx(c.start) for c in shifted)
+
+
+def test_chunk_commands_seek_relative_start():
+    chunks = plan_chunks(make_packets(100, start=1.4), 100.0, workers=2, start_time=1.4)
+    job = Job("in.ts", 50, output_path="out.mp4")
+    encoder = ChunkedEncoder(SimpleNamespace(ffmpeg="ffmpeg"))
+    pass1, pass2 = encoder.build_chunk_commands(job, chunks[1], "work", threads=4)
+    for cmd in (pass1, pass2):
+        assert cmd[cmd.index("-ss") + 1] == chunks[1].start_text
+        assert cmd.index("-ss") < cmd.index("-i")
+        assert float(cmd[cmd.index("-t") + 1]) == pytest.approx(chunks[1].duration)
+    assert float(chunks[1].start_text) < 100 - 1.4
+
+
+def test_allocate_bits_duration_weighting_spends_budget():
+    chunks = plan_chunks(make_packets(100), 100.0, workers=4)
+    allocate_bits(chunks, 8000000 * 100, weighting="duration")
+    spent = sum(c.bitrate_k * 1000 * c.duration for c in chunks)
+    assert spent == pytest.approx(8000000 * 100, rel=0.01)
+    assert {c.bitrate_k for c in chunks} == {8000}
+
+
+def test_allocate_bits_complexity_favours_busy_chunks():
+    # Paruh kedua 3x lebih besar di sumber (gerakan banyak).
+    chunks = [Chunk(0, 0.0, 50.0, "0", source_bytes=1000), Chunk(1, 50.0, 100.0, "50", source_bytes=3000)]
+    first, second = allocate_bits(chunks, 8000000 * 100)
+    assert second.bitrate_k > first.bitrate_k
+    # Campuran 50/50 durasi dan ukuran sumber: 0.5*0.5 + 0.5*0.75 = 62.5%.
+    assert second.bitrate_k == 10000
+    assert first.bitrate_k == 6000
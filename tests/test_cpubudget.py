@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# Nama File: tests/test_cpubudget.py
+# Pembagian CPU disjoint untuk job software paralel.
+
+import pytest
+
+from fastcompress.cpubudget import CpuBudget, apply_thread_args, parse_cpulist, partition_cpus
+from fastcompress.scheduler import JobQueue
+
+# Dua node NUMA, masing-masing dua core fisik dengan hyperthread.
+TWO_NODES = [[[0, 4], [1, 5]], [[2, 6], [3, 7]]]
+
+
+def all_cpus(groups):
+    return [cpu for cpus, _ in groups for cpu in cpus]
+
+
+def test_parse_cpulist():
+    assert parse_cpulist("0-3,8-9,12\n") == [0, 1, 2, 3, 8, 9, 12]
+
+
+def test_one_group_per_node_keeps_node():
+    groups = partition_cpus(TWO_NODES, 2)
+    assert groups == [([0, 1, 4, 5], 0), ([2, 3, 6, 7], 1)]
+
+
+def test_groups_keep_whole_cores():
+    groups = partition_cpus(TWO_NODES, 4)
+    assert [cpus for cpus, _ in groups] == [[0, 4], [1, 5], [2, 6], [3, 7]]
+    assert [node for _, node in groups] == [0, 0, 1, 1]
+
+
+def test_single_group_spans_nodes():
+    (cpus, node), = partition_cpus(TWO_NODES, 1)
+    assert cpus == list(range(8)) and node is None
+
+
+def test_more_parts_than_cpus_stay_disjoint():
+    groups = partition_cpus(TWO_NODES, 12)
+    assert len(groups) == 8
+    assert sorted(all_cpus(groups)) == list(range(8))
+
+
+def test_queue_runs_no_more_software_workers_than_groups():
+    budget = CpuBudget(4, topology=[[[0], [1]]])
+    assert len(budget.groups) == 2
+    queue = JobQueue(engine=None, slots={"Software": 4}, cpu_budget=budget)
+    assert queue.slots["Software"] == 2
+
+
+def test_budget_acquire_release():
+    budget = CpuBudget(2, topology=TWO_NODES, pin=False)
+    first, second = budget.acquire(), budget.acquire()
+    assert budget.acquire() is None
+    assert set(first.cpus).isdisjoint(second.cpus)
+    assert first.threads == 4 and not first.pin
+    budget.release(first)
+    assert budget.acquire() == first
+
+
+@pytest.mark.parametrize("encoder, expected", [
+    ("libx264", ["-threads", "4"]),
+    ("libx265", ["-x265-params", "pools=4"]),
+    ("libaom-av1", ["-threads", "4", "-row-mt", "1"]),
+])
+def test_apply_thread_args(encoder, expected):
+    cmd = apply_thread_args(["ffmpeg", "-i", "in.mp4", "-c:v", encoder, "out.mp4"], 4)
+    assert cmd == ["ffmpeg", "-i", "in.mp4", "-c:v", encoder] + expected + ["out.mp4"]
+
+
+def test_apply_thread_args_leaves_hardware_and_preset_commands():
+    nvenc = ["ffmpeg", "-c:v", "h264_nvenc", "out.mp4"]
+    assert apply_thread_args(nvenc, 4) == nvenc
+    x265 = ["ffmpeg", "-c:v", "libx265", "-x265-params", "pass=2", "out.mp4"]
+    assert apply_thread_args(x265, 4)[4] == "pools=4:pass=2"
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# Nama File: tests/test_planner.py
+# Model ukuran-vs-CRF dari sampel dan pemilihan q oleh SizePlanner.
+
+import math
+from types import SimpleNamespace
+
+import pytest
+
+from fastcompress.engine import Job
+from fastcompress.planner import SAMPLE_SECONDS, SizePlanner, fit_quality_model, sample_starts
+
+
+def rate_k(q):
+    """Bitrate sampel tiruan: 4000k pada CRF 20, turun 4x tiap 10 CRF."""
+    return 4000 * math.exp(math.log(0.25) / 10 * (q - 20))
+
+
+def make_planner(spike=1.0):
+    calls = []
+
+    def execute_ffmpeg_command(command, duration, job, **kwargs):
+        q = float(command[command.index("-crf") + 1])
+        # Sampel pertama (kedua nilai q) `spike` kali lebih besar: satu adegan sibuk.
+        factor = spike if len(calls) < 2 else 1.0
+        calls.append(q)
+        with open(command[-1], "wb") as f:
+            f.truncate(int(rate_k(q) * factor * 1000 * SAMPLE_SECONDS / 8))
+        return True
+
+    engine = SimpleNamespace(ffmpeg="ffmpeg", set_status=lambda *a, **k: None,
+                             execute_ffmpeg_command=execute_ffmpeg_command)
+    return SizePlanner(engine), calls
+
+
+def test_sample_starts_spread_evenly():
+    starts = sample_starts(100.0, count=5, length=4.0)
+    assert starts == pytest.approx([8.0, 28.0, 48.0, 68.0, 88.0])
+
+
+def test_fit_quality_model_recovers_slope():
+    a, slope, cv = fit_quality_model(20, 30, [rate_k(20)] * 3, [rate_k(30)] * 3)
+    assert slope == pytest.approx(math.log(0.25) / 10)
+    assert math.exp(a + slope * 25) == pytest.approx(2000)
+    assert cv == 0
+
+
+def test_fit_quality_model_rejects_growing_size():
+    with pytest.raises(ValueError):
+        fit_quality_model(20, 30, [1000], [1200])
+
+
+def test_plan_picks_crf_for_target():
+    planner, calls = make_planner()
+    job = Job("in.mp4", 50, codec="H.264")
+    plan = planner.plan(job, 600.0, 2000, 128000 * 600)
+    assert len(calls) == 10 and set(calls) == {20, 30}
+    assert plan.single_pass
+    assert plan.q == 25.0
+    assert plan.predicted_video_k == pytest.approx(2000, rel=0.001)
+    assert plan.predicted_mb == pytest.approx((2000000 + 128000) * 600 / 8 / 1024 / 1024, rel=0.001)
+    assert plan.confidence == 1.0
+
+
+def test_plan_falls_back_when_samples_disagree():
+    planner, _ = make_planner(spike=8.0)
+    plan = planner.plan(Job("in.mp4", 50, codec="H.264"), 600.0, 2000, 0)
+    assert plan.mode == "2pass"
+    assert "keyakinan" in plan.reason
+
+
+def test_plan_short_or_unsupported_is_two_pass():
+    planner, calls = make_planner()
+    assert planner.plan(Job("in.mp4", 50, codec="H.264"), 20.0, 2000, 0).mode == "2pass"
+    assert planner.plan(Job("in.mp4", 50, codec="AV1"), 600.0, 2000, 0).mode == "2pass"
+    assert calls == []
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# Nama File: tests/test_ratecontrol.py
+# Baris perintah ffmpeg yang dibangun tiap strategi rate control.
+
+import pytest
+
+from fastcompress.engine import Job
+from fastcompress.ratecontrol import (AbrStrategy, AmfStrategy, NvencStrategy, QsvStrategy, TwoPassStrategy,
+                                      streaming_strategy_for, strategy_for)
+from fastcompress.system import NULL_DEVICE
+
+
+def make_job(codec="H.264", encoder_type="Software", output_path="out.mp4", **kwargs):
+    return Job("in.mp4", 50, output_path=output_path, codec=codec, encoder_type=encoder_type, **kwargs)
+
+
+def value(cmd, flag):
+    assert flag in cmd, f"{flag} tidak ada di {cmd}"
+    return cmd[cmd.index(flag) + 1]
+
+
+@pytest.mark.parametrize("encoder_type, expected", [
+    ("Software", TwoPassStrategy),
+    ("NVIDIA", NvencStrategy),
+    ("Intel", QsvStrategy),
+    ("AMD", AmfStrategy),
+])
+def test_strategy_for_encoder(encoder_type, expected):
+    assert isinstance(strategy_for(make_job(encoder_type=encoder_type).ffmpeg_encoder), expected)
+
+
+def test_two_pass_commands():
+    job = make_job()
+    pass1, pass2 = (step.command for step in TwoPassStrategy().build_steps("ffmpeg", job, 1000, 128))
+    assert value(pass1, "-b:v") == "1000k"
+    assert value(pass1, "-pass") == "1"
+    assert value(pass1, "-passlogfile") == job.passlog_prefix
+    assert "-an" in pass1
+    assert pass1[-1] == NULL_DEVICE
+    assert value(pass2, "-pass") == "2"
+    assert value(pass2, "-passlogfile") == job.passlog_prefix
+    assert value(pass2, "-b:v") == "1000k"
+    assert value(pass2, "-c:a") == "aac"
+    assert "-maxrate" not in pass2 and "-rc" not in pass2
+    assert pass2[-1] == "out.mp4"
+
+
+def test_two_pass_split_audio_mapping():
+    job = make_job()
+    pass1, pass2 = (step.command for step in
+                    TwoPassStrategy().build_steps("ffmpeg", job, 1000, 128, audio_path="audio.m4a"))
+    assert pass2[pass2.index("-i") + 1] == "in.mp4"
+    assert pass2[pass2.index("audio.m4a") - 1] == "-i"
+    maps = [pass2[i + 1] for i, arg in enumerate(pass2) if arg == "-map"]
+    assert maps == ["0:v:0", "1:a:0"]
+    assert value(pass2, "-c:a") == "copy"
+    assert "audio.m4a" not in pass1
+
+
+@pytest.mark.parametrize("encoder_type, rc", [("NVIDIA", "vbr"), ("AMD", "vbr_peak"), ("Intel", None)])
+def test_single_pass_vbv(encoder_type, rc):
+    job = make_job(encoder_type=encoder_type)
+    strategy = strategy_for(job.ffmpeg_encoder)
+    steps = strategy.build_steps("ffmpeg", job, 1000, 128)
+    assert len(steps) == 1
+    cmd = steps[0].command
+    assert value(cmd, "-b:v") == "1000k"
+    assert value(cmd, "-maxrate") == "1500k"
+    assert value(cmd, "-bufsize") == "2000k"
+    assert "-pass" not in cmd and "-passlogfile" not in cmd
+    if rc is None:
+        assert "-rc" not in cmd
+        assert value(cmd, "-look_ahead") == "1"
+    else:
+        assert value(cmd, "-rc") == rc
+    assert cmd[-1] == "out.mp4"
+
+
+def test_single_pass_split_audio_mapping():
+    job = make_job(encoder_type="NVIDIA")
+    cmd = NvencStrategy().build_steps("ffmpeg", job, 1000, 128, audio_path="audio.m4a")[0].command
+    maps = [cmd[i + 1] for i, arg in enumerate(cmd) if arg == "-map"]
+    assert maps == ["0:v:0", "1:a:0"]
+    assert value(cmd, "-c:a") == "copy"
+
+
+def test_streaming_abr_vbv():
+    job = make_job(output_path="-")
+    strategy = streaming_strategy_for(job.ffmpeg_encoder)
+    assert isinstance(strategy, AbrStrategy)
+    cmd = strategy.build_steps("ffmpeg", job, 800, 128)[0].command
+    assert value(cmd, "-b:v") == "800k"
+    assert value(cmd, "-maxrate") == "1200k"
+    assert value(cmd, "-bufsize") == "1600k"
+    assert "-pass" not in cmd
+    assert value(cmd, "-f") == "mp4"
+    assert cmd[-1] == "pipe:1"
+
+
+def test_streaming_keeps_hardware_strategy():
+    assert isinstance(streaming_strategy_for("hevc_nvenc"), NvencStrategy)
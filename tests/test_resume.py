@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+# Nama File: tests/test_resume.py
+# State job resumable: kunci job dan pembersihan state lama.
+
+import json
+import os
+import time
+
+import pytest
+
+from fastcompress.engine import Job
+from fastcompress.probe import MediaInfo
+from fastcompress.resume import STATE_FILE, JobState, job_key, prune_states
+
+HOUR = 3600
+
+
+def make_state(root, key, age, size=0):
+    path = os.path.join(str(root), key)
+    os.makedirs(path)
+    with open(os.path.join(path, STATE_FILE), "w", encoding="utf-8") as f:
+        json.dump({"updated_at": time.time() - age}, f)
+    with open(os.path.join(path, "chunk.mkv"), "wb") as f:
+        f.truncate(size)
+    return path
+
+
+def test_prune_size_cap_skips_active_states(tmp_path):
+    # Job lain yang sedang berjalan (state baru diperbarui) tidak boleh kehilangan segmennya.
+    running = make_state(tmp_path, "running", age=60, size=5000)
+    idle = make_state(tmp_path, "idle", age=48 * HOUR, size=5000)
+    assert prune_states(keep="current", max_bytes=1000, root=str(tmp_path)) == 1
+    assert os.path.isdir(running)
+    assert not os.path.exists(idle)
+
+
+@pytest.mark.parametrize("change", [
+    {"target_mb": 40}, {"codec": "H.265"}, {"audio_mode": "Copy Audio"}, {"audio_bitrate_k": 96},
+    {"output_path": "other.mp4"},
+])
+def test_job_key_changes_with_settings(change):
+    media = MediaInfo(size=1000, mtime_ns=1)
+    base = dict(target_mb=50, output_path="out.mp4")
+    assert job_key(Job("in.mp4", **dict(base, **change)), media) != job_key(Job("in.mp4", **base), media)
+
+
+def test_job_key_changes_with_input_file():
+    job = Job("in.mp4", 50, output_path="out.mp4")
+    assert job_key(job, MediaInfo(size=1000, mtime_ns=1)) == job_key(job, MediaInfo(size=1000, mtime_ns=1))
+    assert job_key(job, MediaInfo(size=1000, mtime_ns=1)) != job_key(job, MediaInfo(size=1000, mtime_ns=2))
+
+
+def test_state_roundtrip_and_rejects_broken_plan(tmp_path):
+    job = Job("in.mp4", 50, output_path="out.mp4")
+    media = MediaInfo(size=1000, mtime_ns=1)
+    state = JobState.open(job, media, directory=str(tmp_path))
+    assert not state.resumed
+    state.chunks = [{"index": 0}, {"index": 1}]
+    state.mark_done(1)
+    again = JobState.open(job, media, directory=str(tmp_path))
+    assert again.resumed and again.done == {1}
+    again.chunks = [{"index": 1}]
+    again.save()
+    assert not JobState.open(job, media, directory=str(tmp_path)).resumed
+
+
+def test_prune_ttl_and_keep(tmp_path):
+    old = make_state(tmp_path, "old", age=10 * 24 * HOUR)
+    kept = make_state(tmp_path, "kept", age=10 * 24 * HOUR)
+    recent = make_state(tmp_path, "recent", age=48 * HOUR)
+    assert prune_states(keep="kept", root=str(tmp_path)) == 1
+    assert not os.path.exists(old)
+    assert os.path.isdir(kept) and os.path.isdir(recent)
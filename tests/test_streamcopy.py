@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+# Nama File: tests/test_streamcopy.py
+# Pemilihan jalur stream-copy (remux / video-copy / audio-trim).
+
+from fastcompress.engine import Job
+from fastcompress.probe import MediaInfo
+from fastcompress.streamcopy import plan_stream_copy
+
+MB = 1024 * 1024
+
+
+def make_media(**fields):
+    data = dict(path="in.mp4", size=100 * MB, duration=100.0, video_codec="h264", width=1280, height=720,
+                video_bit_rate=2000000, audio_codec="aac", audio_bit_rate=96000, has_audio=True)
+    data.update(fields)
+    return MediaInfo(**data)
+
+
+def test_video_copy_copies_smaller_aac_source():
+    job = Job("in.mp4", 50, codec="H.264")
+    plan = plan_stream_copy(job, make_media(), 50 * MB, 128)
+    assert plan.kind == "video-copy"
+    assert plan.audio_bitrate_k is None  # audio sumber 96k di-copy, bukan dinaikkan ke 128k
+
+
+def test_video_copy_caps_audio_at_source_bitrate():
+    job = Job("in.mp4", 50, codec="H.264")
+    plan = plan_stream_copy(job, make_media(audio_codec="opus"), 50 * MB, 128)
+    assert plan.kind == "video-copy"
+    assert plan.audio_bitrate_k == 96
+
+
+def test_remux_when_source_fits_even_with_other_codec():
+    job = Job("in.mp4", 150, codec="H.265")
+    plan = plan_stream_copy(job, make_media(), 150 * MB, 128)
+    assert plan.kind == "remux"
+    assert plan.audio_bitrate_k is None
+    assert "dipertahankan" in plan.reason
+
+
+def test_unremuxable_codec_is_reencoded():
+    job = Job("in.mp4", 150, codec="H.264")
+    assert plan_stream_copy(job, make_media(video_codec="mpeg2video"), 150 * MB, 128) is None
+
+
+def test_audio_trim_when_only_audio_over_budget():
+    # Video 2000k x 100 s = ~24.1 MB; sisa anggaran 25 MB cukup untuk ~70k audio.
+    job = Job("in.mp4", 25, codec="H.264")
+    plan = plan_stream_copy(job, make_media(audio_bit_rate=192000), 25 * MB, 128)
+    assert plan.kind == "audio-trim"
+    assert 48 <= plan.audio_bitrate_k < 128
+    assert plan.estimated_bytes <= 25 * MB
+
+
+def test_video_over_budget_or_codec_change_needs_encode():
+    assert plan_stream_copy(Job("in.mp4", 20, codec="H.264"), make_media(), 20 * MB, 128) is None
+    assert plan_stream_copy(Job("in.mp4", 50, codec="H.265"), make_media(), 50 * MB, 128) is None
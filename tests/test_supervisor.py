@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+# Nama File: tests/test_supervisor.py
+# Pemakaian sumber daya proses anak yang dilaporkan supervisor.
+
+import sys
+
+import pytest
+
+from fastcompress.supervisor import ProcessSupervisor
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="VmHWM hanya di Linux")
+def test_peak_rss_excludes_parent_memory():
+    # ru_maxrss anak mewarisi puncak RSS induk; yang dilaporkan harus milik anak.
+    ballast = bytearray(300 * 1024 * 1024)
+    ballast[::4096] = b"\1" * len(ballast[::4096])
+    handle = ProcessSupervisor().start([sys.executable, "-c", "import time; time.sleep(0.5)"])
+    list(handle.lines())
+    result = handle.wait()
+    assert result.returncode == 0
+    assert result.peak_rss_kb is not None and 0 < result.peak_rss_kb < 200 * 1024
+    del ballast
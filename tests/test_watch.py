@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+# Nama File: tests/test_watch.py
+# Status file watch-folder (pending -> inflight -> done/failed) di indeks SQLite.
+
+import json
+
+import pytest
+
+from fastcompress.engine import CompressionEngine
+from fastcompress.watch import WatchFolder, WatchIndex, is_candidate
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("FASTCOMPRESS_CACHE_DIR", str(tmp_path / "cache"))
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = WatchIndex(str(tmp_path / "index.sqlite"))
+    yield index
+    index.close()
+
+
+def test_is_candidate():
+    assert is_candidate("klip.MP4") and is_candidate("a.mkv")
+    assert not is_candidate("klip_compressed.mp4")
+    assert not is_candidate("catatan.txt")
+
+
+def test_index_state_machine(index):
+    index.add_pending([("/in/a.mp4", "/in", 10, 1), ("/in/b.mp4", "/in", 20, 2)])
+    assert [row[0] for row in index.pending()] == ["/in/a.mp4", "/in/b.mp4"]
+    index.touch_pending("/in/a.mp4", 15, 3, None)
+    assert index.known("/in")["/in/a.mp4"] == (15, 3, "pending")
+
+    index.set_state("/in/a.mp4", "inflight", "/out/a.mp4")
+    index.set_state("/in/b.mp4", "inflight", "/out/b.mp4")
+    index.set_state("/in/b.mp4", "done", message="Selesai")
+    assert index.counts() == {"inflight": 1, "done": 1}
+    assert index.pending() == []
+
+    # Crash saat a.mp4 inflight: sesi berikutnya mengembalikannya ke pending.
+    assert index.recover() == 1
+    (path, size, mtime_ns, stable_since), = index.pending()
+    assert (path, size, mtime_ns, stable_since) == ("/in/a.mp4", 15, 3, None)
+    assert index.counts() == {"pending": 1, "done": 1}
+
+    # File yang berubah setelah selesai dicatat ulang sebagai pending.
+    index.add_pending([("/in/b.mp4", "/in", 25, 4)])
+    assert index.counts() == {"pending": 2}
+    index.remove("/in/a.mp4")
+    assert list(index.known("/in")) == ["/in/b.mp4"]
+
+
+def test_dir_mtime(index):
+    assert index.dir_mtime("/in") is None
+    index.set_dir_mtime("/in", 5)
+    assert index.dir_mtime("/in") == 5
+
+
+def test_invalid_config_keeps_file_pending(tmp_path, index):
+    source = tmp_path / "in"
+    source.mkdir()
+    (source / "klip.mp4").write_bytes(b"x" * 100)
+    config = tmp_path / "config.json"
+    config.write_text(json.dumps({"target_mb": "5,5x"}), encoding="utf-8")
+    watch = WatchFolder(CompressionEngine(), [str(source)], config_path=str(config), index=index,
+                        settle_seconds=0)
+
+    assert watch.scan(str(source)) == 1
+    watch.check_pending()
+    assert index.counts() == {"pending": 1}
+    assert watch.queue.jobs == []
+
+    config.write_text(json.dumps({"target_mb": "5,5"}), encoding="utf-8")
+    watch.check_pending()
+    assert index.counts() == {"inflight": 1}
+    job, = watch.queue.jobs
+    assert job.target_mb == 5.5
@@ -1,7 +1,16 @@
 # -*- mode: python ; coding: utf-8 -*-
+# Build onedir: dua EXE dalam satu folder dist/FastCompress.
+#   FastCompress.exe    : GUI (customtkinter), tanpa konsol.
+#   fastcompress-cli.exe: CLI headless (python -m fastcompress), tanpa Tk.
+# Onedir (bukan --onefile) agar tiap start tidak mengekstrak seluruh isi
+# EXE ke folder temp; CLI dianalisis terpisah dengan Tk dikecualikan
+# sehingga import-nya tetap ramping. UPX dimatikan: DLL terkompresi harus
+# didekompresi lagi di setiap start.
 
+# Modul GUI yang tidak boleh ikut ke EXE CLI.
+GUI_MODULES = ['tkinter', '_tkinter', 'customtkinter', 'darkdetect', 'PIL']
 
-a = Analysis(
+gui = Analysis(
     ['video_compressor_app.py'],
     pathex=[],
     binaries=[],
@@ -14,21 +23,18 @@ a = Analysis(
     noarchive=False,
     optimize=0,
 )
-pyz = PYZ(a.pure)
+gui_pyz = PYZ(gui.pure)
 
-exe = EXE(
-    pyz,
-    a.scripts,
-    a.binaries,
-    a.datas,
+gui_exe = EXE(
+    gui_pyz,
+    gui.scripts,
     [],
-    name='video_compressor_app',
+    exclude_binaries=True,
+    name='FastCompress',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
+    upx=False,
     console=False,
     disable_windowed_traceback=False,
     argv_emulation=False,
@@ -36,3 +42,50 @@ exe = EXE(
     codesign_identity=None,
     entitlements_file=None,
 )
+
+cli = Analysis(
+    ['fastcompress/__main__.py'],
+    pathex=['.'],
+    binaries=[],
+    datas=[],
+    hiddenimports=[],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=GUI_MODULES,
+    noarchive=False,
+    optimize=0,
+)
+cli_pyz = PYZ(cli.pure)
+
+cli_exe = EXE(
+    cli_pyz,
+    cli.scripts,
+    [],
+    exclude_binaries=True,
+    name='fastcompress-cli',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,
+    console=True,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+)
+
+# Binary/data bersama (python DLL, _sqlite3, dst.) hanya disalin sekali.
+coll = COLLECT(
+    gui_exe,
+    gui.binaries,
+    gui.datas,
+    cli_exe,
+    cli.binaries,
+    cli.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='FastCompress',
+)